@@ -2,19 +2,32 @@ import pandas as pd
 import numpy as np
 import json
 from datetime import datetime, date
-import re
 import dash
-from dash import dcc, html, dash_table
+from dash import dcc, html, dash_table, Patch
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ClientsideFunction, ALL
+from dash.exceptions import PreventUpdate
 import plotly.express as px
 import plotly.graph_objects as go
 import networkx as nx
 import dash_cytoscape as cyto # Import Cytoscape
 import os
 import traceback
+from functools import partial
 import uuid # For Cytoscape element generation if needed
-import copy # For deep copying stylesheets
+from graph_builder import NODE_TYPES
+from graph_index import GraphIndex
+from layout_engine import LayoutEngine, preset_layout
+from element_cache import ElementCache
+from graph_api import register_graph_api, LRUCache
+from entity_resolution import print_resolution_report
+from snapshot import load_prepared, app_graphs, register_layouts, GRAPH_LAYOUTS
+from table_query import TableQuery
+from view_cache import SessionViewCache, view_key, push_view, back_view, crumb_view
+from causal_analysis import CAUSAL_MAX_PATHS
+from graph_metrics import CENTRALITY_METRICS
+from node_groups import NodeGroups, HIDDEN_CLASS, MEMBER_CLASS
+from temporal_index import TemporalIndex, TIME_PATCH_MAX_DELETES
 
 # Load Cytoscape extensions - important for layouts
 try:
@@ -25,315 +38,78 @@ except Exception as e:
 # Enable debug mode
 debug_mode = True
 
-# ------------------------------------------------------------------------------
-# DATA PREPARATION
-# ------------------------------------------------------------------------------
-def parse_date(date_str):
-    original_date_str = date_str
-    try:
-        date_str = date_str.strip()
-        # Simple range match: "18-20 Feb 2014" -> use the first day
-        range_match_simple = re.match(r"(\d{1,2})\s*-\s*\d{1,2}\s+(\w{3})\s+(\d{4})", date_str)
-        if range_match_simple:
-            day_start, month, year = range_match_simple.groups()
-            date_str = f"{day_start} {month} {year}"
-            #if debug_mode: print(f"DEBUG (parse_date): Parsed simple range: '{original_date_str}' -> '{date_str}'")
-
-        # Complex range match: "22 Apr - 3 May 2014" -> use the first day
-        range_match_complex = re.match(r"(\d{1,2}\s+\w{3})\s*-\s*\d{1,2}\s+\w{3}\s+(\d{4})", date_str)
-        if range_match_complex:
-            day_month_start, year = range_match_complex.groups()
-            date_str = f"{day_month_start} {year}"
-            #if debug_mode: print(f"DEBUG (parse_date): Parsed complex range: '{original_date_str}' -> '{date_str}'")
-
-        formats_to_try = ["%d %b %Y"]
-        parsed_date = None
-        for fmt in formats_to_try:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt)
-                return parsed_date # Success
-            except ValueError:
-                continue # Try next format
-
-        # Fallback if formats failed
-        print(f"Warning: Could not parse date string '{original_date_str}' (processed as '{date_str}') with known formats.")
-        return datetime(2014, 2, 27) # Default fallback
-
-    except Exception as e:
-        print(f"Error during date parsing for: '{original_date_str}', Processed str: '{date_str}'. Error: {e}")
-        return datetime(2014, 2, 27) # Default fallback
+# Minimum number of shared events for an actor-actor link (raise to prune dense actor graphs)
+ACTOR_EDGE_MIN_WEIGHT = int(os.environ.get('ACTOR_EDGE_MIN_WEIGHT', 1))
 
 # ------------------------------------------------------------------------------
-# FULL DATA LISTS (Standardized Hyphens)
+# DATASET LOADING (set CONFLICT_DATASET to serve another conflict)
 # ------------------------------------------------------------------------------
-events = [
-    {
-        "date": "21 Nov 2013", "title": "Ukraine Drops EU Deal; Protests Begin (Euromaidan)", "type": "Political",
-        "actors": ["Ukraine (Yanukovych gov't)", "EU", "Russia"], "location": "Kyiv (Ukraine)",
-        "summary": "Ukraine's government abruptly suspends plans to sign an EU Association Agreement, reportedly under Russian pressure. The move sparks the largest protests since 2004, as pro-European demonstrators gather in Kyiv's Independence Square (launching the 'Euromaidan' movement)."
-    },
-    {
-        "date": "18-20 Feb 2014", "title": "Deadly Clashes in Kyiv ('Maidan Massacre')", "type": "Civil Unrest",
-        "actors": ["Protesters", "Ukraine security forces"], "location": "Kyiv",
-        "summary": "After months of mostly peaceful protest, violence peaks in Kyiv. Security forces open fire on demonstrators, including sniper attacks on Feb 20, killing dozens. In ~72 hours nearly 100 protesters are killed. These events undermine President Viktor Yanukovych's authority and become a tipping point in Ukraine's revolution."
-    },
-    {
-        "date": "22 Feb 2014", "title": "Ukrainian President Ousted by Parliament", "type": "Political",
-        "actors": ["Ukraine (Parliament)", "Viktor Yanukovych", "Oleksandr Turchynov"], "location": "Kyiv",
-        "summary": "President Yanukovych flees Kyiv amid the turmoil. Ukraine's parliament votes to remove Yanukovych from power. Speaker Oleksandr Turchynov is appointed acting President until new elections. A new pro-Western interim government forms, as Yanukovych denounces the events as a coup from exile."
-    },
-    {
-        "date": "23 Feb 2014", "title": "Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "type": "Civil/Political",
-        "actors": ["Sevastopol locals", "Aleksei Chaly", "Crimean Tatars"], "location": "Sevastopol, Simferopol (Crimea)",
-        "summary": "As Kiev's new authorities take charge, pro-Russian sentiment surges in Crimea. In Sevastopol, thousands rally waving Russian flags and reject the 'Kiev coup.' The crowd 'elects' Russian businessman Aleksei Chaly as de facto mayor, forming local 'self-defense' units. In Simferopol (Crimea's capital), a smaller pro-Ukraine demonstration takes place in support of the Maidan movement. Tensions begin to split the region along political and ethnic lines."
-    },
-    {
-        "date": "26 Feb 2014", "title": "Clashes at Crimean Parliament between Rival Rallies", "type": "Civil Unrest",
-        "actors": ["Mejlis of Crimean Tatars", "Russian Unity party", "Crimean Parliament"], "location": "Simferopol (Crimea)",
-        "summary": "Competing protests collide outside the Crimean legislature. Over 10,000 Crimean Tatars and pro-Ukraine activists rally to support Ukraine's territorial integrity, facing off against a smaller pro-Russian crowd calling for Crimea's secession. Scuffles break out; police struggle to maintain order. In the chaos, at least 30 people are injured and 2 die (one from a stampede, one from heart attack). The parliament's emergency session is aborted. This 'Day of Resistance' later becomes a symbol of Crimeans opposed to separation."
-    },
-    {
-        "date": "27 Feb 2014", "title": "Armed Men Seize Crimean Parliament; New PM Installed", "type": "Military/Political",
-        "actors": ["Unmarked Russian special forces", "Crimean Parliament", "Sergey Aksyonov"], "location": "Simferopol",
-        "summary": "Pre-dawn raids: Unidentified gunmen in military gear (widely believed to be Russian special forces) storm the Crimean parliament and government buildings, raising Russian flags. Under the guns, Crimean lawmakers convene and vote out the regional government, installing Sergey Aksyonov (leader of the pro-Russia 'Russian Unity' party) as Prime Minister. Aksyonov announces he's in charge of Crimea's security forces and hastily calls for a referendum on Crimea's status (initially set for May). This bloodless coup marks the start of open separatist control in Crimea."
-    },
-    {
-        "date": "28 Feb 2014", "title": "Russian Troops and 'Self-Defense' Forces Take Control", "type": "Military",
-        "actors": ["Russian Armed Forces (Black Sea Fleet)", "Crimean self-defense militias"], "location": "Throughout Crimea (Simferopol, Sevastopol)",
-        "summary": "Unmarked Russian soldiers begin securing strategic sites across Crimea. Heavily armed troops occupy Simferopol airport and roads, and Russian Navy personnel block naval bases in Sevastopol. By day's end, Crimea's administrative centers, airports, ports, and telecommunication hubs are under armed control, cutting the peninsula off from mainland Ukraine. Moscow still denies its troops are involved, calling the fighters 'local self-defense forces,' but their equipment and coordination indicate a Russian military operation. Ukrainian bases in Crimea are surrounded, though no major gunfire occurs."
-    },
-    {
-        "date": "1 Mar 2014", "title": "Russia Authorizes Use of Force in Ukraine", "type": "Political/Military",
-        "actors": ["Sergey Aksyonov", "Vladimir Putin", "Russian Federation Council"], "location": "Simferopol; Moscow",
-        "summary": "Aksyonov (Crimea's new de facto PM) appeals directly to Putin to 'help ensure peace and order' in Crimea, effectively requesting Russian military assistance. Within hours, President Vladimir Putin asks Russia's legislature for authority to intervene. The Federation Council unanimously approves Putin's request to use the Russian Armed Forces on Ukrainian territory. This gives formal Russian legal cover to the ongoing military presence. In Kiev, acting President Turchynov places Ukraine's military on high alert and calls Russia's move 'a declaration of war.'"
-    },
-    {
-        "date": "3-8 Mar 2014", "title": "Standoff - Ukraine Isolated; OSCE Observers Blocked", "type": "Diplomatic/Military", # Standardized hyphen
-        "actors": ["Ukraine interim government", "OSCE", "NATO", "Russian forces"], "location": "Crimea borders",
-        "summary": "Ukraine's new government, unable to fight militarily in Crimea, pursues diplomacy. OSCE sends an unarmed military observer mission to Crimea, but armed men at checkpoints refuse entry. On 8 March, warning shots are fired to turn back OSCE observers at Armyansk checkpoint. Meanwhile NATO's leadership warns Russia to pull back. Russian forces entrench their positions, demanding Ukrainian units surrender. The interim Kiev leadership continues to insist Crimea remains Ukrainian, but on the ground their authority is effectively null."
-    },
-    {
-        "date": "6 Mar 2014", "title": "Crimean Parliament Votes to Secede and Join Russia", "type": "Political/Legal",
-        "actors": ["Crimean Supreme Council (Parliament)", "Crimean gov't (Aksyonov)", "Russia"], "location": "Simferopol",
-        "summary": "Under armed guard, 78 of 100 deputies vote to secede from Ukraine and 'reunify' with Russia. They also move up the region's status referendum to just 10 days away (16 March), changing the ballot to offer a choice between joining Russia or restoring Crimea's 1992 constitution. Crimean officials frame the vote as merely 'confirming' their decision. Kiev's government and nearly all international observers condemn this as illegal. Russia welcomes the decision, while accelerating plans to facilitate Crimea's absorption."
-    },
-    {
-        "date": "11 Mar 2014", "title": "Crimea's 'Declaration of Independence'", "type": "Political/Legal",
-        "actors": ["Crimean Parliament & Sevastopol Council"], "location": "Simferopol; Sevastopol",
-        "summary": "Anticipating a pro-Russian outcome in the upcoming referendum, Crimea's regional parliament (joined by Sevastopol's city council) passes a Declaration of Independence from Ukraine. The document states that if the referendum approves joining Russia, Crimea shall be an independent state and will request entry into the Russian Federation. Russia signals that this 'Republic of Crimea' would be eligible for accession under Russian law, citing the Kosovo precedent."
-    },
-    {
-        "date": "15 Mar 2014", "title": "UN Security Council Draft Resolution Vetoed by Russia", "type": "Diplomatic",
-        "actors": ["United Nations Security Council (P5: Russia, US, UK, France, China)"], "location": "New York (UN HQ)",
-        "summary": "On the eve of the referendum, Western powers bring a resolution to the UN Security Council urging states not to recognize the planned vote. In the vote, 13 of 15 Council members back the resolution, but Russia vetoes it (China abstains). The draft stated the referendum 'can have no validity' and called on states to refrain from recognizing any change of Crimea's status. Russia's veto isolates Moscow diplomatically."
-    },
-    {
-        "date": "16 Mar 2014", "title": "Crimean Referendum Held Under Occupation", "type": "Political/Legal",
-        "actors": ["Crimean de facto authorities", "Crimean voters", "Russia"], "location": "Crimea (all districts)",
-        "summary": "Crimea holds a hastily organized referendum on its status, under heavy military presence with checkpoints at polling stations. The choice is union with Russia or reverting to Crimea's 1992 constitution (no option to remain with Ukraine). The official result claims 95-97% in favor of joining Russia with an 83% turnout; however, most Western governments denounce the vote as illegitimate." # Standardized hyphen
-    },
-    {
-        "date": "17 Mar 2014", "title": "Crimea Moves to Annexation; Western Sanctions Begin", "type": "Political & Intl. Response",
-        "actors": ["Crimean Parliament", "Russia", "EU", "USA"], "location": "Simferopol; Moscow; Brussels; Washington",
-        "summary": "The day after the referendum, Crimea's parliament formally declares independence and appeals to join the Russian Federation. President Putin recognizes the 'Republic of Crimea' as a sovereign state, clearing a legal path to annexation. In response, the United States and European Union impose their first sanctions, including asset freezes and travel bans, while Ukraine recalls its ambassadors from Moscow."
-    },
-    {
-        "date": "18 Mar 2014", "title": "Treaty of Accession: Russia Annexes Crimea", "type": "Diplomatic/Legal",
-        "actors": ["Vladimir Putin", "Sergey Aksyonov", "Russian Parliament"], "location": "Moscow",
-        "summary": "In a celebratory Kremlin ceremony, Putin and Crimean separatist leaders sign the Treaty of Accession, formally annexing Crimea and Sevastopol into the Russian Federation. Western governments protest that the move violates international law and Ukraine's sovereignty. Shortly after, armed men storm a Ukrainian military base, marking the first combat fatality."
-    },
-    {
-        "date": "20-21 Mar 2014", "title": "Annexation Legalized in Russian Law", "type": "Legal",
-        "actors": ["Russian State Duma & Federation Council"], "location": "Moscow",
-        "summary": "Russia's Federal Assembly ratifies the accession treaty. On 20 March, the State Duma votes overwhelmingly and on 21 March the Federation Council unanimously approves it. Putin signs the final law, absorbing Crimea and Sevastopol as new subjects of the Russian Federation."
-    },
-    {
-        "date": "24 Mar 2014", "title": "G7 Nations Suspend Russia from G8", "type": "Diplomatic",
-        "actors": ["G7 (USA, UK, France, Germany, Italy, Canada, Japan) & EU"], "location": "The Hague (Netherlands)",
-        "summary": "Leaders of the G7 expel Russia from the G8 forum, canceling the planned Sochi summit and moving meetings to Brussels as a G7-only event. This action symbolizes Russia's growing diplomatic isolation."
-    },
-    {
-        "date": "27 Mar 2014", "title": "UN General Assembly Deems Referendum Invalid", "type": "Diplomatic/Legal",
-        "actors": ["UN General Assembly (193 member states)"], "location": "New York (UN HQ)",
-        "summary": "The UN General Assembly votes 100-11 (with 58 abstentions) to affirm Ukraine's territorial integrity and declare the referendum void. The resolution calls on states not to recognize any change in Crimea's status, highlighting Russia's international isolation." # Standardized hyphen
-    },
-    {
-        "date": "15 Apr 2014", "title": "Kyiv Declares Crimea 'Occupied Territory'", "type": "Legal/Political",
-        "actors": ["Ukraine (Parliament & Gov't)", "Arseniy Yatsenyuk"], "location": "Kyiv (Ukraine)",
-        "summary": "Ukraine's parliament adopts Law 1207-VII, designating Crimea and Sevastopol as 'temporarily occupied' by Russia. Acting Prime Minister Yatsenyuk vows that 'Crimea has been, is, and will be Ukrainian,' reinforcing non-recognition even as Russian control continues."
-    },
-    {
-        "date": "22 Apr - 3 May 2014", "title": "Tatar Leader Barred; Standoff at Crimea Border", "type": "Political/Human Rights",
-        "actors": ["Mustafa Dzhemilev", "Crimean authorities", "Crimean Tatar community"], "location": "Crimea (Armyansk checkpoint)",
-        "summary": "Crimea's authorities ban veteran Tatar leader Mustafa Dzhemilev from entering for five years. When Dzhemilev attempts to return on 3 May, thousands of Crimean Tatars gather at the border, leading to a tense standoff as security units block his entry. In the aftermath, over 100 Tatars are charged with administrative offenses."
-    },
-    {
-        "date": "16-18 May 2014", "title": "Defying Ban, Tatars Commemorate Deportation Anniversary", "type": "Civil/Human Rights",
-        "actors": ["Crimean Tatars (Mejlis)", "Sergey Aksyonov (Crimea PM)"], "location": "Simferopol (Crimea)",
-        "summary": "Despite a decree banning mass gatherings, thousands of Tatars defy the ban on 18 May to commemorate their 1944 deportation. Tatar leaders address the crowd as authorities watch, underscoring their precarious situation under Russian occupation."
-    },
-    {
-        "date": "25 May 2014", "title": "New Ukrainian President Elected, Vows to Reclaim Crimea", "type": "Political",
-        "actors": ["Petro Poroshenko", "Ukrainian voters", "Russian gov't"], "location": "Ukraine (nationwide)",
-        "summary": "An early presidential election is held. Petro Poroshenko wins decisively and, during his inauguration on 7 June, declares 'Crimea was, is, and will be Ukrainian.' His stance reinforces Ukraine's long-term claim despite Russia's administrative control."
-    }
-]
-actors = [
-    {"name": "Russia (Russian Federation)", "type": "Country (Aggressor)", "role": "Initiated and executed the annexation of Crimea. Deployed covert troops ('little green men') and authorized force via parliamentary vote. Integrated Crimea as a federal subject after the referendum. President Putin framed the takeover as correcting a historical wrong.", "events": ["Russian Troops and 'Self-Defense' Forces Take Control", "Russia Authorizes Use of Force in Ukraine", "Treaty of Accession: Russia Annexes Crimea"]},
-    {"name": "Ukraine (post-revolution interim government)", "type": "Country (Victim State)", "role": "Opposed separatist moves at every step. Declared Russia's actions a military invasion and maintained that Crimea remained Ukrainian, passing laws designating it 'occupied.'", "events": ["Ukrainian President Ousted by Parliament", "Standoff - Ukraine Isolated; OSCE Observers Blocked", "Kyiv Declares Crimea 'Occupied Territory'"]},
-    {"name": "United States", "type": "Country (International Responder)", "role": "Led Western condemnation and sanctions. Imposed travel bans and asset freezes on Russian officials and separatist leaders.", "events": ["UN Security Council Draft Resolution Vetoed by Russia", "Crimea Moves to Annexation; Western Sanctions Begin", "G7 Nations Suspend Russia from G8"]},
-    {"name": "European Union (EU) and G7", "type": "Supranational Union / Economic bloc", "role": "Condemned Russia's actions and implemented coordinated sanctions. Declared the referendum illegal and suspended Russia from the G8.", "events": ["Crimea Moves to Annexation; Western Sanctions Begin", "G7 Nations Suspend Russia from G8"]},
-    {"name": "United Nations", "type": "International Organization", "role": "Served as a global forum; passed Resolution 68/262 affirming Ukraine's territorial integrity and declaring the referendum void.", "events": ["UN Security Council Draft Resolution Vetoed by Russia", "UN General Assembly Deems Referendum Invalid"]},
-    {"name": "NATO (North Atlantic Treaty Organization)", "type": "Military Alliance", "role": "Condemned Russia's intervention as a breach of international law and boosted defenses in Eastern Europe.", "events": ["Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "OSCE (Organization for Security & Co-operation in Europe)", "type": "International Organization", "role": "Deployed observers to monitor events in Crimea, though they were blocked by Russian forces.", "events": ["Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "Crimean Supreme Council (Parliament)", "type": "Regional Legislative Body", "role": "Seized by armed men and used as a rubber-stamp to vote for secession and join Russia.", "events": ["Armed Men Seize Crimean Parliament; New PM Installed", "Crimean Parliament Votes to Secede and Join Russia", "Crimea's 'Declaration of Independence'", "Crimean Referendum Held Under Occupation"]},
-    {"name": "City of Sevastopol Administration", "type": "Local Government (City)", "role": "Formed a parallel administration; elected Aleksei Chaly as de facto mayor.", "events": ["Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "Crimea's 'Declaration of Independence'"]},
-    {"name": "Russian Armed Forces (Black Sea Fleet)", "type": "Military", "role": "Physically occupied Crimea by seizing key sites and blockading Ukrainian bases.", "events": ["Russian Troops and 'Self-Defense' Forces Take Control", "Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "Crimean Tatars and Mejlis", "type": "Ethnic/Cultural Group", "role": "Strongly opposed the annexation. Organized protests and later faced repression.", "events": ["Clashes at Crimean Parliament between Rival Rallies", "Tatar Leader Barred; Standoff at Crimea Border", "Defying Ban, Tatars Commemorate Deportation Anniversary"]},
-    {"name": "Crimean 'Self-Defense' Forces", "type": "Paramilitary Militia", "role": "Local militias that operated alongside Russian troops to secure the region.", "events": ["Russian Troops and 'Self-Defense' Forces Take Control", "Tatar Leader Barred; Standoff at Crimea Border"]},
-    {"name": "Ukraine (Yanukovych gov't)", "type": "Country (Pre-Revolution Gov't)", "role": "The government before Euromaidan climax.", "events": ["Ukraine Drops EU Deal; Protests Begin (Euromaidan)"]},
-    {"name": "EU", "type": "Supranational Union", "role": "Intended partner for the EU Association Agreement.", "events": ["Ukraine Drops EU Deal; Protests Begin (Euromaidan)", "Crimea Moves to Annexation; Western Sanctions Begin", "G7 Nations Suspend Russia from G8"]}, # Merged events
-    {"name": "Protesters", "type": "Group (Civil)", "role": "Euromaidan demonstrators.", "events": ["Deadly Clashes in Kyiv ('Maidan Massacre')"]},
-    {"name": "Ukraine security forces", "type": "State Force", "role": "Security forces under Yanukovych.", "events": ["Deadly Clashes in Kyiv ('Maidan Massacre')"]},
-    {"name": "Ukraine (Parliament)", "type": "National Legislative Body", "role": "The legislature that ousted Yanukovych.", "events": ["Ukrainian President Ousted by Parliament", "Kyiv Declares Crimea 'Occupied Territory'"]}, # Merged events
-    {"name": "Sevastopol locals", "type": "Group (Civil)", "role": "Pro-Russian residents of Sevastopol.", "events": ["Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol"]},
-    {"name": "Russian Unity party", "type": "Political Party", "role": "Minor pro-Russian party led by Aksyonov.", "events": ["Clashes at Crimean Parliament between Rival Rallies"]},
-    {"name": "Unmarked Russian special forces", "type": "Military (Covert)", "role": "Initial troops seizing key sites ('Little Green Men').", "events": ["Armed Men Seize Crimean Parliament; New PM Installed"]},
-    {"name": "Crimean self-defense militias", "type": "Paramilitary Militia", "role": "Militias supporting the takeover.", "events": ["Russian Troops and 'Self-Defense' Forces Take Control"]},
-    {"name": "Russian Federation Council", "type": "National Legislative Body (Upper House)", "role": "Approved the use of force.", "events": ["Russia Authorizes Use of Force in Ukraine", "Annexation Legalized in Russian Law"]}, # Merged events
-    {"name": "Ukraine interim government", "type": "National Government (Interim)", "role": "Formed after Yanukovych fled.", "events": ["Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "Russian forces", "type": "Military", "role": "General term for Russian troops.", "events": ["Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "Crimean gov't (Aksyonov)", "type": "Regional Government (De Facto)", "role": "The separatist government installed on 27 Feb.", "events": ["Crimean Parliament Votes to Secede and Join Russia"]},
-    #{"name": "Aleksei Chaly", "type": "Regional Leader (De Facto)", "role": "Elected as de facto mayor of Sevastopol.", "events": ["Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "Crimea's 'Declaration of Independence'"]}, # Covered by Individuals
-    #{"name": "Barack Obama", "type": "Country (International Responder)", "role": "Imposed sanctions and led international opposition.", "events": ["UN Security Council Draft Resolution Vetoed by Russia", "Crimea Moves to Annexation; Western Sanctions Begin", "G7 Nations Suspend Russia from G8"]}, # Covered by Individuals
-    {"name": "Crimean Parliament", "type": "Regional Legislative Body", "role": "Autonomous Republic of Crimea legislature.", "events": ["Clashes at Crimean Parliament between Rival Rallies", "Armed Men Seize Crimean Parliament; New PM Installed", "Crimea Moves to Annexation; Western Sanctions Begin"]},
-    {"name": "Crimean Parliament & Sevastopol Council", "type": "Legislative Bodies (Joint)", "role": "Joint bodies issuing independence declaration.", "events": ["Crimea's 'Declaration of Independence'"]},
-    {"name": "United Nations Security Council (P5: Russia, US, UK, France, China)", "type": "International Body", "role": "UN body where Russia vetoed resolution.", "events": ["UN Security Council Draft Resolution Vetoed by Russia"]},
-    {"name": "Crimean de facto authorities", "type": "Regional Government (De Facto)", "role": "Authorities organizing the referendum.", "events": ["Crimean Referendum Held Under Occupation"]},
-    {"name": "Crimean voters", "type": "Group (Civil)", "role": "Participants in the disputed referendum.", "events": ["Crimean Referendum Held Under Occupation"]},
-    {"name": "USA", "type": "Country (International Responder)", "role": "Imposed sanctions.", "events": ["Crimea Moves to Annexation; Western Sanctions Begin"]},
-    {"name": "Russian Parliament", "type": "National Legislative Body", "role": "Ratified annexation treaty.", "events": ["Treaty of Accession: Russia Annexes Crimea"]},
-    {"name": "Russian State Duma & Federation Council", "type": "National Legislative Bodies", "role": "Both houses legalizing annexation.", "events": ["Annexation Legalized in Russian Law"]},
-    {"name": "G7 (USA, UK, France, Germany, Italy, Canada, Japan) & EU", "type": "International Grouping", "role": "Suspended Russia from G8.", "events": ["G7 Nations Suspend Russia from G8"]},
-    {"name": "UN General Assembly (193 member states)", "type": "International Body", "role": "Passed resolution deeming referendum invalid.", "events": ["UN General Assembly Deems Referendum Invalid"]},
-    {"name": "Ukraine (Parliament & Gov't)", "type": "National Government & Legislature", "role": "Declared Crimea occupied.", "events": ["Kyiv Declares Crimea 'Occupied Territory'"]},
-    {"name": "Crimean authorities", "type": "Regional Government (De Facto)", "role": "Authorities enforcing ban on Dzhemilev.", "events": ["Tatar Leader Barred; Standoff at Crimea Border"]},
-    {"name": "Crimean Tatar community", "type": "Ethnic/Cultural Group", "role": "Community protesting leader's ban.", "events": ["Tatar Leader Barred; Standoff at Crimea Border"]},
-    {"name": "Crimean Tatars (Mejlis)", "type": "Ethnic/Cultural Group", "role": "Community defying ban on commemoration.", "events": ["Defying Ban, Tatars Commemorate Deportation Anniversary"]},
-    #{"name": "Sergey Aksyonov (Crimea PM)", "type": "Regional Leader (De Facto)", "role": "Issued ban on mass gatherings.", "events": ["Defying Ban, Tatars Commemorate Deportation Anniversary"]}, # Covered by Individuals
-    #{"name": "Petro Poroshenko", "type": "Individual", "role": "President of Ukraine from 7 Jun 2014", "events": ["New Ukrainian President Elected, Vows to Reclaim Crimea"]}, # Covered by Individuals
-    {"name": "Ukrainian voters", "type": "Group (Civil)", "role": "Elected Poroshenko.", "events": ["New Ukrainian President Elected, Vows to Reclaim Crimea"]},
-    {"name": "Russian gov't", "type": "National Government", "role": "Government opposing Poroshenko's stance.", "events": ["New Ukrainian President Elected, Vows to Reclaim Crimea"]}
-]
-individuals = [
-    {"name": "Vladimir Putin", "role": "President of Russia", "description": "Principal architect of the annexation", "involvement": "Putin directed the strategy to take Crimea: on 22-23 Feb he convened security chiefs and declared 'we must start working on returning Crimea to Russia.' He deployed special forces and later signed the accession treaty on 18 Mar, framing the move as correcting a historical injustice.", "events": ["Russia Authorizes Use of Force in Ukraine", "Treaty of Accession: Russia Annexes Crimea"]},
-    {"name": "Sergey Aksyonov", "role": "Crimean Prime Minister", "description": "Pro-Russian politician installed as leader of Crimea", "involvement": "Elevated on 27 Feb during the coup at the parliament, he consolidated local power, called for the 16 Mar referendum, signed the accession treaty, and issued ban on mass gatherings.", "events": ["Armed Men Seize Crimean Parliament; New PM Installed", "Russia Authorizes Use of Force in Ukraine", "Crimean Parliament Votes to Secede and Join Russia", "Treaty of Accession: Russia Annexes Crimea", "Defying Ban, Tatars Commemorate Deportation Anniversary"]}, # Consolidated
-    {"name": "Viktor Yanukovych", "role": "President of Ukraine until 22 Feb 2014", "description": "Ousted president whose downfall set the stage", "involvement": "His removal triggered events in both Kyiv and Crimea. He later resurfaced in Russia claiming legitimacy.", "events": ["Ukrainian President Ousted by Parliament"]},
-    {"name": "Oleksandr Turchynov", "role": "Acting President of Ukraine", "description": "Interim head of state after Yanukovych's ouster", "involvement": "Faced the challenge of Crimea and mobilized Ukrainian forces and diplomacy, while avoiding armed escalation.", "events": ["Ukrainian President Ousted by Parliament", "Standoff - Ukraine Isolated; OSCE Observers Blocked"]},
-    {"name": "Barack Obama", "role": "President of the United States", "description": "Led the international response", "involvement": "Warned Russia of costs for intervention and coordinated sanctions with the EU.", "events": ["UN Security Council Draft Resolution Vetoed by Russia", "Crimea Moves to Annexation; Western Sanctions Begin", "G7 Nations Suspend Russia from G8"]},
-    {"name": "Mustafa Dzhemilev", "role": "Former Chairman of Crimean Tatar Mejlis", "description": "Iconic leader of the Crimean Tatars", "involvement": "Urged peaceful resistance and boycotted the referendum; later was barred from Crimea, sparking a tense border standoff.", "events": ["Tatar Leader Barred; Standoff at Crimea Border"]},
-    {"name": "Refat Chubarov", "role": "Chairman of the Mejlis of Crimean Tatars", "description": "Leader of the Crimean Tatar community", "involvement": "Coordinated resistance, organized protests, and defied bans on commemorations.", "events": ["Clashes at Crimean Parliament between Rival Rallies", "Defying Ban, Tatars Commemorate Deportation Anniversary"]},
-    {"name": "Aleksei Chaly", "role": "De facto Mayor of Sevastopol", "description": "Local pro-Russian businessman", "involvement": "Installed as mayor by pro-Russian crowds; organized self-defense units and coordinated with Russian forces.", "events": ["Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "Crimea's 'Declaration of Independence'"]},
-    {"name": "Arseniy Yatsenyuk", "role": "Acting Prime Minister of Ukraine", "description": "Head of the interim government", "involvement": "Vowed that Crimea remains Ukrainian and signed the occupied territory law.", "events": ["Kyiv Declares Crimea 'Occupied Territory'"]},
-    {"name": "Petro Poroshenko", "role": "President of Ukraine from 7 Jun 2014", "description": "Elected president who vowed to reclaim Crimea", "involvement": "Won the May 2014 election and reinforced Ukraine's claim to Crimea.", "events": ["New Ukrainian President Elected, Vows to Reclaim Crimea"]}
-]
-causal_links = [
-    {"source_event": "Ukraine Drops EU Deal; Protests Begin (Euromaidan)", "target_event": "Deadly Clashes in Kyiv ('Maidan Massacre')", "relationship": "Escalation", "description": "The suspension of EU agreement plans sparked initial protests that escalated into deadly violence."},
-    {"source_event": "Deadly Clashes in Kyiv ('Maidan Massacre')", "target_event": "Ukrainian President Ousted by Parliament", "relationship": "Direct Causation", "description": "The loss of life and chaos led to Yanukovych's removal."},
-    {"source_event": "Ukrainian President Ousted by Parliament", "target_event": "Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "relationship": "Reaction", "description": "The ousting of Yanukovych triggered pro-Russian mobilization in Crimea."},
-    {"source_event": "Pro-Russian Rally in Crimea; Parallel Authority in Sevastopol", "target_event": "Clashes at Crimean Parliament between Rival Rallies", "relationship": "Polarization", "description": "Initial demonstrations led to counter-protests and clashes at the parliament."},
-    {"source_event": "Clashes at Crimean Parliament between Rival Rallies", "target_event": "Armed Men Seize Crimean Parliament; New PM Installed", "relationship": "Pretext", "description": "The unrest provided a pretext for Russian forces to seize the parliament."},
-    {"source_event": "Armed Men Seize Crimean Parliament; New PM Installed", "target_event": "Russian Troops and 'Self-Defense' Forces Take Control", "relationship": "Expansion", "description": "After seizing the parliament, Russian forces expanded control over Crimea."},
-    {"source_event": "Russian Troops and 'Self-Defense' Forces Take Control", "target_event": "Russia Authorizes Use of Force in Ukraine", "relationship": "Retroactive Legalization", "description": "Force was later legally authorized by the Russian parliament."},
-    {"source_event": "Russia Authorizes Use of Force in Ukraine", "target_event": "Standoff - Ukraine Isolated; OSCE Observers Blocked", "relationship": "Military Enforcement", "description": "Authorization allowed Russian forces to block international observers."},
-    {"source_event": "Standoff - Ukraine Isolated; OSCE Observers Blocked", "target_event": "Crimean Parliament Votes to Secede and Join Russia", "relationship": "Political Cover", "description": "The absence of external oversight enabled a vote for secession."},
-    {"source_event": "Crimean Parliament Votes to Secede and Join Russia", "target_event": "Crimea's 'Declaration of Independence'", "relationship": "Legal Preparation", "description": "The vote was followed by a formal declaration to legitimize the move."},
-    {"source_event": "Crimea's 'Declaration of Independence'", "target_event": "UN Security Council Draft Resolution Vetoed by Russia", "relationship": "Diplomatic Confrontation", "description": "The declaration triggered diplomatic action which was vetoed by Russia."},
-    {"source_event": "UN Security Council Draft Resolution Vetoed by Russia", "target_event": "Crimean Referendum Held Under Occupation", "relationship": "Diplomatic Shield", "description": "The veto removed obstacles for the referendum."},
-    {"source_event": "Crimean Referendum Held Under Occupation", "target_event": "Crimea Moves to Annexation; Western Sanctions Begin", "relationship": "Direct Causation", "description": "The referendum result led to the declaration of annexation and subsequent sanctions."},
-    {"source_event": "Crimea Moves to Annexation; Western Sanctions Begin", "target_event": "Treaty of Accession: Russia Annexes Crimea", "relationship": "Formalization", "description": "The annexation was formalized by signing the treaty."},
-    {"source_event": "Treaty of Accession: Russia Annexes Crimea", "target_event": "Annexation Legalized in Russian Law", "relationship": "Legal Implementation", "description": "The treaty was ratified by the Russian parliament."},
-    {"source_event": "Annexation Legalized in Russian Law", "target_event": "G7 Nations Suspend Russia from G8", "relationship": "International Consequence", "description": "The legal ratification triggered diplomatic isolation measures."},
-    {"source_event": "G7 Nations Suspend Russia from G8", "target_event": "UN General Assembly Deems Referendum Invalid", "relationship": "Diplomatic Escalation", "description": "The G7 action led to the UN resolution condemning the referendum."},
-    {"source_event": "UN General Assembly Deems Referendum Invalid", "target_event": "Kyiv Declares Crimea 'Occupied Territory'", "relationship": "Legal Response", "description": "Ukraine responded by designating Crimea as occupied territory."},
-    {"source_event": "Kyiv Declares Crimea 'Occupied Territory'", "target_event": "Tatar Leader Barred; Standoff at Crimea Border", "relationship": "Tension Escalation", "description": "Ukraine's legal stance led to increased repression of dissent in Crimea."},
-    {"source_event": "Tatar Leader Barred; Standoff at Crimea Border", "target_event": "Defying Ban, Tatars Commemorate Deportation Anniversary", "relationship": "Resistance", "description": "The barring of Tatar leaders spurred defiant commemorations."},
-    {"source_event": "Defying Ban, Tatars Commemorate Deportation Anniversary", "target_event": "New Ukrainian President Elected, Vows to Reclaim Crimea", "relationship": "Policy Continuation", "description": "The continuing unrest influenced Ukraine's electoral choices."}
-]
+# Load, date parsing, entity resolution, graph store and search index come from the prepared-graph
+# snapshot (snapshot.py): built once, large arrays memory-mapped and shared by all gunicorn workers
+prepared = load_prepared(os.environ.get('CONFLICT_DATASET'), actor_edge_min_weight=ACTOR_EDGE_MIN_WEIGHT, debug=debug_mode)
+dataset_meta = prepared['metadata']
+entity_resolution_report = prepared['resolution_report']
+print_resolution_report(entity_resolution_report, debug=debug_mode)
 
 # ------------------------------------------------------------------------------
 # DataFrame conversions and derived lists/sets
 # ------------------------------------------------------------------------------
-events_df = pd.DataFrame(events)
-events_df['date_parsed'] = events_df['date'].apply(parse_date)
-events_df = events_df.sort_values('date_parsed').reset_index(drop=True)
+events_df = prepared['events'] # Dates parsed ('date_parsed', 'date_end'), sorted, actor names resolved
 timeline_df = events_df.copy()
 timeline_df['date_str'] = timeline_df['date_parsed'].dt.strftime('%Y-%m-%d')
 timeline_df['actors_str'] = timeline_df['actors'].apply(lambda x: ', '.join(x) if isinstance(x, list) else "")
 
-actors_df = pd.DataFrame(actors)
-actors_df['events'] = actors_df['events'].apply(lambda x: x if isinstance(x, list) else [])
-individuals_df = pd.DataFrame(individuals)
-individuals_df['events'] = individuals_df['events'].apply(lambda x: x if isinstance(x, list) else [])
-causal_links_df = pd.DataFrame(causal_links)
+actors_df = prepared['actors'] # List columns are normalized to lists by the loader
+individuals_df = prepared['individuals']
+causal_links_df = prepared['causal_links']
 
-node_types = { "Event": "#4285F4", "Actor": "#EA4335", "Country": "#FBBC05", "Organization": "#34A853", "Individual": "#8F44AD", "Location": "#F39C12", "Method": "#3498DB", "Outcome": "#E74C3C" }
+# Dataset-specific display settings
+key_events_df = events_df[events_df['title'].isin(dataset_meta['key_events'])] if dataset_meta['key_events'] else events_df
 
-# Prepare node/edge lists for Cytoscape (base data)
-event_nodes = []
-for _, r in events_df.iterrows():
-    details = r.to_dict()
-    details.pop('title', None) # Remove fields already used in primary data
-    details.pop('date_parsed', None)
-    event_nodes.append({'id': r['title'], 'label': r['title'], 'type': 'Event', 'color': node_types['Event'], 'details_dict': details})
+node_types = NODE_TYPES
 
-actor_nodes = []
-for _, r in actors_df.iterrows():
-    type_str = r.get('type', '')
-    color = node_types['Actor']
-    node_class = 'Actor'
-    if "Country" in type_str: color, node_class = node_types['Country'], 'Country'
-    elif any(sub in type_str for sub in ["Organization", "Union", "Alliance", "Body", "Legislative", "Force", "Military", "Paramilitary", "Group", "Party", "Community", "Government", "Grouping", "Council", "Administration"]):
-        color, node_class = node_types['Organization'], 'Organization'
-    details = r.to_dict()
-    details.pop('name', None)
-    actor_nodes.append({'id': r['name'], 'label': r['name'], 'type': node_class, 'color': color, 'details_dict': details})
+# Node lists and the edge store for Cytoscape (base data) - built column-wise, see graph_builder.py
+# Edges live in int32 NumPy arrays (graph_store.py); edge dicts are only materialized when serialized
+graph_base = prepared['graph']
+graph_store = graph_base['store']
+event_nodes, actor_nodes, individual_nodes = graph_base['event_nodes'], graph_base['actor_nodes'], graph_base['individual_nodes']
+all_nodes_base = graph_base['all_nodes_base']
 
-individual_nodes = []
-for _, r in individuals_df.iterrows():
-    details = r.to_dict()
-    details.pop('name', None)
-    individual_nodes.append({'id': r['name'], 'label': r['name'], 'type': 'Individual', 'color': node_types['Individual'], 'details_dict': details})
+causal_edges = graph_base['causal_edges']
+actor_event_edges, individual_event_edges = graph_base['actor_event_edges'], graph_base['individual_event_edges']
 
-all_nodes_base = event_nodes + actor_nodes + individual_nodes
-node_ids = {n['id'] for n in all_nodes_base}
+all_edges_base = graph_base['all_edges_base']
+faro_index = GraphIndex(graph_store, all_nodes_base, ('causal', 'participation')) # O(degree) neighbor lookups for tap/search
+node_search = prepared['search_index'] # Inverted index over labels and detail text (search inputs, /api/graph/search)
+causal_index = prepared['causal'] # Precomputed reachability over the causal links: ancestors, descendants, paths, chains
 
-causal_edges = [{'source': r['source_event'], 'target': r['target_event'], 'label': r['relationship'], 'type': 'causal', 'details_dict': r.to_dict()} for i, r in causal_links_df.iterrows() if r['source_event'] in node_ids and r['target_event'] in node_ids]
 
-actor_event_edges = [{'source': a['id'], 'target': e, 'label': 'involved_in', 'type': 'participation', 'details_dict': {'relation': 'involved_in'}} for a in actor_nodes for e in a['details_dict'].get('events', []) if a['id'] in node_ids and e in node_ids]
-individual_event_edges = [{'source': ind['id'], 'target': e, 'label': 'participated_in', 'type': 'participation', 'details_dict': {'relation': 'participated_in'}} for ind in individual_nodes for e in ind['details_dict'].get('events', []) if ind['id'] in node_ids and e in node_ids]
+# --- Data for Actor-Only Graph (Nodes: Actors/Individuals, Edges: Shared Events) ---
+graph_views = app_graphs(graph_base) # (nodes, edges) per graph: 'faro', 'actor', 'causal'
+# Shared-event edges from the sparse actor x event incidence product (see graph_builder.co_participation)
+actor_individual_nodes_cy, actor_actor_edges_cy = graph_views['actor']
+actor_index = GraphIndex(graph_store, actor_individual_nodes_cy, ('shared_event',))
 
-all_edges_base = causal_edges + actor_event_edges + individual_event_edges
+# --- Server-side layouts: computed into the disk cache by the build step (snapshot.warm_layouts), read back here ---
+layout_engine = register_layouts(LayoutEngine(debug=debug_mode), prepared)
+FARO_LAYOUTS, ACTOR_LAYOUTS, CAUSAL_LAYOUTS = GRAPH_LAYOUTS['faro'], GRAPH_LAYOUTS['actor'], GRAPH_LAYOUTS['causal']
 
+# --- Network metrics (centrality, communities): computed in the snapshot build step (snapshot.compute_metrics) ---
+metric_element_data = prepared['metrics']['element_data'] # node id -> '<graph>_<metric>' fields for the stylesheets
+actor_metrics = prepared['metrics']['actor'] # node id -> {metric: value} in the actor co-participation graph
 
-# --- Data for Actor-Only Graph (Nodes: Actors/Individuals, Edges: Shared Events) ---
-actor_individual_nodes_cy = [n for n in all_nodes_base if n['type'] in ['Country', 'Organization', 'Individual', 'Actor']]
-actor_individual_ids = {n['id'] for n in actor_individual_nodes_cy}
-actor_actor_edges_cy = []
-event_participants = {}
-for edge in actor_event_edges + individual_event_edges: event_participants.setdefault(edge['target'], set()).add(edge['source'])
-shared_event_links = {}
-for event, participants in event_participants.items():
-    participants_list = sorted(list(p for p in participants if p in actor_individual_ids))
-    for i in range(len(participants_list)):
-        for j in range(i + 1, len(participants_list)): shared_event_links.setdefault(tuple(sorted((participants_list[i], participants_list[j]))), set()).add(event)
-for (u, v), events_set in shared_event_links.items(): actor_actor_edges_cy.append({'source': u, 'target': v, 'label': f"{len(events_set)} shared", 'type': 'shared_event', 'details_dict': {'shared_events': list(events_set)}})
+# --- Cytoscape elements serialized once (details_json, metric fields etc.); views select from this cache ---
+element_cache = ElementCache(graph_store, node_data=metric_element_data)
+faro_time_index = TemporalIndex(graph_store, all_nodes_base, all_edges_base, events_df['title'], events_df['date_parsed']) # FARO elements by activation date (time slider)
+faro_groups = NodeGroups(graph_store, all_nodes_base, all_edges_base) # Actors collapsed by type into super-nodes (grouped view)
 
 # ------------------------------------------------------------------------------
 # DASH APPLICATION SETUP
 # ------------------------------------------------------------------------------
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 server = app.server
+# JSON graph queries for other dashboards (/api/graph/...), backed by the FARO index and element cache
+graph_api_cache = register_graph_api(server, faro_index, element_cache, event_dates=events_df.set_index('title')[['date_parsed', 'date_end']], layout_engine=layout_engine, search_index=node_search)
 app.config.suppress_callback_exceptions = True
 
 # ------------------------------------------------------------------------------
@@ -392,436 +168,1167 @@ default_stylesheet = [
     {'selector': 'node:selected', 'style': { 'border-width': 4, 'border-color': 'black', 'border-opacity': 1, 'opacity': 1, 'z-index': 9999, 'font-weight': 'bold' }},
     {'selector': 'edge:selected', 'style': { 'width': 4, 'line-color': 'black', 'opacity': 1, 'z-index': 9998 }},
     {'selector': 'node:hover', 'style': { 'border-width': 3, 'border-color': '#333', 'border-opacity': 1, 'opacity': 1, 'font-weight': 'bold', 'shadow-blur': 5, 'shadow-color': '#333', 'shadow-opacity': 0.5 }},
-    {'selector': 'edge:hover', 'style': { 'width': 3, 'line-color': '#333', 'opacity': 1 }}
+    {'selector': 'edge:hover', 'style': { 'width': 3, 'line-color': '#333', 'opacity': 1 }},
+    {'selector': '.Group', 'style': { 'shape': 'round-rectangle', 'border-width': 3, 'border-style': 'double', 'font-weight': 'bold' }}, # Collapsed actor group (super-node)
+    {'selector': '.Group.expanded', 'style': { 'background-opacity': 0.12, 'border-style': 'dashed', 'text-valign': 'top', 'padding': '20px' }}, # Compound parent of its members
+    {'selector': '.bundled', 'style': { 'line-style': 'solid', 'width': 'mapData(width, 1, 5, 1.5, 6)', 'opacity': 0.7 }}, # Stands for several edges (weight)
+    {'selector': f'.{HIDDEN_CLASS}', 'style': { 'display': 'none' }}, # Bundled edges of an expanded group (grouped view)
+    {'selector': f'.{MEMBER_CLASS}:orphan', 'style': { 'display': 'none' }}, # Members of a collapsed group; their edges hide with them
+    {'selector': '.recent', 'style': { 'border-width': 4, 'border-color': '#FF6D00', 'line-color': '#FF6D00', 'target-arrow-color': '#FF6D00', 'z-index': 9990 }} # Added by the last time-slider move / playback frame
 ]
 
-# --- Helper function to update stylesheet font size ---
-def update_stylesheet_font_size(base_stylesheet, font_size):
-    """Creates a deep copy of the stylesheet and updates the node font size."""
-    updated_stylesheet = copy.deepcopy(base_stylesheet)
-    try:
-        for style in updated_stylesheet:
-            if style.get('selector') == 'node':
-                style['style']['font-size'] = f'{font_size}px'
-                break # Found the node style
-    except Exception as e:
-        print(f"Error updating stylesheet font size: {e}")
-    return updated_stylesheet
+# Font size is applied in the browser (setFontSize in assets/clientside.js)
+
+# --- Metric mappings: rules appended to the base stylesheet in the browser (nodeStyle in assets/clientside.js) ---
+NODE_SIZE_OPTIONS = [{'label': 'Type', 'value': 'type'}] + [{'label': m.capitalize(), 'value': m} for m in CENTRALITY_METRICS]
+NODE_COLOUR_OPTIONS = [{'label': 'Type', 'value': 'type'}, {'label': 'Community', 'value': 'community'}]
+COMMUNITY_COLORS = ['#4285F4', '#DB4437', '#F4B400', '#0F9D58', '#AB47BC', '#00ACC1', '#FF7043', '#9E9D24', '#5C6BC0', '#F06292'] # Largest communities; the rest are grey
+
+
+def node_styles(graph_name):
+    """Base stylesheet plus the size/colour rules for each metric option of a graph (element fields '<graph>_<metric>')."""
+    size_rules = {m: [{'selector': 'node', 'style': {'width': f'mapData({graph_name}_{m}, 0, 1, 12, 60)', 'height': f'mapData({graph_name}_{m}, 0, 1, 12, 60)'}}] for m in CENTRALITY_METRICS}
+    community_rules = [{'selector': 'node', 'style': {'background-color': '#BDBDBD'}}] + [{'selector': f'node[{graph_name}_community = {c}]', 'style': {'background-color': color}} for c, color in enumerate(COMMUNITY_COLORS)]
+    return {'base': default_stylesheet, 'size': size_rules, 'colour': {'community': community_rules}}
 
 
 # --- Cytoscape Element Generation ---
-def create_cytoscape_elements(nodes_list=None, edges_list=None, graph_type='faro'):
+def create_cytoscape_elements(nodes_list=None, edges_list=None, graph_type='faro', positions=None):
     """
-    Generates Cytoscape elements list from provided nodes and edges.
+    Generates Cytoscape elements list from provided nodes and edges (serialized data comes from element_cache).
     graph_type distinguishes between 'faro' (all types) and 'actor' (actor/individual + shared event links).
+    positions (node id -> {'x', 'y'}) are attached to nodes for use with the 'preset' layout.
     """
     nodes_to_use = nodes_list if nodes_list is not None else (actor_individual_nodes_cy if graph_type == 'actor' else all_nodes_base)
     edges_to_use = edges_list if edges_list is not None else (actor_actor_edges_cy if graph_type == 'actor' else all_edges_base)
 
-    elements = []
-    node_ids_in_set = {n['id'] for n in nodes_to_use}
-
-    # Add nodes
-    for node in nodes_to_use:
-        details = node.get('details_dict', {}) # Use pre-processed details dict
-        node_data_cy = {
-            'id': node['id'],
-            'label': node['label'],
-            'type': node['type'],
-            'size': 30 if node['type'] == 'Event' else (25 if node['type'] in ['Country', 'Organization'] else (15 if node['type'] == 'Individual' else 20)),
-            'details_json': json.dumps(details, default=str) # Store details as JSON string for callbacks
-        }
-        elements.append({'data': node_data_cy, 'classes': node['type']}) # Use node type as class
-
-    # Add edges
-    for edge in edges_to_use:
-        if edge['source'] in node_ids_in_set and edge['target'] in node_ids_in_set:
-            details = edge.get('details_dict', {})
-            edge_data = {
-                'source': edge['source'],
-                'target': edge['target'],
-                'label': edge.get('label', ''),
-                'edge_type': edge['type'],
-                'details_json': json.dumps(details, default=str)
-            }
-            # Assign width based on type
-            if edge['type'] == 'shared_event': edge_data['width'] = min(1 + len(details.get('shared_events', [])), 5)
-            elif edge['type'] == 'causal': edge_data['width'] = 2.5
-            else: edge_data['width'] = 1.5 # participation
-
-            elements.append({'data': edge_data, 'classes': edge['type']})
+    return element_cache.elements(nodes_to_use, edges_to_use, positions)
+
+
+# --- Full-graph views (memoized per layout) ---
+def graph_view_elements(graph_name, layout_name):
+    """Elements of a whole registered graph ('faro', 'actor', 'causal') with positions; built once per layout."""
+    nodes, edges = graph_views[graph_name]
+    return element_cache.view((graph_name, layout_name), lambda: element_cache.elements(nodes, edges, layout_engine.positions(graph_name, layout_name)))
+
+
+# --- Precomputed positions for a (sub)graph view ---
+def view_positions(graph_name, layout_name, nodes, edges):
+    """Positions for the visible nodes: reused from the cached full-graph layout, only unseen nodes get placed."""
+    full_positions = layout_engine.positions(graph_name, layout_name)
+    return layout_engine.place_new_nodes(full_positions, nodes, edges)
+
+
+# --- View descriptors (what the client shows), resolved server-side via the graph indexes ---
+FULL_VIEW = {'mode': 'full'}
+graph_indexes = {'faro': faro_index, 'actor': actor_index}
+
+
+def view_graph(graph_name, view):
+    """(nodes, edges) for a view descriptor: {'mode': 'full'}, {'mode': 'focus', 'node': id} or {'mode': 'search', 'search': term}."""
+    nodes, edges = graph_views[graph_name]
+    index = graph_indexes[graph_name]
+    if view.get('mode') == 'focus': return index.neighborhood(view['node'])
+    if view.get('mode') == 'search':
+        matched = index.nodes_for(node_search.search(view['search'])) # Base order; ids outside this graph are skipped
+        return matched, index.induced_edges({n['id'] for n in matched})
+    return nodes, edges
+
+
+def view_elements(graph_name, view, layout_name):
+    if view.get('mode', 'full') == 'full': return graph_view_elements(graph_name, layout_name) # Memoized full view
+    nodes, edges = view_graph(graph_name, view)
+    return create_cytoscape_elements(nodes_list=nodes, edges_list=edges, graph_type=graph_name, positions=view_positions(graph_name, layout_name, nodes, edges))
+
+
+# --- Per-session view cache (elements + details panel of recently shown views) and breadcrumb trail ---
+view_cache = SessionViewCache()
+
+
+def cached_view(session_id, graph_name, view, layout_name, panel):
+    """(elements, details panel) for a view; served from this session's cache when it was shown recently."""
+    return view_cache.view(session_id, view_key(graph_name, view, layout_name), lambda: (view_elements(graph_name, view, layout_name), panel(view)))
+
+
+def view_label(graph_name, view):
+    if view.get('mode') == 'focus':
+        node = graph_indexes[graph_name].get_node(view['node'])
+        return node['label'] if node else view['node']
+    if view.get('mode') == 'search': return f"Search: {view['search']}"
+    return "Full graph"
+
+
+def breadcrumb(graph_name, history):
+    """Full graph > view > view ...; every crumb but the current one jumps back to that view."""
+    views = [FULL_VIEW] + list(history or [])
+    crumbs = []
+    for index, view in enumerate(views):
+        if crumbs: crumbs.append(html.Span(" > ", style={'color': '#888'}))
+        if index == len(views) - 1: crumbs.append(html.Strong(view_label(graph_name, view), style={'padding': '0 4px'}))
+        else: crumbs.append(html.Button(view_label(graph_name, view), id={'type': 'view-crumb', 'graph': graph_name, 'index': index - 1}, n_clicks=0, className="btn btn-link btn-sm", style={'padding': '0 4px'}))
+    return crumbs
+
+
+def navigation_target(graph_name, history):
+    """(view, history) when the trigger was this graph's back button or one of its crumbs, else None."""
+    ctx = dash.callback_context
+    if ctx.triggered_id == f'{graph_name}-back-btn': return back_view(history)
+    if isinstance(ctx.triggered_id, dict) and ctx.triggered_id.get('type') == 'view-crumb':
+        if not ctx.triggered[0]['value']: raise PreventUpdate # Crumb just rendered, not clicked
+        return crumb_view(history, ctx.triggered_id['index'])
+    return None
+
+
+# --- Time slider and playback (FARO): the graph as of a date is a prefix of the time-ordered elements ---
+# Slider stops are the dates of all events (faro_time_index.steps); an event-type filter gets its own index,
+# element order and playback frames, built once per type set. Moves send only the delta as a Patch.
+TIME_VIEW = {'mode': 'time'}
+TIME_SLIDER_MARKS = 8
+TIME_FILTER_CACHE_SIZE = 16
+PLAYBACK_SPEEDS = [1, 2, 5, 10] # Frames per second
+PLAYBACK_STRIDES = {'Day': 1, 'Week': 7, 'Month': 30} # At most one frame per stride
+event_type_of = dict(zip(events_df['title'], events_df['type']))
+time_views = LRUCache(TIME_FILTER_CACHE_SIZE)
+
+
+def time_view(types, layout_name):
+    """{'index', 'elements', 'frames'} for the FARO graph limited to events of `types` (all if empty), with a layout's positions."""
+    key = (tuple(sorted(types or [])), layout_name)
+    cached = time_views.get(key)
+    if cached is None:
+        if types:
+            nodes = [n for n in all_nodes_base if n['type'] != 'Event' or event_type_of.get(n['id']) in types]
+            events = events_df[events_df['type'].isin(types)] # Only these events activate their actors
+            index = TemporalIndex(graph_store, nodes, all_edges_base, events['title'], events['date_parsed'])
+            full = element_cache.elements(nodes, all_edges_base, layout_engine.positions('faro', layout_name))
+        else: index, full = faro_time_index, graph_view_elements('faro', layout_name)
+        cached = {'index': index, 'elements': index.time_ordered(full), 'frames': {}}
+        time_views.put(key, cached)
+    return cached
+
+
+def playback_frames(types, layout_name, stride):
+    """Slider stops playback visits for a filter set and stride, precomputed once."""
+    view = time_view(types, layout_name)
+    if stride not in view['frames']: view['frames'][stride] = view['index'].frames(faro_time_index.steps, PLAYBACK_STRIDES.get(stride, 1))
+    return view['frames'][stride]
+
+
+def time_slider_marks():
+    steps = len(faro_time_index.steps)
+    if not steps: return {}
+    span = int(faro_time_index.steps[-1] - faro_time_index.steps[0])
+    date_format = '%b %Y' if span > 90 else '%d %b'
+    return {int(i): pd.Timestamp(faro_time_index.step_date(i)).strftime(date_format) for i in np.unique(np.linspace(0, steps - 1, min(TIME_SLIDER_MARKS, steps)).round().astype(int))}
+
+
+def highlighted(element):
+    return {**element, 'classes': element.get('classes', '') + ' recent'} # Copy: cached elements are shared
+
+
+def time_elements_update(step, layout_name, types, time_state):
+    """
+    (elements or Patch, new state) showing the graph as of slider stop `step`. time_state ({'layout', 'types',
+    'count', 'recent'}) is what the browser holds: moving forward extends it with the new elements (highlighted
+    until the next move), a short step back deletes from its end. Anything else resends the prefix.
+    """
+    view = time_view(types, layout_name)
+    elements = view['elements']
+    day = faro_time_index.steps[min(max(int(step), 0), len(faro_time_index.steps) - 1)] if len(faro_time_index.steps) else 0
+    count = view['index'].count_at(day)
+    state = {'layout': layout_name, 'types': sorted(types or []), 'count': count, 'recent': None}
+    if not time_state or time_state.get('layout') != layout_name or time_state.get('types') != state['types'] or time_state['count'] - count > TIME_PATCH_MAX_DELETES:
+        return elements[:count], state # First frame, other layout or filter, or a long jump back
+    shown = time_state['count']
+    if count == shown: return dash.no_update, {**state, 'recent': time_state.get('recent')}
+    patch = Patch()
+    recent_start, recent_end = time_state.get('recent') or (0, 0)
+    for i in range(recent_start, min(recent_end, count)): patch[i]['classes'] = elements[i].get('classes', '') # Last move's highlight ends
+    if count > shown:
+        patch.extend([highlighted(e) for e in elements[shown:count]])
+        state['recent'] = [shown, count]
+    else:
+        for _ in range(shown - count): del patch[-1]
+    return patch, state
+
+
+# --- Grouped view (FARO): actors collapsed by type into super-nodes, expanded one group at a time ---
+# Elements are the base (events, causal links) followed by one block per group; a block holds both states with
+# the inactive one hidden, so toggling a group only patches classes (and members' parent) within its block.
+GROUP_VIEW = {'mode': 'grouped'}
+
+
+def group_base_elements(layout_name):
+    return element_cache.view(('faro-groups', layout_name), lambda: faro_groups.base_elements(element_cache, layout_engine.positions('faro', layout_name)))
+
+
+def group_block(group, expanded, layout_name):
+    """A group's elements for a layout, built once per state from the NodeGroups index."""
+    return element_cache.view(('faro-group', group, expanded, layout_name), lambda: faro_groups.block(group, expanded, element_cache, layout_engine.positions('faro', layout_name)))
+
+
+def layout_positions(graph_name, layout_name):
+    """Positions of one layout as sent to the browser; FARO adds the super-node centroids so grouped views are placed too."""
+    positions = layout_engine.positions(graph_name, layout_name)
+    return {**positions, **faro_groups.centroids(positions)} if graph_name == 'faro' else positions
 
+
+def layout_stores(graph_name, default_layout):
+    """Positions store (default layout only; others are fetched when first selected) and the list of layouts it holds."""
+    return [dcc.Store(id=f'{graph_name}-layout-positions', data={default_layout: layout_positions(graph_name, default_layout)}),
+            dcc.Store(id=f'{graph_name}-layouts-loaded', data=[default_layout])]
+
+
+def grouped_elements(layout_name, expanded):
+    elements = list(group_base_elements(layout_name))
+    for group in faro_groups.groups: elements.extend(group_block(group, group in expanded, layout_name))
     return elements
 
 
+def group_elements_update(toggle, layout_name, group_state):
+    """
+    (elements or Patch, new state) for the grouped view with group `toggle` expanded or collapsed (None: all
+    collapsed). group_state ({'layout', 'expanded'}) is what the browser holds; a toggle patches the classes
+    and parents that differ between the group's two states in place. Another layout resends the list.
+    """
+    if not group_state or group_state.get('layout') != layout_name or toggle is None:
+        state = {'layout': layout_name, 'expanded': []}
+        return grouped_elements(layout_name, []), state
+    expanded = group_state['expanded']
+    state = {'layout': layout_name, 'expanded': [g for g in expanded if g != toggle] + ([] if toggle in expanded else [toggle])}
+    offset = len(group_base_elements(layout_name)) + sum(len(group_block(g, False, layout_name)) for g in faro_groups.groups[:faro_groups.groups.index(toggle)])
+    old_block, new_block = group_block(toggle, toggle in expanded, layout_name), group_block(toggle, toggle in state['expanded'], layout_name)
+    patch = Patch()
+    for i, (old, new) in enumerate(zip(old_block, new_block), offset): # Same elements, same order: blocks differ in classes and parents only
+        if old['classes'] != new['classes']: patch[i]['classes'] = new['classes']
+        if old['data'].get('parent') != new['data'].get('parent'): patch[i]['data']['parent'] = new['data'].get('parent')
+    return patch, state
+
+
+def group_panel(state):
+    expanded = state['expanded']
+    return html.Div([
+        html.P("Actors are grouped by type. Click a group to expand or collapse it; click any other node to focus on it."),
+        html.P(f"Expanded: {', '.join(expanded)}" if expanded else "All groups collapsed.", style={'fontWeight': 'bold'})
+    ])
+
+
 # --- Timeline Figure Creation ---
+TIMELINE_COLORS = dataset_meta['event_type_colors'] # Event type -> colour, from dataset.json
+# Above this many events the timeline is drawn as a WebGL marker lane chart instead of one SVG bar per event
+TIMELINE_WEBGL_THRESHOLD = int(os.environ.get('TIMELINE_WEBGL_THRESHOLD', 2000))
+
+
+def style_timeline_figure(fig):
+    """Key date markers, axes and layout shared by both timeline modes."""
+    key_dates = dataset_meta['key_dates']
+    shapes, annotations = [], []
+    min_vis_date = timeline_df['date_parsed'].min() - pd.Timedelta(days=5)
+    max_vis_date = timeline_df['date_parsed'].max() + pd.Timedelta(days=5)
+    for kd in key_dates:
+         try:
+             ts = pd.Timestamp(kd["date"])
+             if min_vis_date <= ts <= max_vis_date:
+                 shapes.append(dict(type="line", xref="x", yref="paper", x0=ts, y0=0, x1=ts, y1=1, line=dict(color="grey", width=1, dash="dash")))
+                 annotations.append(dict(x=ts, y=1.05, yref="paper", showarrow=False, text=kd["label"], font=dict(size=10), align="center"))
+         except Exception as e: print(f"Error processing key date {kd['date']} for timeline markers: {e}")
+    fig.update_layout(
+        shapes=shapes, annotations=annotations, xaxis_type='date',
+        xaxis=dict(tickformat="%d %b\n%Y", title_text="Date", range=[min_vis_date, max_vis_date]),
+        yaxis=dict(title_text="Event Type"), height=600, margin=dict(l=20, r=20, t=50, b=20), title_x=0.5, title_font_size=20,
+        hoverlabel=dict(bgcolor="white", font_size=12, namelength=-1), legend_title_text='Event Types'
+    )
+    return fig
+
+
 def create_timeline_figure(filtered_df=timeline_df):
     if filtered_df.empty:
         fig = go.Figure()
         fig.update_layout(title="No events match filters.", height=600, xaxis={'visible': False}, yaxis={'visible': False})
         return fig
+    if len(filtered_df) > TIMELINE_WEBGL_THRESHOLD: return create_timeline_lanes_figure(filtered_df)
     try:
         df_copy = filtered_df.copy()
         df_copy['date_parsed'] = pd.to_datetime(df_copy['date_parsed'])
-        df_copy['end_date'] = df_copy['date_parsed'] + pd.Timedelta(hours=12)
+        df_copy['end_date'] = pd.to_datetime(df_copy['date_end']) + pd.Timedelta(hours=12) # Ranges span their full length
         fig = px.timeline(
             df_copy, x_start='date_parsed', x_end='end_date', y='type', color='type',
             hover_name='title',
             hover_data={'date': True, 'location': True, 'actors_str': True, 'date_parsed': False, 'end_date': False, 'type': False},
-            labels={"date_parsed": "Date", "type": "Event Type"}, title="Chronology of Crimea Annexation Events",
-            color_discrete_map={ "Political": "#4285F4", "Civil Unrest": "#DB4437", "Civil/Political": "#F4B400", "Military/Political": "#0F9D58", "Military": "#AB47BC", "Diplomatic/Military": "#FF7043", "Political/Legal": "#42A5F5", "Diplomatic": "#FFEE58", "Political & Intl. Response": "#9CCC65", "Diplomatic/Legal": "#FFCA28", "Legal": "#BDBDBD", "Legal/Political": "#BDBDBD", "Political/Human Rights": "#EC407A", "Civil/Human Rights": "#7E57C2" }
-        )
-        key_dates = [{"date": "2014-02-27", "label": "Parliament Seized"}, {"date": "2014-03-16", "label": "Referendum"}, {"date": "2014-03-18", "label": "Annexation"}, {"date": "2014-03-27", "label": "UN Vote"}]
-        shapes, annotations = [], []
-        min_vis_date = timeline_df['date_parsed'].min() - pd.Timedelta(days=5)
-        max_vis_date = timeline_df['date_parsed'].max() + pd.Timedelta(days=5)
-        for kd in key_dates:
-             try:
-                 ts = pd.Timestamp(kd["date"])
-                 if min_vis_date <= ts <= max_vis_date:
-                     shapes.append(dict(type="line", xref="x", yref="paper", x0=ts, y0=0, x1=ts, y1=1, line=dict(color="grey", width=1, dash="dash")))
-                     annotations.append(dict(x=ts, y=1.05, yref="paper", showarrow=False, text=kd["label"], font=dict(size=10), align="center"))
-             except Exception as e: print(f"Error processing key date {kd['date']} for timeline markers: {e}")
-        fig.update_layout(
-            shapes=shapes, annotations=annotations, xaxis_type='date',
-            xaxis=dict(tickformat="%d %b\n%Y", title_text="Date", range=[min_vis_date, max_vis_date]),
-            yaxis=dict(title_text="Event Type"), height=600, margin=dict(l=20, r=20, t=50, b=20), title_x=0.5, title_font_size=20,
-            hoverlabel=dict(bgcolor="white", font_size=12, namelength=-1), legend_title_text='Event Types'
+            labels={"date_parsed": "Date", "type": "Event Type"}, title=dataset_meta['timeline_title'],
+            color_discrete_map=TIMELINE_COLORS
         )
-        return fig
+        return style_timeline_figure(fig)
     except Exception as e: print(f"ERROR in create_timeline_figure: {e}"); traceback.print_exc(); fig = go.Figure(); fig.add_annotation(text=f"Error creating timeline: {e}", showarrow=False); return fig.update_layout(height=600)
 
 
+def create_timeline_lanes_figure(filtered_df=timeline_df):
+    """
+    Large-dataset timeline: one Scattergl marker trace per event type (a lane), each event a marker at its start
+    date. Traces are named by type and carry the title as hovertext, like the px.timeline bars, so the
+    filters and the clickData['points'][0]['hovertext'] lookup in update_timeline work unchanged.
+    """
+    try:
+        fig = go.Figure()
+        type_codes, types = pd.factorize(filtered_df['type']) # Lanes in order of first appearance, as px.timeline does
+        hover_columns = filtered_df[['date', 'location', 'actors_str']].astype(str).to_numpy()
+        for code, event_type in enumerate(types):
+            rows = type_codes == code
+            fig.add_trace(go.Scattergl(
+                x=filtered_df['date_parsed'].to_numpy()[rows], y=np.full(rows.sum(), event_type, dtype=object), mode='markers', name=event_type,
+                marker=dict(color=TIMELINE_COLORS.get(event_type), size=9, opacity=0.8, line=dict(width=0.5, color='white')),
+                hovertext=filtered_df['title'].to_numpy()[rows], customdata=hover_columns[rows],
+                hovertemplate="<b>%{hovertext}</b><br><br>date=%{customdata[0]}<br>location=%{customdata[1]}<br>actors_str=%{customdata[2]}<extra></extra>"
+            ))
+        fig.update_layout(title=dataset_meta['timeline_title'], yaxis=dict(categoryorder='array', categoryarray=list(types)[::-1]))
+        return style_timeline_figure(fig)
+    except Exception as e: print(f"ERROR in create_timeline_lanes_figure: {e}"); traceback.print_exc(); fig = go.Figure(); fig.add_annotation(text=f"Error creating timeline: {e}", showarrow=False); return fig.update_layout(height=600)
+
+
+# --- Cached timeline: base figure built once, filters applied as trace visibility / x range ---
+timeline_cache = {}
+timeline_type_codes, timeline_types = pd.factorize(timeline_df['type'])
+timeline_dates = timeline_df['date_parsed'].to_numpy()
+TIMELINE_PADDING = pd.Timedelta(days=5) # Around the full date range, as in create_timeline_figure
+
+
+def timeline_base_figure():
+    """Full timeline figure as a plain dict (one trace per event type, bars or WebGL lanes); built on first use."""
+    if 'base' not in timeline_cache: timeline_cache['base'] = create_timeline_figure(timeline_df).to_plotly_json()
+    return timeline_cache['base']
+
+
+def timeline_date_filter(start_date_str, end_date_str):
+    """(start day, end day) of the date-range picker as normalized Timestamps, or None if unset or unparsable."""
+    if not (start_date_str and end_date_str): return None
+    try: return pd.to_datetime(start_date_str).normalize(), pd.to_datetime(end_date_str).normalize()
+    except Exception as e: print(f"Date parsing/filtering error: {e}"); return None
+
+
+def timeline_event_mask(selected_types, start_date_str, end_date_str, window=None):
+    """Boolean mask over timeline_df rows matching the type and date filters and, if given, the zoom window."""
+    matches = np.isin(timeline_type_codes, timeline_types.get_indexer(selected_types)) if selected_types else np.ones(len(timeline_dates), dtype=bool)
+    date_filter = timeline_date_filter(start_date_str, end_date_str)
+    if date_filter: matches &= (timeline_dates >= date_filter[0].to_datetime64()) & (timeline_dates <= date_filter[1].to_datetime64())
+    if window:
+        try: matches &= (timeline_dates >= pd.Timestamp(window[0]).to_datetime64()) & (timeline_dates <= pd.Timestamp(window[1]).to_datetime64())
+        except Exception as e: print(f"Timeline zoom window error: {e}")
+    return matches
+
+
+def timeline_filter_state(selected_types, start_date_str, end_date_str):
+    """(visible flag per base trace, x-axis range, title) for the type and date filters."""
+    traces = timeline_base_figure()['data']
+    visible = [not selected_types or trace.get('name') in selected_types for trace in traces]
+    x_range = [timeline_df['date_parsed'].min() - TIMELINE_PADDING, timeline_df['date_parsed'].max() + TIMELINE_PADDING]
+    matches = timeline_event_mask(selected_types, start_date_str, end_date_str)
+    date_filter = timeline_date_filter(start_date_str, end_date_str)
+    if date_filter: x_range = [date_filter[0] - pd.Timedelta(days=1), date_filter[1] + pd.Timedelta(days=2)] # Whole end day plus a margin
+    title = dataset_meta['timeline_title'] if matches.any() else "No events match filters."
+    return visible, [str(d) for d in x_range], title
+
+
+def timeline_figure(selected_types, start_date_str, end_date_str):
+    """Complete figure for the current filters (first render); later filter changes are sent as a Patch."""
+    base = timeline_base_figure()
+    visible, x_range, title = timeline_filter_state(selected_types, start_date_str, end_date_str)
+    layout = {**base['layout'], 'xaxis': {**base['layout'].get('xaxis', {}), 'range': x_range}, 'title': {**base['layout'].get('title', {}), 'text': title}}
+    return {'data': [{**trace, 'visible': v} for trace, v in zip(base['data'], visible)], 'layout': layout}
+
+
+def timeline_filter_patch(selected_types, start_date_str, end_date_str):
+    visible, x_range, title = timeline_filter_state(selected_types, start_date_str, end_date_str)
+    patch = Patch()
+    for i, v in enumerate(visible): patch['data'][i]['visible'] = v
+    patch['layout']['xaxis']['range'] = x_range
+    patch['layout']['title']['text'] = title
+    return patch
+
+
+# --- Timeline level of detail (large datasets): per-type day counts, coarse bars until a window is small enough ---
+# Above TIMELINE_LOD_MAX_EVENTS events the timeline never sends the whole dataset: every filter change or zoom
+# gets a figure for the visible window only - the events themselves if the window holds at most that many,
+# else stacked per-type counts in the finest day/week/month/year bins that fit TIMELINE_LOD_MAX_BINS.
+TIMELINE_LOD_MAX_EVENTS = int(os.environ.get('TIMELINE_LOD_MAX_EVENTS', 5000))
+TIMELINE_LOD_MAX_BINS = int(os.environ.get('TIMELINE_LOD_MAX_BINS', 200))
+timeline_lod_enabled = len(timeline_df) > TIMELINE_LOD_MAX_EVENTS
+
+
+def timeline_histogram():
+    """
+    Per-type cumulative event counts by day (types x day edges), so the count of any type in any run of
+    whole days is two lookups; plus the day offsets where week, month and year bins start. Built on first use.
+    """
+    if 'histogram' not in timeline_cache:
+        first_day = timeline_df['date_parsed'].min().normalize()
+        days = pd.date_range(first_day, timeline_df['date_parsed'].max().normalize() + pd.Timedelta(days=1), freq='D') # Day edges
+        day_index = ((timeline_dates - first_day.to_datetime64()) // np.timedelta64(1, 'D')).astype(np.int64)
+        n_types, n_days = len(timeline_types), len(days) - 1
+        counts = np.bincount(timeline_type_codes * n_days + day_index, minlength=n_types * n_days).reshape(n_types, n_days)
+        cumulative = np.zeros((n_types, n_days + 1), dtype=np.int64)
+        cumulative[:, 1:] = counts.cumsum(axis=1)
+        bin_starts = {'day': days.notna(), 'week': days.dayofweek == 0, 'month': days.day == 1, 'year': (days.day == 1) & (days.month == 1)}
+        timeline_cache['histogram'] = {'days': days, 'cumulative': cumulative, 'bins': {name: np.flatnonzero(starts) for name, starts in bin_starts.items()}}
+    return timeline_cache['histogram']
+
+
+def timeline_day_offset(days, value, ceil=False):
+    """Day edge index of a timestamp, clipped to the histogram."""
+    offset = (pd.Timestamp(value) - days[0]) / pd.Timedelta(days=1)
+    return int(np.clip(np.ceil(offset) if ceil else np.floor(offset), 0, len(days) - 1))
+
+
+def timeline_zoom_window(relayout_data):
+    """x-axis window [start, end] from a relayoutData zoom/pan event, 'reset' for autorange, None if the x axis didn't change."""
+    if not relayout_data: return None
+    if relayout_data.get('xaxis.autorange'): return 'reset'
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data: return [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+    if isinstance(relayout_data.get('xaxis.range'), list) and len(relayout_data['xaxis.range']) == 2: return list(relayout_data['xaxis.range'])
+    return None
+
+
+def create_timeline_counts_figure(histogram, type_rows, lo, hi):
+    """Stacked per-type event counts between day edges lo and hi, in the finest bin size with at most TIMELINE_LOD_MAX_BINS bins."""
+    for bin_name, starts in histogram['bins'].items(): # Finest first
+        inner = starts[(starts > lo) & (starts < hi)]
+        if len(inner) < TIMELINE_LOD_MAX_BINS: break
+    edges = np.r_[lo, inner, hi]
+    days, cumulative = histogram['days'], histogram['cumulative'][type_rows]
+    counts = cumulative[:, edges[1:]] - cumulative[:, edges[:-1]]
+    bin_x, bin_widths = days[edges[:-1]], (days[edges[1:]] - days[edges[:-1]]) / pd.Timedelta(milliseconds=1)
+    fig = go.Figure()
+    for row, row_counts in zip(type_rows, counts):
+        nonzero = row_counts > 0
+        if not nonzero.any(): continue
+        event_type = timeline_types[row]
+        fig.add_trace(go.Bar(
+            x=bin_x[nonzero], y=row_counts[nonzero], width=bin_widths[nonzero], offset=0, name=event_type, marker_color=TIMELINE_COLORS.get(event_type),
+            hovertemplate=f"<b>{event_type}</b><br>{bin_name} of %{{x|%d %b %Y}}: %{{y}} events<extra></extra>"
+        ))
+    fig.update_layout(title=dataset_meta['timeline_title'], barmode='stack', bargap=0)
+    style_timeline_figure(fig)
+    return fig.update_layout(yaxis=dict(title_text=f"Events per {bin_name} (zoom in for single events)"))
+
+
+def timeline_lod_figure(selected_types, start_date_str, end_date_str, window=None):
+    """Figure for the filters and the visible window (default: the filter's date range) as a plain dict; payload is bounded by the LOD limits."""
+    histogram = timeline_histogram()
+    days = histogram['days']
+    type_rows = np.arange(len(timeline_types))
+    if selected_types: type_rows = np.sort(timeline_types.get_indexer(selected_types))
+    type_rows = type_rows[type_rows >= 0]
+    lo, hi = 0, len(days) - 1
+    x_range = [timeline_df['date_parsed'].min() - TIMELINE_PADDING, timeline_df['date_parsed'].max() + TIMELINE_PADDING]
+    date_filter = timeline_date_filter(start_date_str, end_date_str)
+    if date_filter:
+        lo, hi = timeline_day_offset(days, date_filter[0]), timeline_day_offset(days, date_filter[1] + pd.Timedelta(days=1))
+        x_range = [date_filter[0] - pd.Timedelta(days=1), date_filter[1] + pd.Timedelta(days=2)]
+    if window:
+        try:
+            x_range = [pd.Timestamp(window[0]), pd.Timestamp(window[1])]
+            lo, hi = max(lo, timeline_day_offset(days, x_range[0])), min(hi, timeline_day_offset(days, x_range[1], ceil=True))
+        except Exception as e: print(f"Timeline zoom window error: {e}")
+    hi = max(lo, hi)
+    event_count = int((histogram['cumulative'][type_rows, hi] - histogram['cumulative'][type_rows, lo]).sum())
+    if event_count > TIMELINE_LOD_MAX_EVENTS: fig = create_timeline_counts_figure(histogram, type_rows, lo, hi)
+    elif event_count:
+        matches = np.isin(timeline_type_codes, type_rows) & (timeline_dates >= days[lo].to_datetime64()) & (timeline_dates < days[hi].to_datetime64())
+        fig = create_timeline_figure(timeline_df[matches])
+    else: fig = style_timeline_figure(go.Figure()).update_layout(title="No events match filters.") # Axes stay, so an empty window can be zoomed out of
+    fig.update_layout(xaxis=dict(range=[str(d) for d in x_range]))
+    if debug_mode: print(f"Timeline LOD: {event_count} events in window, {'binned' if event_count > TIMELINE_LOD_MAX_EVENTS else 'raw'}")
+    return fig.to_plotly_json()
+
+
 # --- Actors Table Creation ---
+ACTOR_METRIC_COLUMNS = {'degree': 'Degree', 'betweenness': 'Betweenness', 'eigenvector': 'Eigenvector', 'community': 'Community'}
+
+
 def create_actors_table():
     try:
-        table_data = []
         # Combine actor and individual data for the table
-        for _, actor in actors_df.iterrows():
-            table_data.append({
-                'Name': actor['name'],
-                'Type': actor['type'], # Use the detailed type from data
-                'Role/Description': actor['role']
-            })
-        for _, individual in individuals_df.iterrows():
-            table_data.append({
-                'Name': individual['name'],
-                'Type': f"Individual ({individual['role']})", # Clarify it's an individual
-                'Role/Description': individual['description']
-            })
-        return pd.DataFrame(table_data)
+        actor_rows = pd.DataFrame({'Name': actors_df['name'], 'Type': actors_df['type'], 'Role/Description': actors_df['role']}) # Use the detailed type from data
+        individual_rows = pd.DataFrame({'Name': individuals_df['name'], 'Type': "Individual (" + individuals_df['role'].astype(str) + ")", 'Role/Description': individuals_df['description']}) # Clarify it's an individual
+        table = pd.concat([actor_rows, individual_rows], ignore_index=True)
+        for metric, column in ACTOR_METRIC_COLUMNS.items(): table[column] = [actor_metrics.get(name, {}).get(metric) for name in table['Name']] # Actor co-participation graph
+        return table
     except Exception as e:
         if debug_mode: print(f"Error creating actors table: {e}")
         traceback.print_exc()
-        return pd.DataFrame(columns=['Name', 'Type', 'Role/Description'])
+        return pd.DataFrame(columns=['Name', 'Type', 'Role/Description'] + list(ACTOR_METRIC_COLUMNS.values()))
+
+
+# --- Server-side tables: rows stay here, the DataTables request one page at a time ---
+TIMELINE_TABLE_COLUMNS = {'Date': 'date', 'Title': 'title', 'Type': 'type', 'Location': 'location', 'Actors': 'actors_str'}
+TABLE_BUILDERS = {
+    'actors': lambda: TableQuery(create_actors_table()),
+    'timeline': lambda: TableQuery(timeline_df[list(TIMELINE_TABLE_COLUMNS.values())].set_axis(list(TIMELINE_TABLE_COLUMNS), axis=1), sort_keys={'Date': timeline_df['date_parsed']}),
+}
+table_queries = {}
+
+
+def table_query(name):
+    """TableQuery for a table, built the first time a page is requested."""
+    if name not in table_queries: table_queries[name] = TABLE_BUILDERS[name]()
+    return table_queries[name]
+
+
+def table_page_outputs(name, page_current, page_size, sort_by, filter_query, mask=None):
+    """(data, page_count, page_current) for a custom-paged DataTable; back to the first page unless only the page changed."""
+    if not all(prop.endswith('.page_current') for prop in dash.callback_context.triggered_prop_ids): page_current = 0
+    records, page_count, total, page_current = table_query(name).page(page_current, page_size, sort_by, filter_query, mask)
+    if debug_mode: print(f"Table {name}: page {page_current + 1}/{page_count} of {total} rows")
+    return records, page_count, page_current
+
+
+# --- Causal chain analytics (causal_analysis.py): panels read the precomputed reachability index ---
+CAUSAL_LIST_LIMIT = 25 # Events listed per panel section; the rest is counted
+CAUSAL_TOP_EVENTS = 10
+CAUSAL_OPTIONS_LIMIT = 50 # Event dropdown options per search
+
+
+def event_list(event_ids, ordered=False, limit=CAUSAL_LIST_LIMIT):
+    """Ol/Ul of event titles, cut at `limit` with a count of the rest."""
+    items = [html.Li(e, style={'fontSize': '0.9em'}) for e in event_ids[:limit]]
+    if len(event_ids) > limit: items.append(html.Li(f"... and {len(event_ids) - limit} more", style={'fontSize': '0.9em', 'color': '#666'}))
+    return (html.Ol if ordered else html.Ul)(items) if items else html.P("None", style={'fontSize': '0.9em'})
+
+
+def causal_summary_panel():
+    """Longest causal chain, most consequential events and cycles, derived from the causal links."""
+    summary = causal_index.summary()
+    content = [html.P(f"{summary['events']} events, {summary['links']} causal links; the longest chain runs through {summary['longest_chain']} events.")]
+    if causal_index.cycles: content.append(dbc.Alert(f"{len(causal_index.cycles)} causal cycle(s) found; events in a cycle are treated as one step: " + "; ".join(" -> ".join(c[:5]) + (" ..." if len(c) > 5 else "") for c in causal_index.cycles[:3]), color="warning"))
+    content += [html.H5("Longest Causal Chain"), event_list(causal_index.longest_chain(), ordered=True)]
+    top = causal_index.top_events(CAUSAL_TOP_EVENTS)
+    if top: content += [html.H5("Most Consequential Events", style={'marginTop': '15px'}), html.Ul([html.Li([html.Strong(e), f" - leads to {n} downstream events"], style={'fontSize': '0.9em'}) for e, n in top])]
+    return content
+
+
+def causal_event_card(event_id):
+    """Upstream causes, downstream consequences and the longest chain starting at an event."""
+    if not causal_index.has_event(event_id): return dbc.Alert(f"No causal data for '{event_id}'.", color="warning")
+    ancestors, descendants = causal_index.ancestors(event_id), causal_index.descendants(event_id)
+    return dbc.Card([dbc.CardHeader(html.H5(event_id)), dbc.CardBody([
+        html.P([html.Strong("Leads to: "), f"{causal_index.downstream_count(event_id)} downstream events"]),
+        html.H6(f"Upstream causes ({len(ancestors)}):"), event_list(ancestors),
+        html.H6(f"Downstream consequences ({len(descendants)}):", style={'marginTop': '10px'}), event_list(descendants),
+        html.H6("Longest chain from here:", style={'marginTop': '10px'}), event_list(causal_index.longest_chain(event_id), ordered=True),
+    ])], outline=True, color="light", style={'maxHeight': '500px', 'overflowY': 'auto'})
+
+
+def causal_paths_panel(source_id, target_id):
+    """Every causal path (up to CAUSAL_MAX_PATHS) from one event to another."""
+    if not source_id or not target_id: return dbc.Alert("Pick two events to list the causal paths between them.", color="info")
+    paths = causal_index.paths(source_id, target_id)
+    if not paths:
+        reverse = causal_index.reaches(target_id, source_id)
+        return dbc.Alert(f"No causal path from '{source_id}' to '{target_id}'." + (" The reverse direction has one." if reverse else ""), color="warning")
+    header = f"{len(paths)} path(s)" + (f" (first {CAUSAL_MAX_PATHS} shown)" if len(paths) >= CAUSAL_MAX_PATHS else "")
+    return html.Div([html.P(html.Strong(header))] + [html.P(" -> ".join(path), style={'fontSize': '0.9em'}) for path in paths], style={'maxHeight': '400px', 'overflowY': 'auto'})
+
+
+def causal_event_options(search_value, selected=None):
+    """Dropdown options: events matching the search text (by default the most consequential ones), plus the current selection."""
+    if search_value: event_ids = [e for e in node_search.search(search_value) if causal_index.has_event(e)][:CAUSAL_OPTIONS_LIMIT]
+    else: event_ids = [e for e, _ in causal_index.top_events(CAUSAL_OPTIONS_LIMIT)] or causal_index.topological_order()[:CAUSAL_OPTIONS_LIMIT]
+    if selected and selected not in event_ids: event_ids = [selected] + event_ids
+    return [{'label': e, 'value': e} for e in event_ids]
+
 
 # ------------------------------------------------------------------------------
-# DASH APP LAYOUT (Modifications for Font Sliders and Actor Search)
+# DASH APP LAYOUT (tab contents are built on first activation, see LAZY TABS)
 # ------------------------------------------------------------------------------
-app.layout = dbc.Container([
-    # Header Row
-    dbc.Row([
-        dbc.Col(html.A(html.Img(src='assets/rubase logo 4.svg', style={'height': '87px', 'marginTop': '15px'}), href="https://hcss.nl/rubase/", target="_blank"), width=2, className="d-flex justify-content-center align-items-center"),
-        dbc.Col([html.H1("Crimea Annexation (2014): Interactive Analysis", style={'textAlign': 'center', 'marginTop': '20px', 'marginBottom': '20px'}), html.P("A comprehensive visualization based on the FARO ontology.", style={'textAlign': 'center', 'fontSize': '18px', 'marginBottom': '30px'})], width=8),
-        dbc.Col(html.A(html.Img(src='assets/HCSS_Beeldmerk_Blauw_RGB.svg', style={'height': '87px', 'marginTop': '15px'}), href="https://hcss.nl", target="_blank"), width=2, className="d-flex justify-content-center align-items-center")
-    ]),
-
-    dbc.Tabs(id='tabs', active_tab="tab-1", children=[
-
-        # ================= TAB 1: FARO Knowledge Graph =================
-        dbc.Tab(label="FARO Knowledge Graph", tab_id="tab-1", children=[
+
+# --- Tab 1: FARO Knowledge Graph ---
+def faro_tab_content():
+    """FARO network, controls, hover/tap panels and legend."""
+    return [
+        dbc.Row([
+            dbc.Col(html.H3("FARO Ontology Network", style={'textAlign': 'center', 'marginTop': '20px'}), width=12),
+            dbc.Col(html.P("Explore events, actors, and their links. Hover for info, click nodes for subgraphs.", style={'textAlign': 'center', 'marginBottom': '20px'}), width=12)
+        ]),
+        dbc.Row([
+            dbc.Col([html.Label("Layout:"), dcc.Dropdown(id='cytoscape-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in FARO_LAYOUTS], value='cose', clearable=False)], width=6, md=2),
+            dbc.Col([html.Label("Search Nodes:"), dcc.Input(id="cytoscape-search-input", type="text", placeholder="Search, e.g. putin or location:sevastopol", debounce=True, style={"width": "100%"})], width=6, md=3),
+            dbc.Col([html.Label("Node Font Size:"), dcc.Slider(id='faro-font-size-slider', min=6, max=18, step=1, value=10, marks={i: str(i) for i in range(6, 19, 2)}, tooltip={"placement": "bottom", "always_visible": False})], width=9, md=4), # Adjusted width
+            dbc.Col([html.Button("Reset View", id="reset-btn", n_clicks=0, className="btn btn-secondary", style={"marginTop": "28px", "width":"100%"})], width=3, md=2)
+        ], justify="start", align='bottom', style={'marginBottom': '20px'}), # Align start
+        dbc.Row([
+            dbc.Col([html.Label("Node Size:"), dcc.Dropdown(id='faro-node-size-dropdown', options=NODE_SIZE_OPTIONS, value='type', clearable=False)], width=6, md=2),
+            dbc.Col([html.Label("Node Colour:"), dcc.Dropdown(id='faro-node-colour-dropdown', options=NODE_COLOUR_OPTIONS, value='type', clearable=False)], width=6, md=2),
+        ], style={'marginBottom': '10px'}),
+        dcc.Store(id='faro-node-styles', data=node_styles('faro')),
+        dbc.Row([
+            dbc.Col([dbc.Switch(id='faro-time-mode', label="Show network as of date", value=False), html.Span(id='faro-time-label', style={'fontWeight': 'bold'})], width=12, md=3),
+            dbc.Col(dcc.Slider(id='faro-time-slider', min=0, max=max(len(faro_time_index.steps) - 1, 0), step=1, value=max(len(faro_time_index.steps) - 1, 0), marks=time_slider_marks(), updatemode='drag'), width=12, md=9),
+        ], align='center', style={'marginBottom': '10px'}),
+        dbc.Row([
+            dbc.Col(html.Button("Play", id='faro-play-btn', n_clicks=0, className="btn btn-sm btn-primary", style={'width': '100%'}), width=4, md=1),
+            dbc.Col(dcc.Dropdown(id='faro-play-speed', options=[{'label': f"{fps} frames/s", 'value': fps} for fps in PLAYBACK_SPEEDS], value=2, clearable=False), width=4, md=2),
+            dbc.Col(dcc.Dropdown(id='faro-play-stride', options=[{'label': f"By {name.lower()}", 'value': name} for name in PLAYBACK_STRIDES], value='Day', clearable=False), width=4, md=2),
+            dbc.Col(dcc.Dropdown(id='faro-time-types', options=[{'label': t, 'value': t} for t in sorted(events_df['type'].unique())], value=[], multi=True, placeholder="All event types"), width=12, md=7),
+        ], align='center', style={'marginBottom': '10px'}),
+        dcc.Interval(id='faro-playback', interval=500, disabled=True), # Playback clock: each tick is one frame
+        dcc.Store(id='faro-time-state'), # {'layout', 'types', 'count', 'recent'}: time-ordered prefix the browser shows; None outside time mode
+        dbc.Row([
+            dbc.Col([html.Button("Back", id="faro-back-btn", n_clicks=0, disabled=True, className="btn btn-sm btn-outline-secondary", style={'marginRight': '10px'}), html.Span(id='faro-breadcrumb', children=breadcrumb('faro', []))], width=12, md=9),
+            dbc.Col(dbc.Switch(id='faro-group-mode', label="Group actors by type", value=False), width=12, md=3),
+        ], style={'marginBottom': '10px'}),
+        dcc.Store(id='faro-group-state'), # {'layout', 'expanded'}: group states the browser shows; None outside the grouped view
+        dbc.Row([ dbc.Col(dcc.Loading(id="loading-cytoscape", type="circle", children=[ cyto.Cytoscape(id='cytoscape-faro-network', elements=graph_view_elements('faro', 'cose'), layout=preset_layout(), style={'width': '100%', 'height': '700px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet, minZoom=0.1, maxZoom=2.5) ]), width=12) ]),
+        dcc.Store(id='faro-view-store', data={'mode': 'full'}), # Visible node set of the FARO graph
+        dcc.Store(id='faro-view-history', data=[]), # Breadcrumb trail of views (back stack)
+        *layout_stores('faro', 'cose'),
+        dbc.Row([ dbc.Col([html.Div(id='cytoscape-hover-output', style={'marginTop': '10px', 'padding': '10px', 'border': '1px solid #ccc', 'borderRadius': '5px', 'fontSize': '14px', 'minHeight': '60px', 'backgroundColor': '#f9f9f9'}, children="Hover over a node or edge."), html.Div(id='cytoscape-tapNodeData-output', style={'marginTop': '15px', 'padding': '15px', 'border': '1px dashed #ccc', 'minHeight': '80px', 'backgroundColor': '#f0f0f0'}, children="Click a node for details and subgraph view.")], width=12) ]),
+        create_consistent_legend()
+    ]
+
+
+# --- Tab 2: Chronological Event Timeline ---
+def timeline_tab_content():
+    """Timeline filters, graph and event details; the figure is drawn by update_timeline when the tab is inserted."""
+    return [
+        dbc.Row([ dbc.Col(html.H3("Timeline of Key Events", style={'textAlign': 'center', 'marginTop': '20px'}), width=12), dbc.Col(html.P("Use filters to explore the sequence. Click event bubbles for details.", style={'textAlign': 'center', 'marginBottom': '20px'}), width=12) ]),
+        dbc.Row([ dbc.Col([html.Label("Filter by Event Type:"), dcc.Dropdown(id='event-type-dropdown', options=[{'label': t, 'value': t} for t in sorted(timeline_df['type'].unique())], value=[], multi=True, placeholder="Select types...")], width=12, md=6), dbc.Col([html.Label("Date Range:"), dcc.DatePickerRange(id='date-range-picker', min_date_allowed=timeline_df['date_parsed'].min().date(), max_date_allowed=timeline_df['date_parsed'].max().date(), start_date=timeline_df['date_parsed'].min().date(), end_date=timeline_df['date_parsed'].max().date(), display_format='DD MMM YY', style={'width': '100%'})], width=12, md=6) ], justify="center", style={'marginBottom': '20px'}),
+        dbc.Row([ dbc.Col(dcc.Loading(id='loading-timeline', type='circle', children=[dcc.Graph(id='timeline-graph', style={'height': '600px'})]), width=12) ]),
+        dbc.Row([ dbc.Col([html.H4("Event Details", style={'marginTop': '30px'}), dcc.Loading(id='loading-event-details', type='circle', children=[ html.Div(id='event-details', children=[dbc.Alert("Click an event bubble in the timeline.", color="info")], style={'marginTop': '10px', 'padding': '15px', 'border': '1px solid #eee', 'minHeight': '100px', 'backgroundColor': '#fdfdfd'}) ])], width=12) ]),
+        dbc.Row([ dbc.Col([html.H4("Events", style={'marginTop': '30px'}), dash_table.DataTable(
+            id='timeline-table', columns=[{'name': c, 'id': c} for c in TIMELINE_TABLE_COLUMNS], data=[], # Events matching the timeline filters and zoom, one page at a time
+            style_table={'overflowX': 'auto'}, style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold', 'border': '1px solid lightgrey'}, style_cell={'textAlign': 'left', 'padding': '10px', 'whiteSpace': 'normal', 'height': 'auto', 'minWidth': '100px', 'maxWidth': '400px', 'border': '1px solid lightgrey'},
+            page_size=15, page_current=0, page_action="custom", filter_action="custom", sort_action="custom", sort_mode="multi", sort_by=[], filter_query='', filter_options={'case': 'insensitive'},
+            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
+        )], width=12) ]),
+        dcc.Store(id='timeline-filters') # Current filters; None until the first figure is sent
+    ]
+
+
+# --- Tab 3: Actors and Roles ---
+def actors_tab_content():
+    """Actor relationship network / table toggle and the details panel."""
+    return [
+         dbc.Row([
+            dbc.Col([
+                html.H3("Actor / Individual Relationships", style={'textAlign': 'center', 'marginTop': '20px'}),
+                html.P("Explore relationships (via shared events) or view a detailed table.", style={'textAlign': 'center', 'marginBottom': '20px'}),
+                dbc.RadioItems(id='actor-view-toggle', options=[{'label': 'Relationship Network', 'value': 'network'}, {'label': 'Detailed Table', 'value': 'table'}], value='network', inline=True, style={'textAlign': 'center', 'marginBottom': '20px'})
+            ], width=12)
+        ]),
+        # Network View Container
+        html.Div(id='actor-network-container', children=[
             dbc.Row([
-                dbc.Col(html.H3("FARO Ontology Network", style={'textAlign': 'center', 'marginTop': '20px'}), width=12),
-                dbc.Col(html.P("Explore events, actors, and their links. Hover for info, click nodes for subgraphs.", style={'textAlign': 'center', 'marginBottom': '20px'}), width=12)
-            ]),
+                dbc.Col([html.Label("Layout:"), dcc.Dropdown(id='cytoscape-actor-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in ACTOR_LAYOUTS], value='cose', clearable=False)], width=6, md=2),
+                dbc.Col([html.Label("Search Actors:"), dcc.Input(id="actor-search-input", type="text", placeholder="Search, e.g. role:president", debounce=True, style={"width": "100%"})], width=6, md=3), # Search Input
+                dbc.Col([html.Label("Node Font Size:"), dcc.Slider(id='actor-font-size-slider', min=6, max=18, step=1, value=10, marks={i: str(i) for i in range(6, 19, 2)}, tooltip={"placement": "bottom", "always_visible": False})], width=9, md=4), # Font Slider
+                dbc.Col([html.Button("Reset View", id="reset-actor-btn", n_clicks=0, className="btn btn-secondary", style={"marginTop": "28px", "width":"100%"})], width=3, md=2) # Shortened button text
+            ], justify="start", align='bottom', style={'marginBottom': '10px'}),
             dbc.Row([
-                dbc.Col([html.Label("Layout:"), dcc.Dropdown(id='cytoscape-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in ['cose', 'grid', 'circle', 'breadthfirst', 'dagre']], value='cose', clearable=False)], width=6, md=2),
-                dbc.Col([html.Label("Search Nodes:"), dcc.Input(id="cytoscape-search-input", type="text", placeholder="Filter nodes...", debounce=True, style={"width": "100%"})], width=6, md=3),
-                dbc.Col([html.Label("Node Font Size:"), dcc.Slider(id='faro-font-size-slider', min=6, max=18, step=1, value=10, marks={i: str(i) for i in range(6, 19, 2)}, tooltip={"placement": "bottom", "always_visible": False})], width=9, md=4), # Adjusted width
-                dbc.Col([html.Button("Reset View", id="reset-btn", n_clicks=0, className="btn btn-secondary", style={"marginTop": "28px", "width":"100%"})], width=3, md=2)
-            ], justify="start", align='bottom', style={'marginBottom': '20px'}), # Align start
-            dbc.Row([ dbc.Col(dcc.Loading(id="loading-cytoscape", type="circle", children=[ cyto.Cytoscape(id='cytoscape-faro-network', elements=create_cytoscape_elements(graph_type='faro'), layout={'name': 'cose', 'idealEdgeLength': 100, 'nodeRepulsion': 40000, 'animate': False, 'fit': True, 'padding': 50}, style={'width': '100%', 'height': '700px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet, minZoom=0.1, maxZoom=2.5) ]), width=12) ]),
-            dbc.Row([ dbc.Col([html.Div(id='cytoscape-hover-output', style={'marginTop': '10px', 'padding': '10px', 'border': '1px solid #ccc', 'borderRadius': '5px', 'fontSize': '14px', 'minHeight': '60px', 'backgroundColor': '#f9f9f9'}, children="Hover over a node or edge."), html.Div(id='cytoscape-tapNodeData-output', style={'marginTop': '15px', 'padding': '15px', 'border': '1px dashed #ccc', 'minHeight': '80px', 'backgroundColor': '#f0f0f0'}, children="Click a node for details and subgraph view.")], width=12) ]),
-            create_consistent_legend()
+                dbc.Col([html.Label("Node Size:"), dcc.Dropdown(id='actor-node-size-dropdown', options=NODE_SIZE_OPTIONS, value='type', clearable=False)], width=6, md=2),
+                dbc.Col([html.Label("Node Colour:"), dcc.Dropdown(id='actor-node-colour-dropdown', options=NODE_COLOUR_OPTIONS, value='type', clearable=False)], width=6, md=2),
+            ], style={'marginBottom': '10px'}),
+            dcc.Store(id='actor-node-styles', data=node_styles('actor')),
+            dbc.Row([ dbc.Col([html.Button("Back", id="actor-back-btn", n_clicks=0, disabled=True, className="btn btn-sm btn-outline-secondary", style={'marginRight': '10px'}), html.Span(id='actor-breadcrumb', children=breadcrumb('actor', []))], width=12) ], style={'marginBottom': '10px'}),
+            dbc.Row([ dbc.Col(dcc.Loading(id='loading-actor-network', type='circle', children=[ cyto.Cytoscape(id='cytoscape-actor-network', elements=graph_view_elements('actor', 'cose'), layout=preset_layout(), style={'width': '100%', 'height': '600px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet, minZoom=0.1, maxZoom=2.5) ]), width=12) ]),
+            dcc.Store(id='actor-view-store', data={'mode': 'full'}), # Visible node set of the actor graph
+            dcc.Store(id='actor-view-history', data=[]), # Breadcrumb trail of views (back stack)
+            *layout_stores('actor', 'cose'),
+            dbc.Row([ dbc.Col(html.Div(id='cytoscape-actor-hover-output', style={'marginTop': '10px', 'padding': '10px', 'border': '1px solid #ccc', 'borderRadius': '5px', 'fontSize': '14px', 'minHeight': '60px', 'backgroundColor': '#f9f9f9'}, children="Hover over an actor/individual or link."), width=12) ])
+        ], style={'display': 'block'}),
+        # Table View Container
+        html.Div(id='actor-table-container', children=[
+             dcc.Loading(id="loading-actors-table", type="circle", children=[
+                dash_table.DataTable(
+                    id='actors-table', columns=[{'name': i, 'id': i} for i in ['Name', 'Type', 'Role/Description']] + [{'name': c, 'id': c, 'type': 'numeric'} for c in ACTOR_METRIC_COLUMNS.values()], data=[], # Pages come from page_table_actors
+                    style_table={'overflowX': 'auto'}, style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold', 'border': '1px solid lightgrey'}, style_cell={'textAlign': 'left', 'padding': '10px', 'whiteSpace': 'normal', 'height': 'auto', 'minWidth': '150px', 'width': 'auto', 'maxWidth': '400px', 'border': '1px solid lightgrey'},
+                    page_size=15, page_current=0, page_action="custom", filter_action="custom", sort_action="custom", sort_mode="multi", sort_by=[], filter_query='', filter_options={'case': 'insensitive'},
+                    row_selectable="single", selected_rows=[], style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
+                )
+            ])
+        ], style={'display': 'none'}),
+        # Actor Details Output Area (Common)
+        dbc.Row([ dbc.Col([ html.H4("Actor/Individual Details", style={'marginTop': '30px'}), dcc.Loading(id='loading-actor-details', type='circle', children=[ html.Div(id='actor-details', children=[dbc.Alert("Click an actor node or select a table row.", color="info")], style={'marginTop': '10px', 'padding': '15px', 'border': '1px solid #eee', 'minHeight': '100px', 'backgroundColor': '#fdfdfd'}) ])], width=12) ]),
+        create_consistent_legend()
+    ]
+
+
+# --- Tab 4: Analysis & Perspectives (sub-tabs are lazy as well) ---
+def causal_network_content():
+    """Causal chain network with its layout controls."""
+    return [
+        dbc.Row([
+            dbc.Col([ # Controls Column
+                html.Label("Layout:", style={'marginTop': '20px'}), dcc.Dropdown(id='cytoscape-causal-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in CAUSAL_LAYOUTS], value='dagre', clearable=False),
+                html.Button("Reset Layout", id="reset-causal-layout", n_clicks=0, className="btn btn-sm btn-outline-secondary", style={"marginTop": "10px", "width":"100%"}),
+                *layout_stores('causal', 'dagre'),
+                html.Label("Node Font Size:", style={'marginTop': '15px'}), dcc.Slider(id='causal-font-size-slider', min=6, max=20, step=1, value=10, marks={i: str(i) for i in range(6, 21, 2)}, tooltip={"placement": "bottom", "always_visible": False}),
+            ], width=12, md=3, style={'paddingTop': '20px'}),
+            dbc.Col([ # Graph Column
+                dcc.Loading(id="loading-cytoscape-causal", type="default", children=[ cyto.Cytoscape(id='cytoscape-causal-graph', elements=graph_view_elements('causal', 'dagre'), layout=preset_layout(), style={'width': '100%', 'height': '600px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet ) ]),
+                html.Div(id='causal-event-details', children=dbc.Alert("Click an event to see its causes and consequences.", color="info"), style={'marginTop': '10px'})
+            ], width=12, md=9)
+        ])
+    ]
+
+
+def causal_timeline_content():
+    """Scatter of the key events."""
+    return [
+        dbc.Row([dbc.Col([html.H5(dataset_meta['key_events_title'], style={'marginTop': '20px', 'textAlign':'center'}), dcc.Graph(id='causal-flow-chart', figure=px.scatter(key_events_df, x='date_parsed', y='type', text='title', size=[20]*len(key_events_df), color='type', height=500, labels={"date_parsed": "Timeline", "type": "Event Category"}, title=None ).update_traces(mode='markers+text', textposition='top center', textfont_size=10 ).update_layout(yaxis={'visible': True, 'title': 'Event Category'}, xaxis_title="Timeline", showlegend=True, legend_title_text='Category', margin=dict(l=20, r=20, t=10, b=100)))], width=12)])
+    ]
+
+
+def causal_patterns_content():
+    """Causal chain summary plus the inner network / key events sub-tabs."""
+    return [
+        dbc.Row(dbc.Col([html.H4("Causal Chain Analysis", style={'marginTop': '20px'})] + causal_summary_panel(), width=12)),
+        dbc.Row([
+            dbc.Col([html.H5("Causal Paths", style={'marginTop': '15px'})], width=12),
+            dbc.Col([html.Label("From:"), dcc.Dropdown(id='causal-path-source', options=causal_event_options(None), placeholder="Cause...")], width=12, md=6),
+            dbc.Col([html.Label("To:"), dcc.Dropdown(id='causal-path-target', options=causal_event_options(None), placeholder="Effect...")], width=12, md=6),
+            dbc.Col(html.Div(id='causal-paths-output', style={'marginTop': '10px', 'marginBottom': '20px'}), width=12),
         ]),
+        dbc.Tabs(id="causal-subtabs-inner", active_tab="subtab-network", children=[
+            lazy_tab("Causal Chain Network", "subtab-network"),
+            lazy_tab("Key Events Timeline", "subtab-timeline"),
+        ]),
+        dcc.Store(id='causal-subtabs-inner-rendered', data=[]),
+    ]
+
 
-        # ================= TAB 2: Chronological Event Timeline =================
-        dbc.Tab(label="Chronological Event Timeline", tab_id="tab-2", children=[
-             dbc.Row([ dbc.Col(html.H3("Timeline of Key Events", style={'textAlign': 'center', 'marginTop': '20px'}), width=12), dbc.Col(html.P("Use filters to explore the sequence. Click event bubbles for details.", style={'textAlign': 'center', 'marginBottom': '20px'}), width=12) ]),
-             dbc.Row([ dbc.Col([html.Label("Filter by Event Type:"), dcc.Dropdown(id='event-type-dropdown', options=[{'label': t, 'value': t} for t in sorted(timeline_df['type'].unique())], value=[], multi=True, placeholder="Select types...")], width=12, md=6), dbc.Col([html.Label("Date Range:"), dcc.DatePickerRange(id='date-range-picker', min_date_allowed=timeline_df['date_parsed'].min().date(), max_date_allowed=timeline_df['date_parsed'].max().date(), start_date=timeline_df['date_parsed'].min().date(), end_date=timeline_df['date_parsed'].max().date(), display_format='DD MMM YY', style={'width': '100%'})], width=12, md=6) ], justify="center", style={'marginBottom': '20px'}),
-             dbc.Row([ dbc.Col(dcc.Loading(id='loading-timeline', type='circle', children=[dcc.Graph(id='timeline-graph', figure=create_timeline_figure(), style={'height': '600px'})]), width=12) ]),
-             dbc.Row([ dbc.Col([html.H4("Event Details", style={'marginTop': '30px'}), dcc.Loading(id='loading-event-details', type='circle', children=[ html.Div(id='event-details', children=[dbc.Alert("Click an event bubble in the timeline.", color="info")], style={'marginTop': '10px', 'padding': '15px', 'border': '1px solid #eee', 'minHeight': '100px', 'backgroundColor': '#fdfdfd'}) ])], width=12) ]),
-             dcc.Store(id='timeline-table')
+def analysis_chart(chart):
+    """Figure for an analysis chart from dataset.json: 'pie' (names, values) or 'timeline' (rows of label/start/finish/group)."""
+    if chart['type'] == 'pie':
+        return px.pie(names=chart['names'], values=chart['values'], title=chart.get('title'), color_discrete_sequence=chart.get('colors'), hole=0.3).update_traces(textinfo='percent+label')
+    rows = pd.DataFrame(chart['rows'])
+    fig = px.timeline(rows, x_start='start', x_end='finish', y='label', color='group', title=chart.get('title'),
+                      labels={'label': chart.get('y_label', ''), 'group': chart.get('group_label', '')})
+    return fig.update_yaxes(categoryorder='array', categoryarray=rows['label'].tolist()[::-1]) # First row on top
+
+
+def analysis_items(items):
+    """Bullet list; an item is a string or a [bold lead, text] pair."""
+    return html.Ul([html.Li([html.Strong(item[0]), item[1]] if isinstance(item, list) else item) for item in items])
+
+
+def dataset_analysis_content(tab):
+    """An Analysis sub-tab described in dataset.json ('analysis_tabs'): intro, charts, bullet sections, profile card and a dated note."""
+    sections = []
+    for i, section in enumerate(tab.get('sections', [])):
+        sections += [html.H5(section['heading'], style={'marginTop': '30px' if tab.get('charts') and not i else '15px'}), analysis_items(section['items'])]
+    body = [html.H4(tab['title'], style={'marginTop': '20px'}), html.P(tab.get('intro', ''))]
+    if tab.get('charts'): body.append(dbc.Row([dbc.Col([html.H5(chart.get('heading', '')), dcc.Graph(figure=analysis_chart(chart))], width=12, lg=6) for chart in tab['charts']]))
+    side = []
+    if tab.get('profile'):
+        profile = tab['profile']
+        side += [html.H5(profile['heading']), dbc.Card(dbc.CardBody([html.P([html.Strong(lead), text]) for lead, text in profile['items']]), className="mb-3", outline=True, color="secondary")]
+    if tab.get('note'):
+        note = tab['note']
+        side.append(html.P([html.Strong(f"{note['label']} (as of {datetime.now().strftime('%B %Y')}):"), f" {note['text']}"], style={'marginTop': '20px', 'fontWeight': 'bold'}))
+    body.append(dbc.Row([dbc.Col(sections, width=12, lg=6), dbc.Col(side, width=12, lg=6)]) if side else html.Div(sections))
+    return [dbc.Row([dbc.Col(body, width=12)])]
+
+
+def analysis_tab_content():
+    """Analysis sub-tabs; each one is built when first opened."""
+    return [
+        dbc.Tabs(id='analysis-subtabs', active_tab="analysis-causal", children=[
+            lazy_tab("Causal Patterns", "analysis-causal"),
+        ] + [lazy_tab(tab['label'], f"analysis-{tab['id']}") for tab in dataset_meta['analysis_tabs']]),
+        dcc.Store(id='analysis-subtabs-rendered', data=[]),
+    ]
+
+
+# --- Lazy tabs ---
+# Tabs component id -> tab id -> content builder. A tab's content is built on its first activation,
+# cached for every later session of this worker, and kept in the browser after the first render.
+TAB_BUILDERS = {
+    'tabs': {'tab-1': faro_tab_content, 'tab-2': timeline_tab_content, 'tab-3': actors_tab_content, 'tab-4': analysis_tab_content},
+    'analysis-subtabs': {'analysis-causal': causal_patterns_content, **{f"analysis-{tab['id']}": partial(dataset_analysis_content, tab) for tab in dataset_meta['analysis_tabs']}},
+    'causal-subtabs-inner': {'subtab-network': causal_network_content, 'subtab-timeline': causal_timeline_content},
+}
+tab_contents = {}
+
+
+def tab_content(tab_id):
+    if tab_id not in tab_contents:
+        builder = next(builders[tab_id] for builders in TAB_BUILDERS.values() if tab_id in builders)
+        tab_contents[tab_id] = builder()
+    return tab_contents[tab_id]
+
+
+def lazy_tab(label, tab_id, rendered=False):
+    """dbc.Tab whose children are filled by render_tab on first activation (or now, if rendered=True)."""
+    placeholder = html.Div(dbc.Spinner(color="secondary"), style={'textAlign': 'center', 'padding': '60px'})
+    return dbc.Tab(label=label, tab_id=tab_id, children=html.Div(id=f'{tab_id}-content', children=tab_content(tab_id) if rendered else placeholder))
+
+
+def serve_layout():
+    """Page layout; only the landing tab's content is included, the other tabs load when first opened."""
+    return dbc.Container([
+        # Header Row
+        dbc.Row([
+            dbc.Col(html.A(html.Img(src='assets/rubase logo 4.svg', style={'height': '87px', 'marginTop': '15px'}), href="https://hcss.nl/rubase/", target="_blank"), width=2, className="d-flex justify-content-center align-items-center"),
+            dbc.Col([html.H1(dataset_meta['title'], style={'textAlign': 'center', 'marginTop': '20px', 'marginBottom': '20px'}), html.P(dataset_meta['subtitle'], style={'textAlign': 'center', 'fontSize': '18px', 'marginBottom': '30px'})], width=8),
+            dbc.Col(html.A(html.Img(src='assets/HCSS_Beeldmerk_Blauw_RGB.svg', style={'height': '87px', 'marginTop': '15px'}), href="https://hcss.nl", target="_blank"), width=2, className="d-flex justify-content-center align-items-center")
         ]),
 
-        # ================= TAB 3: Actors and Roles =================
-        dbc.Tab(label="Actors and Roles", tab_id="tab-3", children=[
-             dbc.Row([
-                dbc.Col([
-                    html.H3("Actor / Individual Relationships", style={'textAlign': 'center', 'marginTop': '20px'}),
-                    html.P("Explore relationships (via shared events) or view a detailed table.", style={'textAlign': 'center', 'marginBottom': '20px'}),
-                    dbc.RadioItems(id='actor-view-toggle', options=[{'label': 'Relationship Network', 'value': 'network'}, {'label': 'Detailed Table', 'value': 'table'}], value='network', inline=True, style={'textAlign': 'center', 'marginBottom': '20px'})
-                ], width=12)
-            ]),
-            # Network View Container
-            html.Div(id='actor-network-container', children=[
-                dbc.Row([
-                    dbc.Col([html.Label("Layout:"), dcc.Dropdown(id='cytoscape-actor-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in ['cose', 'grid', 'circle', 'concentric']], value='cose', clearable=False)], width=6, md=2),
-                    dbc.Col([html.Label("Search Actors:"), dcc.Input(id="actor-search-input", type="text", placeholder="Filter actors...", debounce=True, style={"width": "100%"})], width=6, md=3), # Search Input
-                    dbc.Col([html.Label("Node Font Size:"), dcc.Slider(id='actor-font-size-slider', min=6, max=18, step=1, value=10, marks={i: str(i) for i in range(6, 19, 2)}, tooltip={"placement": "bottom", "always_visible": False})], width=9, md=4), # Font Slider
-                    dbc.Col([html.Button("Reset View", id="reset-actor-btn", n_clicks=0, className="btn btn-secondary", style={"marginTop": "28px", "width":"100%"})], width=3, md=2) # Shortened button text
-                ], justify="start", align='bottom', style={'marginBottom': '10px'}),
-                dbc.Row([ dbc.Col(dcc.Loading(id='loading-actor-network', type='circle', children=[ cyto.Cytoscape(id='cytoscape-actor-network', elements=create_cytoscape_elements(graph_type='actor'), layout={'name': 'cose', 'animate': False}, style={'width': '100%', 'height': '600px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet, minZoom=0.1, maxZoom=2.5) ]), width=12) ]),
-                dbc.Row([ dbc.Col(html.Div(id='cytoscape-actor-hover-output', style={'marginTop': '10px', 'padding': '10px', 'border': '1px solid #ccc', 'borderRadius': '5px', 'fontSize': '14px', 'minHeight': '60px', 'backgroundColor': '#f9f9f9'}, children="Hover over an actor/individual or link."), width=12) ])
-            ], style={'display': 'block'}),
-            # Table View Container
-            html.Div(id='actor-table-container', children=[
-                 dcc.Loading(id="loading-actors-table", type="circle", children=[
-                    dash_table.DataTable(
-                        id='actors-table', columns=[{'name': i, 'id': i} for i in ['Name', 'Type', 'Role/Description']], data=create_actors_table().to_dict('records'),
-                        style_table={'overflowX': 'auto'}, style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold', 'border': '1px solid lightgrey'}, style_cell={'textAlign': 'left', 'padding': '10px', 'whiteSpace': 'normal', 'height': 'auto', 'minWidth': '150px', 'width': 'auto', 'maxWidth': '400px', 'border': '1px solid lightgrey'},
-                        page_size=15, filter_action="native", sort_action="native", sort_mode="multi", row_selectable="single", selected_rows=[], style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgb(248, 248, 248)'}]
-                    )
-                ])
-            ], style={'display': 'none'}),
-            # Actor Details Output Area (Common)
-            dbc.Row([ dbc.Col([ html.H4("Actor/Individual Details", style={'marginTop': '30px'}), dcc.Loading(id='loading-actor-details', type='circle', children=[ html.Div(id='actor-details', children=[dbc.Alert("Click an actor node or select a table row.", color="info")], style={'marginTop': '10px', 'padding': '15px', 'border': '1px solid #eee', 'minHeight': '100px', 'backgroundColor': '#fdfdfd'}) ])], width=12) ]),
-            create_consistent_legend()
+        dbc.Tabs(id='tabs', active_tab="tab-1", children=[
+            lazy_tab("FARO Knowledge Graph", "tab-1", rendered=True),
+            lazy_tab("Chronological Event Timeline", "tab-2"),
+            lazy_tab("Actors and Roles", "tab-3"),
+            lazy_tab("Analysis & Perspectives", "tab-4"),
         ]),
+        dcc.Store(id='tabs-rendered', data=['tab-1']),
+        dcc.Store(id='session-id', data=str(uuid.uuid4())), # Keys this page's entries in the server-side view cache
+
+        # Footer
+        dbc.Row([ dbc.Col([ html.Hr(style={'marginTop': '40px'}), html.P(["Data compiled from open sources.", html.Br(), f"Visualization generated on {datetime.now().strftime('%Y-%m-%d')}. Based on FARO ontology principles."], style={'textAlign': 'center', 'marginTop': '20px', 'color': '#666', 'fontSize': '14px'}) ], width=12) ])
+    ], fluid=True, style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f8f9fa'})
+
 
-        # ================= TAB 4: Analysis & Perspectives =================
-        dbc.Tab(label="Analysis & Perspectives", tab_id="tab-4", children=[
-            dbc.Tabs(id='analysis-subtabs', active_tab="analysis-causal", children=[
-                # --- Causal Patterns Sub-Tab ---
-                dbc.Tab(label="Causal Patterns", tab_id="analysis-causal", children=[
-                    dbc.Row(dbc.Col([ html.H4("Causal Chain Analysis", style={'marginTop': '20px'}), html.P("Explore the sequence of events leading to the annexation."), html.Ol([ html.Li("Ukrainian Revolution triggers protests."), html.Li("Pro-Russian sentiment rises in Crimea."), html.Li("Covert Russian special forces seize key sites."), html.Li("Pro-Russian leadership is installed."), html.Li("A hastily organized referendum is held."), html.Li("Formal annexation follows."), html.Li("International condemnation and sanctions are imposed."), html.Li("Control is consolidated in Crimea.") ], style={'marginBottom': '20px'}), ], width=12)),
-                    dbc.Tabs(id="causal-subtabs-inner", active_tab="subtab-network", children=[
-                        # --- Inner Tab: Causal Network Graph ---
-                        dbc.Tab(label="Causal Chain Network", tab_id="subtab-network", children=[
-                            dbc.Row([
-                                dbc.Col([ # Controls Column
-                                    html.Label("Layout:", style={'marginTop': '20px'}), dcc.Dropdown(id='cytoscape-causal-layout-dropdown', options=[{'label': l.capitalize(), 'value': l} for l in ['dagre', 'cose', 'breadthfirst', 'grid', 'circle']], value='dagre', clearable=False),
-                                    html.Button("Reset Layout", id="reset-causal-layout", n_clicks=0, className="btn btn-sm btn-outline-secondary", style={"marginTop": "10px", "width":"100%"}),
-                                    html.Label("Node Font Size:", style={'marginTop': '15px'}), dcc.Slider(id='causal-font-size-slider', min=6, max=20, step=1, value=10, marks={i: str(i) for i in range(6, 21, 2)}, tooltip={"placement": "bottom", "always_visible": False}),
-                                ], width=12, md=3, style={'paddingTop': '20px'}),
-                                dbc.Col([ # Graph Column
-                                    dcc.Loading(id="loading-cytoscape-causal", type="default", children=[ cyto.Cytoscape(id='cytoscape-causal-graph', elements=create_cytoscape_elements(nodes_list=event_nodes, edges_list=causal_edges), layout={'name': 'dagre', 'rankDir': 'TB', 'animate': False, 'fit': True, 'padding': 50}, style={'width': '100%', 'height': '600px', 'border': '1px solid #ddd'}, stylesheet=default_stylesheet ) ])
-                                ], width=12, md=9)
-                            ])
-                        ]),
-                        # --- Inner Tab: Timeline Scatter Plot ---
-                        dbc.Tab(label="Key Events Timeline", tab_id="subtab-timeline", children=[
-                             dbc.Row([dbc.Col([html.H5("Critical Events in the Annexation Sequence", style={'marginTop': '20px', 'textAlign':'center'}), dcc.Graph(id='causal-flow-chart', figure=px.scatter(events_df.iloc[[0, 1, 2, 5, 6, 8, 9, 10, 12, 13, 14, 15, 17, 18, 19]], x='date_parsed', y='type', text='title', size=[20]*15, color='type', height=500, labels={"date_parsed": "Timeline", "type": "Event Category"}, title=None ).update_traces(mode='markers+text', textposition='top center', textfont_size=10 ).update_layout(yaxis={'visible': True, 'title': 'Event Category'}, xaxis_title="Timeline", showlegend=True, legend_title_text='Category', margin=dict(l=20, r=20, t=10, b=100)))], width=12)])
-                        ]),
-                    ]),
-                ]),
-
-                # --- International Response Sub-Tab ---
-                dbc.Tab(label="International Response", tab_id="analysis-intl", children=[
-                     dbc.Row([dbc.Col([html.H4("International Response Analysis", style={'marginTop': '20px'}), html.P("The international community responded with sanctions, diplomatic measures, and organizational actions."), dbc.Row([dbc.Col([html.H5("UN General Assembly Vote (Res 68/262)"), dcc.Graph(id='un-vote-chart', figure=px.pie(names=['In favor (Affirming Ukraine Integrity)', 'Against (Opposing Resolution)', 'Abstentions', 'Non-Voting'], values=[100, 11, 58, 24], title="UNGA Vote on Ukraine's Territorial Integrity (Mar 2014)", color_discrete_sequence=['#4285F4', '#EA4335', '#FBBC05', '#CCCCCC'], hole=0.3).update_traces(textinfo='percent+label'))], width=12, lg=6), dbc.Col([html.H5("Initial Sanctions Timeline (Mar-Jul 2014)"), dcc.Graph(id='sanctions-timeline', figure=px.timeline( pd.DataFrame([ dict(Sanction="US Initial Individual Sanctions", Start='2014-03-17', Finish='2014-03-20', Actor='US'), dict(Sanction="EU Initial Individual Sanctions", Start='2014-03-17', Finish='2014-03-21', Actor='EU'), dict(Sanction="G7 Suspends Russia from G8", Start='2014-03-24', Finish='2014-03-25', Actor='G7'), dict(Sanction="Expanded Sectoral Sanctions", Start='2014-07-16', Finish='2014-07-31', Actor='US/EU') ]), x_start="Start", x_end="Finish", y="Sanction", color="Actor", title="Timeline of Early Western Sanctions", labels={"Sanction": "Sanction Type/Action"} ).update_yaxes( categoryorder='array', categoryarray=[ "Expanded Sectoral Sanctions", "G7 Suspends Russia from G8", "EU Initial Individual Sanctions", "US Initial Individual Sanctions" ] ))], width=12, lg=6) ]), html.H5("Key Response Patterns:", style={'marginTop': '30px'}), html.Ul([ html.Li("Diplomatic condemnation and legal resolutions (UN)."), html.Li("Targeted economic sanctions (individual and sectoral) by US, EU, G7."), html.Li("Suspension from international forums (G8 -> G7)."), html.Li("Actions by international organizations (OSCE observer attempts)."), html.Li("Avoidance of direct military confrontation by Western powers."), html.Li("Long-term policy of non-recognition of the annexation.") ])], width=12) ])
-                ]),
-
-                # --- Legal & Territorial Impact Sub-Tab ---
-                dbc.Tab(label="Legal & Territorial Impact", tab_id="analysis-legal", children=[
-                     dbc.Row([dbc.Col([html.H4("Legal and Territorial Consequences", style={'marginTop': '20px'}), html.P("The annexation violated several international legal principles while altering Crimea's de facto status, leading to widespread non-recognition."), dbc.Row([dbc.Col([html.H5("Violations of International Law Cited"), html.Ul([ html.Li([html.Strong("UN Charter:"), " Principles of sovereignty, territorial integrity, and prohibition against the use of force to acquire territory."]), html.Li([html.Strong("Helsinki Final Act (1975):"), " Inviolability of frontiers and territorial integrity of States."]), html.Li([html.Strong("Budapest Memorandum (1994):"), " Security assurances to Ukraine respecting independence, sovereignty, and existing borders in exchange for denuclearization."]), html.Li([html.Strong("Russia-Ukraine Friendship Treaty (1997):"), " Recognition of existing borders and territorial integrity."]), html.Li([html.Strong("Ukrainian Constitution:"), " Territorial changes require a national referendum, not just regional."]) ]), html.H5("Russian Justifications / Counterarguments:", style={'marginTop': '15px'}), html.Ul([ html.Li("Protection of Russian-speaking population / ethnic Russians."), html.Li("Exercise of the right to self-determination by the people of Crimea (via referendum)."), html.Li("Alleged request for intervention/assistance (from Aksyonov/Yanukovych)."), html.Li("Correction of historical 'injustice' (1954 transfer to Ukrainian SSR)."), html.Li("Reference to Kosovo precedent (though widely disputed).") ])], width=12, lg=6), dbc.Col([html.H5("Territorial Impact - Crimea Profile"), dbc.Card(dbc.CardBody([ html.P([html.Strong("Status:"), " De facto administered by Russia; De jure recognized as Ukraine by most of the international community."]), html.P([html.Strong("Area: "), "~27,000 km²"]), html.P([html.Strong("Population (2014 est.): "), "~2.3 million"]), html.P([html.Strong("Strategic Importance: "), " Base for Russia's Black Sea Fleet (Sevastopol), control over Black Sea access."]), html.P([html.Strong("Economic Impact: "), " Integration into Russian economy, disruption of ties with mainland Ukraine, impact of sanctions, dependence on Russian infrastructure (e.g., Kerch Bridge)."]) ]), className="mb-3", outline=True, color="secondary"), html.P([html.Strong(f"Ongoing Situation (as of {datetime.now().strftime('%B %Y')}):"), " Crimea remains under Russian control and integrated into its legal/administrative system. Ukraine maintains its claim and non-recognition policies. The peninsula is a focal point in the ongoing Russo-Ukrainian War."], style={'marginTop': '20px', 'fontWeight': 'bold'})], width=12, lg=6) ]),], width=12)])
-                ]),
-
-            ]) # End Outer Analysis Tabs
-        ]), # End Tab 4
-
-    ]), # End Main Tabs
-
-    # Footer
-    dbc.Row([ dbc.Col([ html.Hr(style={'marginTop': '40px'}), html.P(["Data compiled from open sources.", html.Br(), f"Visualization generated on {datetime.now().strftime('%Y-%m-%d')}. Based on FARO ontology principles."], style={'textAlign': 'center', 'marginTop': '20px', 'color': '#666', 'fontSize': '14px'}) ], width=12) ])
-], fluid=True, style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f8f9fa'})
+app.layout = serve_layout # Built per page load; tab contents come from the tab_contents cache
 
 
 # ------------------------------------------------------------------------------
 # CALLBACKS
 # ------------------------------------------------------------------------------
 
-# --- Callback for Main Cytoscape Graph (Tab 1) ---
+# --- Lazy tab rendering: fills a tab's content the first time it becomes active ---
+def register_lazy_tabs(tabs_id):
+    tab_ids = list(TAB_BUILDERS[tabs_id])
+
+    @app.callback([Output(f'{tab_id}-content', 'children') for tab_id in tab_ids] + [Output(f'{tabs_id}-rendered', 'data')],
+                  Input(tabs_id, 'active_tab'), State(f'{tabs_id}-rendered', 'data'))
+    def render_tab(active_tab, rendered):
+        rendered = rendered or []
+        if active_tab not in tab_ids or active_tab in rendered: raise PreventUpdate # Already in the browser
+        if debug_mode: print(f"Rendering tab '{active_tab}'")
+        return [tab_content(tab_id) if tab_id == active_tab else dash.no_update for tab_id in tab_ids] + [rendered + [active_tab]]
+
+
+for lazy_tabs_id in TAB_BUILDERS: register_lazy_tabs(lazy_tabs_id)
+
+
+# --- Callbacks for Main Cytoscape Graph (Tab 1) ---
+# Elements, layout and stylesheet are separate callbacks: font/layout changes only send the small
+# stylesheet/layout payload, elements are sent only when the visible node set (faro-view-store) changes.
 @app.callback(
     [Output('cytoscape-faro-network', 'elements'),
      Output('cytoscape-tapNodeData-output', 'children'),
-     Output('cytoscape-faro-network', 'layout'),
      Output('cytoscape-search-input', 'value'),
-     Output('cytoscape-faro-network', 'stylesheet')],
+     Output('faro-view-store', 'data'),
+     Output('faro-view-history', 'data'),
+     Output('faro-time-mode', 'value', allow_duplicate=True),
+     Output('faro-group-mode', 'value', allow_duplicate=True)],
     [Input('cytoscape-faro-network', 'tapNodeData'),
      Input('reset-btn', 'n_clicks'),
      Input('cytoscape-search-input', 'value'),
-     Input('cytoscape-layout-dropdown', 'value'),
-     Input('faro-font-size-slider', 'value')],
+     Input('faro-back-btn', 'n_clicks'),
+     Input({'type': 'view-crumb', 'graph': 'faro', 'index': ALL}, 'n_clicks')],
+    [State('cytoscape-layout-dropdown', 'value'),
+     State('faro-view-store', 'data'),
+     State('faro-view-history', 'data'),
+     State('session-id', 'data'),
+     State('faro-time-mode', 'value'),
+     State('faro-group-mode', 'value')],
+    prevent_initial_call=True
 )
-def handle_main_cytoscape_interaction(tap_node, reset_clicks, search_value, layout_name, font_size):
+def handle_main_cytoscape_interaction(tap_node, reset_clicks, search_value, back_clicks, crumb_clicks, layout_name, current_view, history, session_id, time_mode, group_mode):
     ctx = dash.callback_context
     triggered_prop_id = ctx.triggered[0]['prop_id'] if ctx.triggered else 'initial_load'
     trigger_id = triggered_prop_id.split('.')[0]
 
-    # Default layout config (Cose is default)
-    layout_config = {'name': layout_name or 'cose', 'animate': False, 'fit': True, 'padding': 50}
-    if layout_name == 'dagre': layout_config['rankDir'] = 'TB'; layout_config['spacingFactor'] = 1.2
-    elif layout_name == 'breadthfirst': layout_config['roots'] = '#Ukraine Drops EU Deal; Protests Begin (Euromaidan)'; layout_config['spacingFactor'] = 1.2
-    elif layout_name == 'cose': layout_config.update({'idealEdgeLength': 100, 'nodeRepulsion': 50000, 'nodeOverlap': 10, 'gravity': 40}) # Tweaked Cose
-
-    # Update stylesheet for font size
-    stylesheet = update_stylesheet_font_size(default_stylesheet, font_size or 10)
+    # Positions are precomputed server-side (layout_engine); the browser only applies them
+    layout_name = layout_name if layout_engine.supports(layout_name) else 'cose'
     clear_search = dash.no_update
+    if trigger_id == 'cytoscape-faro-network' and tap_node and tap_node.get('type') == 'Group': raise PreventUpdate # Expand/collapse: update_faro_groups
+    leave_time_mode = False if time_mode else dash.no_update # Any other view ends the time slider mode
+    leave_group_mode = False if group_mode else dash.no_update # ... and the grouped view
 
-    # Handle Trigger Priority: Reset > Click > Search/Layout/Font Change
+    # Handle Trigger Priority: Reset > Back/breadcrumb > Click > Search
     if trigger_id == 'reset-btn':
         if debug_mode: print("FARO Reset triggered.")
-        elements = create_cytoscape_elements(graph_type='faro')
+        elements = graph_view_elements('faro', 'cose') # Reset layout too
         tap_output_msg = "Graph view reset. Click a node for details."
-        layout_config = {'name': 'cose', 'idealEdgeLength': 100, 'nodeRepulsion': 50000, 'animate': False, 'fit': True, 'padding': 50} # Reset layout too
         clear_search = ""
-        return elements, tap_output_msg, layout_config, clear_search, stylesheet
-
-    elif trigger_id == 'cytoscape-faro-network' and tap_node:
-        node_id = tap_node.get('id')
-        node_label = tap_node.get('label', 'Unknown')
-        if debug_mode: print(f"FARO Node tapped: {node_label} (ID: {node_id})")
-        if node_id:
-            neighbors_ids = {node_id}
-            edges_to_include = []
-            neighbor_details_list = []
-            for edge in all_edges_base:
-                source, target = edge['source'], edge['target']
-                other_node_id = None
-                if source == node_id and target in node_ids: other_node_id = target
-                elif target == node_id and source in node_ids: other_node_id = source
-                if other_node_id:
-                    neighbors_ids.add(other_node_id)
-                    edges_to_include.append(edge)
-                    other_node_data = next((n for n in all_nodes_base if n['id'] == other_node_id), None)
-                    if other_node_data: neighbor_details_list.append(f"{other_node_data.get('label', other_node_id)} ({other_node_data.get('type', 'N/A')})")
-
-            sub_nodes = [n for n in all_nodes_base if n['id'] in neighbors_ids]
-            sub_edges = [e for e in edges_to_include if e['source'] in neighbors_ids and e['target'] in neighbors_ids]
-            elements = create_cytoscape_elements(nodes_list=sub_nodes, edges_list=sub_edges, graph_type='faro')
-
-            tap_output_msg_content = [html.H5(f"Focus on: {node_label}")]
-            try:
-                tapped_details = json.loads(tap_node.get('details_json', '{}')) # Use details_json
-                for key, value in tapped_details.items():
-                    if value: tap_output_msg_content.append(html.P([html.Strong(f"{key.replace('_', ' ').title()}: "), str(value)], style={'fontSize': '0.9em'}))
-            except Exception as e: tap_output_msg_content.append(html.P(f"Error loading details: {e}", style={'color': 'red'}))
-            if neighbor_details_list:
-                tap_output_msg_content.append(html.P(f"Directly connected to ({len(neighbor_details_list)}):"))
-                tap_output_msg_content.append(html.Ul([html.Li(d, style={'fontSize': '0.9em'}) for d in sorted(neighbor_details_list)]))
-            tap_output_msg = dbc.Alert(tap_output_msg_content, color="info", style={'maxHeight': '300px', 'overflowY': 'auto'})
-            layout_config.update({'name': 'cose', 'padding': 60, 'idealEdgeLength': 150, 'nodeRepulsion': 60000}) # Focused layout
-            clear_search = "" # Clear search on click
-            return elements, tap_output_msg, layout_config, clear_search, stylesheet
-
-    # Handle Search, Layout, Font Size changes (or initial load)
-    if debug_mode: print(f"FARO Handling search/layout/font. Search: '{search_value}', Layout: '{layout_name}', Font: {font_size}")
-    filtered_nodes_search = all_nodes_base
-    if search_value:
-        search_lower = search_value.lower()
-        filtered_nodes_search = [n for n in all_nodes_base if search_lower in n['label'].lower()]
-    filtered_node_ids_search = {n['id'] for n in filtered_nodes_search}
-    filtered_edges_search = [e for e in all_edges_base if e['source'] in filtered_node_ids_search and e['target'] in filtered_node_ids_search]
-    elements = create_cytoscape_elements(nodes_list=filtered_nodes_search, edges_list=filtered_edges_search, graph_type='faro')
-    tap_output_msg = "Click a node for details."
-    if search_value and not elements: tap_output_msg = dbc.Alert(f"No results found for '{search_value}'.", color="warning")
-    elif search_value: tap_output_msg = dbc.Alert(f"Showing search results for '{search_value}'. Click node for details.", color="success")
-    return elements, tap_output_msg, layout_config, clear_search, stylesheet
-
-
-# --- Callback for Main Cytoscape Hover ---
+        return elements, tap_output_msg, clear_search, FULL_VIEW, [], leave_time_mode, leave_group_mode
+
+    navigation = navigation_target('faro', history)
+    if navigation:
+        view, history = navigation
+        if debug_mode: print(f"FARO Navigating to {view_label('faro', view)}")
+        clear_search = view.get('search', "")
+    elif trigger_id == 'cytoscape-faro-network' and tap_node and tap_node.get('id'):
+        node_id = tap_node.get('node_id', tap_node['id']) # Group members in the grouped view carry their node id
+        if debug_mode: print(f"FARO Node tapped: {tap_node.get('label', 'Unknown')} (ID: {node_id})")
+        view = {'mode': 'focus', 'node': node_id}
+        clear_search = "" # Clear search on click
+    else: # Handle Search
+        if debug_mode: print(f"FARO Handling search. Search: '{search_value}', Layout: '{layout_name}'")
+        view = {'mode': 'search', 'search': search_value} if search_value else FULL_VIEW
+    if not navigation: history = push_view(history, view)
+
+    elements, tap_output_msg = cached_view(session_id, 'faro', view, layout_name, faro_view_panel)
+    if view == current_view: return dash.no_update, tap_output_msg, clear_search, dash.no_update, history, leave_time_mode, leave_group_mode # Same subgraph already shown
+    return elements, tap_output_msg, clear_search, view, history, leave_time_mode, leave_group_mode
+
+
 @app.callback(
-    Output('cytoscape-hover-output', 'children'),
-    [Input('cytoscape-faro-network', 'mouseoverNodeData'),
-     Input('cytoscape-faro-network', 'mouseoverEdgeData')]
+    [Output('cytoscape-faro-network', 'elements', allow_duplicate=True),
+     Output('faro-time-state', 'data'),
+     Output('faro-time-label', 'children'),
+     Output('faro-view-store', 'data', allow_duplicate=True),
+     Output('faro-view-history', 'data', allow_duplicate=True),
+     Output('faro-time-slider', 'value'),
+     Output('faro-playback', 'disabled', allow_duplicate=True),
+     Output('faro-group-mode', 'value', allow_duplicate=True)],
+    [Input('faro-time-mode', 'value'),
+     Input('faro-time-slider', 'value'),
+     Input('faro-time-types', 'value'),
+     Input('faro-playback', 'n_intervals')],
+    [State('cytoscape-layout-dropdown', 'value'),
+     State('faro-play-stride', 'value'),
+     State('faro-time-state', 'data'),
+     State('faro-view-store', 'data'),
+     State('faro-group-mode', 'value')],
+    prevent_initial_call=True
 )
-def display_main_hover_data(node_data, edge_data):
-    try:
-        if node_data:
-            details = json.loads(node_data.get('details_json', '{}')) # Use details_json
-            content = [html.Strong(f"{node_data.get('label', 'Node')} ({node_data.get('type', 'N/A')})")]
-            for key, value in details.items():
-                 if value and key not in ['details_dict', 'actors', 'color', 'date_parsed', 'actors_str', 'end_date']: # Filter internal/redundant keys
-                    display_key = key.replace('_', ' ').title()
-                    display_value = str(value)
-                    if isinstance(value, str) and len(value) > 150: display_value = value[:150] + "..."
-                    elif isinstance(value, list): display_value = ", ".join(map(str, value))
-                    content.append(html.P(f"{display_key}: {display_value}", style={'margin': '2px 0', 'fontSize': '0.85em'}))
-            return content
-        elif edge_data:
-            details = json.loads(edge_data.get('details_json', '{}'))
-            source, target, label = edge_data.get('source', '?'), edge_data.get('target', '?'), edge_data.get('label', 'related to')
-            source_node, target_node = next((n for n in all_nodes_base if n['id'] == source), None), next((n for n in all_nodes_base if n['id'] == target), None)
-            source_label, target_label = (source_node['label'] if source_node else source), (target_node['label'] if target_node else target)
-            desc = ""
-            if edge_data.get('edge_type') == 'causal': desc = f" ({details.get('description', '')})"
-            elif edge_data.get('edge_type') == 'shared_event': shared_list = details.get('shared_events', []); desc = f" - Events: {', '.join(shared_list[:5])}{'...' if len(shared_list) > 5 else ''}"
-            elif edge_data.get('edge_type') == 'participation': desc = "" # No extra desc needed
-
-            return [html.Strong("Relationship:"), html.Br(), f"{source_label} → {label} → {target_label}{desc}"]
-        return "Hover over a node or edge."
-    except Exception as e: print(f"Error in main hover display: {e}"); return "Error displaying hover data."
+def update_faro_time(time_mode, step, types, n_intervals, layout_name, stride, time_state, current_view, group_mode):
+    """Time slider mode: events up to the slider date with the actors and links that touch them; playback ticks advance one frame."""
+    layout_name = layout_name if layout_engine.supports(layout_name) else 'cose'
+    if not time_mode:
+        if time_state is None: raise PreventUpdate # Slider/filter changed outside time mode
+        if current_view != TIME_VIEW: return dash.no_update, None, "", dash.no_update, dash.no_update, dash.no_update, True, dash.no_update # A tap/search/reset already replaced the graph
+        return graph_view_elements('faro', layout_name), None, "", FULL_VIEW, [], dash.no_update, True, dash.no_update
+    entering = current_view != TIME_VIEW
+    slider_update, playing = dash.no_update, dash.no_update
+    if dash.callback_context.triggered_id == 'faro-playback': # Next precomputed frame after the current stop
+        frames = playback_frames(types, layout_name, stride)
+        later = frames[frames > step]
+        if not len(later): return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, dash.no_update # End reached: stop
+        step = slider_update = int(later[0])
+        if step >= frames[-1]: playing = True # Last frame: stop the clock
+    elements, time_state = time_elements_update(step, layout_name, types, None if entering else time_state)
+    date = faro_time_index.step_date(step)
+    label = f"As of {pd.Timestamp(date):%d %b %Y}: {time_state['count']} elements" if date is not None else "No dated events"
+    if debug_mode: print(f"FARO time step {step}: {label} ({'full' if isinstance(elements, list) else 'delta'})")
+    leave_group_mode = False if entering and group_mode else dash.no_update
+    return elements, time_state, label, TIME_VIEW if entering else dash.no_update, [] if entering else dash.no_update, slider_update, playing, leave_group_mode
+
+
+@app.callback(
+    [Output('cytoscape-faro-network', 'elements', allow_duplicate=True),
+     Output('faro-group-state', 'data'),
+     Output('cytoscape-tapNodeData-output', 'children', allow_duplicate=True),
+     Output('faro-view-store', 'data', allow_duplicate=True),
+     Output('faro-view-history', 'data', allow_duplicate=True),
+     Output('faro-time-mode', 'value', allow_duplicate=True)],
+    [Input('faro-group-mode', 'value'),
+     Input('cytoscape-faro-network', 'tapNodeData')],
+    [State('cytoscape-layout-dropdown', 'value'),
+     State('faro-group-state', 'data'),
+     State('faro-view-store', 'data'),
+     State('faro-time-mode', 'value')],
+    prevent_initial_call=True
+)
+def update_faro_groups(group_mode, tap_node, layout_name, group_state, current_view, time_mode):
+    """Grouped view: actors collapsed into one super-node per type; tapping a super-node expands or collapses it."""
+    layout_name = layout_name if layout_engine.supports(layout_name) else 'cose'
+    if dash.callback_context.triggered_id == 'cytoscape-faro-network':
+        if not (group_mode and current_view == GROUP_VIEW and tap_node and tap_node.get('type') == 'Group'): raise PreventUpdate # Other taps: handle_main_cytoscape_interaction
+        elements, group_state = group_elements_update(tap_node['group'], layout_name, group_state)
+        if debug_mode: print(f"FARO group toggled: {tap_node['group']} ({'full' if isinstance(elements, list) else 'delta'})")
+        return elements, group_state, group_panel(group_state), dash.no_update, dash.no_update, dash.no_update
+    if not group_mode:
+        if group_state is None: raise PreventUpdate
+        if current_view != GROUP_VIEW: return dash.no_update, None, dash.no_update, dash.no_update, dash.no_update, dash.no_update # Another view already replaced the graph
+        return graph_view_elements('faro', layout_name), None, "Click a node for details and subgraph view.", FULL_VIEW, [], dash.no_update
+    elements, group_state = group_elements_update(None, layout_name, None)
+    return elements, group_state, group_panel(group_state), GROUP_VIEW, [], False if time_mode else dash.no_update
+
+
+@app.callback(
+    [Output('faro-playback', 'disabled'),
+     Output('faro-time-mode', 'value', allow_duplicate=True),
+     Output('faro-time-slider', 'value', allow_duplicate=True)],
+    Input('faro-play-btn', 'n_clicks'),
+    [State('faro-playback', 'disabled'),
+     State('faro-time-slider', 'value'),
+     State('faro-time-types', 'value'),
+     State('cytoscape-layout-dropdown', 'value'),
+     State('faro-play-stride', 'value')],
+    prevent_initial_call=True
+)
+def toggle_playback(n_clicks, paused, step, types, layout_name, stride):
+    """Play/pause; playing turns time mode on and restarts from the first date when no frame is left."""
+    if not paused: return True, dash.no_update, dash.no_update
+    frames = playback_frames(types, layout_name if layout_engine.supports(layout_name) else 'cose', stride)
+    return False, True, 0 if not len(frames) or step >= frames[-1] else dash.no_update
+
+
+app.clientside_callback("function(disabled) { return disabled ? 'Play' : 'Pause'; }", Output('faro-play-btn', 'children'), Input('faro-playback', 'disabled'))
+app.clientside_callback("function(fps) { return Math.round(1000 / (fps || 1)); }", Output('faro-playback', 'interval'), Input('faro-play-speed', 'value'))
+
+
+def faro_view_panel(view):
+    """Tap/search panel for a FARO view: focus node details and neighbors, or the search result message."""
+    if view.get('mode') == 'search':
+        if not view_graph('faro', view)[0]: return dbc.Alert(f"No results found for '{view['search']}'.", color="warning")
+        return dbc.Alert(f"Showing search results for '{view['search']}'. Click node for details.", color="success")
+    if view.get('mode') != 'focus': return "Click a node for details."
+    node_id = view['node']
+    node = faro_index.get_node(node_id) or {'label': node_id}
+    neighbor_details_list = []
+    for _, other_node_id in faro_index.neighbors(node_id):
+        other_node_data = faro_index.get_node(other_node_id)
+        if other_node_data: neighbor_details_list.append(f"{other_node_data.get('label', other_node_id)} ({other_node_data.get('type', 'N/A')})")
+
+    tap_output_msg_content = [html.H5(f"Focus on: {node['label']}")]
+    for key, value in faro_index.node_details(node_id).items():
+        if value: tap_output_msg_content.append(html.P([html.Strong(f"{key.replace('_', ' ').title()}: "), str(value)], style={'fontSize': '0.9em'}))
+    if neighbor_details_list:
+        tap_output_msg_content.append(html.P(f"Directly connected to ({len(neighbor_details_list)}):"))
+        tap_output_msg_content.append(html.Ul([html.Li(d, style={'fontSize': '0.9em'}) for d in sorted(neighbor_details_list)]))
+    return dbc.Alert(tap_output_msg_content, color="info", style={'maxHeight': '300px', 'overflowY': 'auto'})
+
+
+def register_breadcrumb(graph_name):
+    @app.callback([Output(f'{graph_name}-breadcrumb', 'children'), Output(f'{graph_name}-back-btn', 'disabled')],
+                  Input(f'{graph_name}-view-history', 'data'), prevent_initial_call=True)
+    def render_breadcrumb(history):
+        return breadcrumb(graph_name, history), not history
+
+
+for graph_name in ('faro', 'actor'): register_breadcrumb(graph_name)
+
+
+# --- Callbacks for the Causal Patterns sub-tab (queries hit the precomputed causal index) ---
+@app.callback(Output('causal-event-details', 'children'), Input('cytoscape-causal-graph', 'tapNodeData'), prevent_initial_call=True)
+def show_causal_event(tap_node):
+    if not tap_node: raise PreventUpdate
+    return causal_event_card(tap_node['id'])
+
+
+@app.callback(Output('causal-paths-output', 'children'), [Input('causal-path-source', 'value'), Input('causal-path-target', 'value')])
+def show_causal_paths(source_id, target_id):
+    return causal_paths_panel(source_id, target_id)
+
+
+def register_causal_event_search(dropdown_id):
+    @app.callback(Output(dropdown_id, 'options'), Input(dropdown_id, 'search_value'), State(dropdown_id, 'value'), prevent_initial_call=True)
+    def search_causal_events(search_value, selected):
+        return causal_event_options(search_value, selected) # Options come from the server: large datasets never ship every event
+
+
+for causal_dropdown_id in ('causal-path-source', 'causal-path-target'): register_causal_event_search(causal_dropdown_id)
 
 
 # --- Callbacks for Timeline Tab ---
 @app.callback(
     [Output('timeline-graph', 'figure'),
      Output('event-details', 'children'),
-     Output('timeline-table', 'data')],
+     Output('timeline-filters', 'data')],
     [Input('event-type-dropdown', 'value'),
      Input('date-range-picker', 'start_date'),
      Input('date-range-picker', 'end_date'),
-     Input('timeline-graph', 'clickData')],
-    [State('timeline-table', 'data')]
+     Input('timeline-graph', 'clickData'),
+     Input('timeline-graph', 'relayoutData')],
+    [State('timeline-filters', 'data')]
 )
-def update_timeline(selected_types, start_date_str, end_date_str, click_data, table_data_state):
+def update_timeline(selected_types, start_date_str, end_date_str, click_data, relayout_data, table_data_state):
     ctx = dash.callback_context
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else 'initial_load'
-    filtered_df = timeline_df.copy()
-    if selected_types: filtered_df = filtered_df[filtered_df['type'].isin(selected_types)]
-    if start_date_str and end_date_str:
-        try:
-            start_date, end_date = pd.to_datetime(start_date_str).normalize(), pd.to_datetime(end_date_str).normalize()
-            filtered_df = filtered_df[(filtered_df['date_parsed'] >= start_date) & (filtered_df['date_parsed'] <= end_date)]
-        except Exception as e: print(f"Date parsing/filtering error: {e}")
-    fig = create_timeline_figure(filtered_df)
-    table_data = filtered_df[['date_str', 'title', 'type', 'location', 'actors_str']].to_dict('records')
+    prop_id = ctx.triggered[0]['prop_id'] if ctx.triggered else 'initial_load'
+    filters = {'types': selected_types or [], 'start_date': start_date_str, 'end_date': end_date_str, 'window': None} # Filter descriptor, not the filtered rows
     event_details_children = dbc.Alert("Click an event bubble in the timeline.", color="info")
-    if trigger_id == 'timeline-graph' and click_data:
-        try:
-            event_title = click_data['points'][0]['hovertext']
-            event_data = events_df[events_df['title'] == event_title]
-            if not event_data.empty:
-                row = event_data.iloc[0]
-                preceded_by = causal_links_df[causal_links_df['target_event'] == event_title]['source_event'].tolist()
-                led_to = causal_links_df[causal_links_df['source_event'] == event_title]['target_event'].tolist()
-                event_details_children = dbc.Card([dbc.CardHeader(html.H5(row['title'])), dbc.CardBody([html.P([html.Strong("Date: "), row['date']]), html.P([html.Strong("Location: "), row['location']]), html.P([html.Strong("Type: "), row['type']]), html.P([html.Strong("Actors: "), ", ".join(row['actors'])]), html.H6("Summary:"), html.P(row['summary']), html.H6("Causal Context:", style={'marginTop':'10px'}), html.P([html.Strong("Preceded by: "), ", ".join(preceded_by) or "None"]), html.P([html.Strong("Leads to: "), ", ".join(led_to) or "None"]), ])], outline=True, color="light", className="mb-3")
-            else: event_details_children = dbc.Alert(f"Details not found for event: {event_title}", color="warning")
-        except Exception as e: print(f"Error extracting event details from click: {e}"); traceback.print_exc(); event_details_children = dbc.Alert(f"Error loading event details: {str(e)}", color="danger")
-    return fig, event_details_children, table_data
+    if prop_id == 'timeline-graph.relayoutData': # Zoom/pan: only the LOD timeline redraws for the new window
+        window = timeline_zoom_window(relayout_data)
+        if not timeline_lod_enabled or window is None or table_data_state is None: raise PreventUpdate
+        window = None if window == 'reset' else window
+        return timeline_lod_figure(selected_types, start_date_str, end_date_str, window), dash.no_update, {**filters, 'window': window}
+    if prop_id == 'timeline-graph.clickData':
+        if click_data and 'hovertext' not in click_data['points'][0]: event_details_children = dbc.Alert("This bar counts several events; zoom in to click single events.", color="info")
+        elif click_data:
+            try:
+                event_title = click_data['points'][0]['hovertext']
+                event_node = faro_index.get_node(event_title)
+                if event_node is not None and event_node['type'] == 'Event':
+                    row = faro_index.node_details(event_title)
+                    preceded_by = [other for _, other in faro_index.neighbors(event_title, ('causal',), 'in')]
+                    led_to = [other for _, other in faro_index.neighbors(event_title, ('causal',), 'out')]
+                    event_details_children = dbc.Card([dbc.CardHeader(html.H5(event_title)), dbc.CardBody([html.P([html.Strong("Date: "), row['date']]), html.P([html.Strong("Location: "), row['location']]), html.P([html.Strong("Type: "), row['type']]), html.P([html.Strong("Actors: "), ", ".join(row['actors'])]), html.H6("Summary:"), html.P(row['summary']), html.H6("Causal Context:", style={'marginTop':'10px'}), html.P([html.Strong("Preceded by: "), ", ".join(preceded_by) or "None"]), html.P([html.Strong("Leads to: "), ", ".join(led_to) or "None"]), html.P([html.Strong("Downstream: "), f"leads to {causal_index.downstream_count(event_title)} events"]), ])], outline=True, color="light", className="mb-3")
+                else: event_details_children = dbc.Alert(f"Details not found for event: {event_title}", color="warning")
+            except Exception as e: print(f"Error extracting event details from click: {e}"); traceback.print_exc(); event_details_children = dbc.Alert(f"Error loading event details: {str(e)}", color="danger")
+        return dash.no_update, event_details_children, dash.no_update # Clicks leave the figure alone
+    if timeline_lod_enabled: return timeline_lod_figure(selected_types, start_date_str, end_date_str), event_details_children, filters
+    if table_data_state is None: # First render of the tab: the graph has no figure yet
+        return timeline_figure(selected_types, start_date_str, end_date_str), event_details_children, filters
+    return timeline_filter_patch(selected_types, start_date_str, end_date_str), event_details_children, filters
+
+
+@app.callback(
+    [Output('timeline-table', 'data'),
+     Output('timeline-table', 'page_count'),
+     Output('timeline-table', 'page_current')],
+    [Input('timeline-table', 'page_current'),
+     Input('timeline-table', 'page_size'),
+     Input('timeline-table', 'sort_by'),
+     Input('timeline-table', 'filter_query'),
+     Input('timeline-filters', 'data')]
+)
+def page_table_timeline(page_current, page_size, sort_by, filter_query, filters):
+    filters = filters or {}
+    mask = timeline_event_mask(filters.get('types'), filters.get('start_date'), filters.get('end_date'), filters.get('window'))
+    return table_page_outputs('timeline', page_current, page_size, sort_by, filter_query, mask)
 
 
 # --- Callbacks for Actor Tab ---
 @app.callback(
     [Output('actor-network-container', 'style'),
-     Output('actor-table-container', 'style'),
-     Output('actor-details', 'children'),
+     Output('actor-table-container', 'style')],
+    Input('actor-view-toggle', 'value')
+)
+def toggle_actor_view(view_option):
+    network_style = {'display': 'block'} if view_option == 'network' else {'display': 'none'}
+    table_style = {'display': 'block'} if view_option == 'table' else {'display': 'none'}
+    return network_style, table_style
+
+
+@app.callback(
+    [Output('actors-table', 'data'),
+     Output('actors-table', 'page_count'),
+     Output('actors-table', 'page_current'),
+     Output('actors-table', 'selected_rows')],
+    [Input('actors-table', 'page_current'),
+     Input('actors-table', 'page_size'),
+     Input('actors-table', 'sort_by'),
+     Input('actors-table', 'filter_query')],
+    [State('actors-table', 'selected_rows')]
+)
+def page_table_actors(page_current, page_size, sort_by, filter_query, selected_rows):
+    records, page_count, page_current = table_page_outputs('actors', page_current, page_size, sort_by, filter_query)
+    return records, page_count, page_current, [] if selected_rows else dash.no_update # Row indices are per page
+
+
+@app.callback(
+    [Output('actor-details', 'children'),
      Output('cytoscape-actor-network', 'elements'),
-     Output('cytoscape-actor-network', 'layout'),
      Output('actor-search-input', 'value'),
-     Output('cytoscape-actor-network', 'stylesheet')],
-    [Input('actor-view-toggle', 'value'),
-     Input('cytoscape-actor-network', 'tapNodeData'),
+     Output('actor-view-store', 'data'),
+     Output('actor-view-history', 'data')],
+    [Input('cytoscape-actor-network', 'tapNodeData'),
      Input('actors-table', 'selected_rows'),
      Input('reset-actor-btn', 'n_clicks'),
-     Input('cytoscape-actor-layout-dropdown', 'value'),
      Input('actor-search-input', 'value'),
-     Input('actor-font-size-slider', 'value')],
-    [State('actors-table', 'data')]
+     Input('actor-back-btn', 'n_clicks'),
+     Input({'type': 'view-crumb', 'graph': 'actor', 'index': ALL}, 'n_clicks')],
+    [State('actors-table', 'data'),
+     State('cytoscape-actor-layout-dropdown', 'value'),
+     State('actor-view-store', 'data'),
+     State('actor-view-history', 'data'),
+     State('session-id', 'data')],
+    prevent_initial_call=True
 )
-def update_actor_view_and_cytoscape(view_option, cyto_tap_node, table_selected_rows, reset_clicks, layout_name, search_value, font_size, table_data):
-    network_style = {'display': 'block'} if view_option == 'network' else {'display': 'none'}
-    table_style = {'display': 'block'} if view_option == 'table' else {'display': 'none'}
+def update_actor_view_and_cytoscape(cyto_tap_node, table_selected_rows, reset_clicks, search_value, back_clicks, crumb_clicks, table_data, layout_name, current_view, history, session_id):
     actor_details_children = dbc.Alert("Click an actor node or select a table row.", color="info")
     actor_name = None
     clear_search = dash.no_update # Only clear search on reset or click
@@ -829,6 +1336,7 @@ def update_actor_view_and_cytoscape(view_option, cyto_tap_node, table_selected_r
     ctx = dash.callback_context
     triggered_prop_id = ctx.triggered[0]['prop_id'] if ctx.triggered else 'initial_load'
     trigger_id = triggered_prop_id.split('.')[0]
+    navigation = navigation_target('actor', history)
 
     # Determine selected actor name and clear search if needed
     try:
@@ -839,130 +1347,99 @@ def update_actor_view_and_cytoscape(view_option, cyto_tap_node, table_selected_r
             actor_name = table_data[selected_row_index]['Name']; clear_search = ""
         elif trigger_id == 'reset-actor-btn':
              actor_name = None; clear_search = ""
+        elif navigation:
+            clear_search = navigation[0].get('search', "")
     except Exception as e: print(f"Error determining selected actor: {e}"); actor_details_children = dbc.Alert(f"Error identifying selected actor: {e}", color="danger")
 
-    # Update Actor Details Panel
-    if actor_name:
-        try: # Logic remains the same as before
-            match_ind = individuals_df[individuals_df['name'] == actor_name]; match_act = actors_df[actors_df['name'] == actor_name]
-            if not match_ind.empty:
-                ind = match_ind.iloc[0]; events = ind.get('events', [])
-                actor_details_children = dbc.Card([ dbc.CardHeader(html.H5(ind['name'])), dbc.CardBody([ html.P([html.Strong("Type: "), f"Individual ({ind.get('role', 'N/A')})"]), html.P([html.Strong("Description: "), ind.get('description', 'N/A')]), html.P([html.Strong("Involvement: "), ind.get('involvement', 'N/A')]), html.H6("Events:", style={'marginTop': '10px'}), html.Ul([html.Li(e) for e in events]) if events else html.P("None") ]) ], outline=True, color="light")
-            elif not match_act.empty:
-                act = match_act.iloc[0]; events = act.get('events', [])
-                actor_details_children = dbc.Card([ dbc.CardHeader(html.H5(act['name'])), dbc.CardBody([ html.P([html.Strong("Type: "), act.get('type', 'N/A')]), html.P([html.Strong("Role: "), act.get('role', 'N/A')]), html.H6("Events:", style={'marginTop': '10px'}), html.Ul([html.Li(e) for e in events]) if events else html.P("None") ]) ], outline=True, color="light")
-            else: actor_details_children = dbc.Alert(f"Details not found for {actor_name}", color="warning")
-        except Exception as e: print(f"Error creating actor details card: {e}"); actor_details_children = dbc.Alert(f"Error loading actor details: {str(e)}", color="danger")
-
-    # --- Update Actor Cytoscape Elements, Layout, and Stylesheet ---
-    layout_config = {'name': layout_name or 'cose', 'animate': False, 'fit': True, 'padding': 50}
-    if layout_name == 'concentric': layout_config['levelWidth'] = lambda nodes: 2
-    elif layout_name == 'cose': layout_config.update({'idealEdgeLength': 150, 'nodeRepulsion': 70000})
-
-    stylesheet = update_stylesheet_font_size(default_stylesheet, font_size or 10)
-    elements = []
+    # Update Actor Details Panel (table selections; graph views get theirs from the view cache)
+    if actor_name and trigger_id == 'actors-table': actor_details_children = actor_details_card(actor_name)
+
+    # --- Update Actor Cytoscape Elements (only when the visible node set changes) ---
+    layout_name = layout_name if layout_engine.supports(layout_name) else 'cose'
     current_search = search_value if clear_search == dash.no_update else ""
 
-    if view_option == 'network':
-        # Priority: Reset > Click > Search > Load/Layout Change
-        if trigger_id == 'reset-actor-btn':
-             if debug_mode: print("Actor Cyto: Resetting graph.")
-             elements = create_cytoscape_elements(graph_type='actor')
-             layout_config = {'name': 'cose', 'idealEdgeLength': 150, 'nodeRepulsion': 70000, 'animate': False, 'fit': True, 'padding': 50} # Reset layout too
-
-        elif actor_name and trigger_id == 'cytoscape-actor-network': # Subgraph on click
-            if debug_mode: print(f"Actor Cyto: Creating subgraph for {actor_name}")
-            neighbors_ids = {actor_name}
-            edges_to_include = []
-            for edge in actor_actor_edges_cy:
-                 if edge['source'] == actor_name: neighbors_ids.add(edge['target']); edges_to_include.append(edge)
-                 elif edge['target'] == actor_name: neighbors_ids.add(edge['source']); edges_to_include.append(edge)
-            sub_nodes = [n for n in actor_individual_nodes_cy if n['id'] in neighbors_ids]
-            elements = create_cytoscape_elements(nodes_list=sub_nodes, edges_list=edges_to_include, graph_type='actor')
-            layout_config.update({'name': 'concentric', 'padding': 70}) # Focus layout
-
-        elif trigger_id == 'actor-search-input' and current_search: # Filtered graph on search trigger
-             if debug_mode: print(f"Actor Cyto: Filtering graph for search '{current_search}'")
-             search_lower = current_search.lower()
-             filtered_nodes = [n for n in actor_individual_nodes_cy if search_lower in n['label'].lower()]
-             filtered_node_ids = {n['id'] for n in filtered_nodes}
-             filtered_edges = [e for e in actor_actor_edges_cy if e['source'] in filtered_node_ids and e['target'] in filtered_node_ids]
-             elements = create_cytoscape_elements(nodes_list=filtered_nodes, edges_list=filtered_edges, graph_type='actor')
-             if not elements: actor_details_children = dbc.Alert(f"No actors match '{current_search}'.", color="warning")
-
-        else: # Full graph (potentially filtered by existing search term if layout/font changed)
-            if debug_mode: print(f"Actor Cyto: Creating full graph (Search: '{current_search}').")
-            nodes_to_use = actor_individual_nodes_cy
-            if current_search: # Apply existing search if present
-                 search_lower = current_search.lower()
-                 nodes_to_use = [n for n in actor_individual_nodes_cy if search_lower in n['label'].lower()]
-            filtered_node_ids = {n['id'] for n in nodes_to_use}
-            edges_to_use = [e for e in actor_actor_edges_cy if e['source'] in filtered_node_ids and e['target'] in filtered_node_ids]
-            elements = create_cytoscape_elements(nodes_list=nodes_to_use, edges_list=edges_to_use, graph_type='actor')
-
-    # If table view is active, return empty elements/preset layout
-    elif view_option == 'table':
-        elements = []
-        layout_config = {'name': 'preset'}
-
-    return network_style, table_style, actor_details_children, elements, layout_config, clear_search, stylesheet
-
-
-# --- Callback for Actor Cytoscape Hover ---
-@app.callback(
-    Output('cytoscape-actor-hover-output', 'children'),
-    Input('cytoscape-actor-network', 'mouseoverNodeData'),
-    Input('cytoscape-actor-network', 'mouseoverEdgeData'),
-    prevent_initial_call=True
-)
-def display_actor_cyto_hover(node_data, edge_data):
+    # Priority: Reset > Back/breadcrumb > Click > Search > Full graph
+    if trigger_id == 'reset-actor-btn':
+        if debug_mode: print("Actor Cyto: Resetting graph.")
+        return actor_details_children, graph_view_elements('actor', 'cose'), clear_search, FULL_VIEW, [] # Reset layout too
+
+    if navigation:
+        view, history = navigation
+        if debug_mode: print(f"Actor Cyto: Navigating to {view_label('actor', view)}")
+    elif actor_name and trigger_id == 'cytoscape-actor-network': # Subgraph on click
+        if debug_mode: print(f"Actor Cyto: Creating subgraph for {actor_name}")
+        view = {'mode': 'focus', 'node': actor_name}
+    elif current_search: # Filtered graph on search
+        if debug_mode: print(f"Actor Cyto: Filtering graph for search '{current_search}'")
+        view = {'mode': 'search', 'search': current_search}
+    else:
+        if debug_mode: print("Actor Cyto: Full graph.")
+        view = FULL_VIEW
+    if not navigation: history = push_view(history, view)
+
+    elements, view_panel = cached_view(session_id, 'actor', view, layout_name, actor_view_panel)
+    if trigger_id != 'actors-table' and view_panel is not None: actor_details_children = view_panel
+    if view == current_view: return actor_details_children, dash.no_update, clear_search, dash.no_update, history
+    return actor_details_children, elements, clear_search, view, history
+
+
+def actor_view_panel(view):
+    """Details panel for an actor-graph view: the focus node's card, a no-match alert for empty searches, else None (default panel)."""
+    if view.get('mode') == 'focus': return actor_details_card(view['node'])
+    if view.get('mode') == 'search' and not view_graph('actor', view)[0]: return dbc.Alert(f"No actors match '{view['search']}'.", color="warning")
+    return None
+
+
+def actor_details_card(actor_name):
     try:
-        if node_data:
-            details = json.loads(node_data.get('details_json', '{}')) # Use details_json
-            content = [html.Strong(f"{node_data.get('label', 'Actor')} ({node_data.get('type', 'N/A')})")]
-            role_desc = details.get('role') or details.get('description') # Get role/desc from details
-            if role_desc: content.append(html.P(f"Role/Desc: {role_desc}", style={'margin': '2px 0', 'fontSize': '0.85em'}))
-            return content
-        elif edge_data:
-            details = json.loads(edge_data.get('details_json', '{}'))
-            source, target, label = edge_data.get('source', '?'), edge_data.get('target', '?'), edge_data.get('label', 'related')
-            shared_events = details.get('shared_events', []) # Get shared events from details
-            desc = f" - Shared Events ({len(shared_events)}): {', '.join(shared_events[:5])}{'...' if len(shared_events) > 5 else ''}"
-            return [html.Strong("Link (Shared Events):"), html.Br(), f"{source} ↔︎ {target}", html.Br(), html.Small(desc)]
-        return "Hover over an actor/individual node or link."
-    except Exception as e: print(f"Error in actor hover display: {e}"); return "Error displaying hover data."
-
-
-# --- Callback for Causal Graph Layout & Font Size (Tab 4) ---
-@app.callback(
-    [Output('cytoscape-causal-graph', 'layout'),
-     Output('cytoscape-causal-graph', 'stylesheet')],
-    [Input('cytoscape-causal-layout-dropdown', 'value'),
-     Input('reset-causal-layout', 'n_clicks'),
-     Input('causal-font-size-slider', 'value')]
-)
-def update_causal_graph_display(layout_value, reset_clicks, font_size):
-    ctx = dash.callback_context
-    triggered_prop_id = ctx.triggered[0]['prop_id'] if ctx.triggered else 'initial_load'
-    trigger_id = triggered_prop_id.split('.')[0]
-
-    # Determine layout name
-    layout_name = 'dagre' # Default
-    if trigger_id == 'reset-causal-layout': layout_name = 'dagre'
-    elif trigger_id == 'cytoscape-causal-layout-dropdown': layout_name = layout_value or 'dagre'
-
-    # Configure layout
-    layout_config = {'name': layout_name, 'animate': False, 'fit': True, 'padding': 50} # Increased padding
-    if layout_name == 'dagre': layout_config.update({'rankDir': 'TB', 'rankSep': 120, 'nodeSep': 100}) # Spacing for better centering attempt
-    elif layout_name == 'cose': layout_config.update({'idealEdgeLength': 150, 'nodeRepulsion': 40000})
-    elif layout_name == 'breadthfirst': layout_config.update({'roots': '#Ukraine Drops EU Deal; Protests Begin (Euromaidan)', 'spacingFactor': 1.8})
-    elif layout_name == 'circle': layout_config.update({'radius': 350}) # Example adjustment
-
-    # Update stylesheet with font size
-    stylesheet = update_stylesheet_font_size(default_stylesheet, font_size or 10)
-
-    if debug_mode: print(f"Updating causal graph: Layout='{layout_name}', Font Size='{font_size}px'")
-    return layout_config, stylesheet
+        match_ind = individuals_df[individuals_df['name'] == actor_name]; match_act = actors_df[actors_df['name'] == actor_name]
+        if not match_ind.empty:
+            ind = match_ind.iloc[0]; events = ind.get('events', [])
+            return dbc.Card([ dbc.CardHeader(html.H5(ind['name'])), dbc.CardBody([ html.P([html.Strong("Type: "), f"Individual ({ind.get('role', 'N/A')})"]), html.P([html.Strong("Description: "), ind.get('description', 'N/A')]), html.P([html.Strong("Involvement: "), ind.get('involvement', 'N/A')]), html.H6("Events:", style={'marginTop': '10px'}), html.Ul([html.Li(e) for e in events]) if events else html.P("None") ]) ], outline=True, color="light")
+        if not match_act.empty:
+            act = match_act.iloc[0]; events = act.get('events', [])
+            return dbc.Card([ dbc.CardHeader(html.H5(act['name'])), dbc.CardBody([ html.P([html.Strong("Type: "), act.get('type', 'N/A')]), html.P([html.Strong("Role: "), act.get('role', 'N/A')]), html.H6("Events:", style={'marginTop': '10px'}), html.Ul([html.Li(e) for e in events]) if events else html.P("None") ]) ], outline=True, color="light")
+        return dbc.Alert(f"Details not found for {actor_name}", color="warning")
+    except Exception as e: print(f"Error creating actor details card: {e}"); return dbc.Alert(f"Error loading actor details: {str(e)}", color="danger")
+
+
+# --- Clientside callbacks (assets/clientside.js): font size, layout switching and hover panels ---
+# Pure presentation, so these never reach the server; layouts switch between the precomputed positions stores.
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='setFontSize'), Output('cytoscape-causal-graph', 'stylesheet'), Input('causal-font-size-slider', 'value'), State('cytoscape-causal-graph', 'stylesheet'), prevent_initial_call=True)
+for graph_name, graph_id in [('faro', 'cytoscape-faro-network'), ('actor', 'cytoscape-actor-network')]: # Font size plus metric size/colour mappings
+    app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='nodeStyle'), Output(graph_id, 'stylesheet'),
+                            [Input(f'{graph_name}-font-size-slider', 'value'), Input(f'{graph_name}-node-size-dropdown', 'value'), Input(f'{graph_name}-node-colour-dropdown', 'value')],
+                            State(f'{graph_name}-node-styles', 'data'), prevent_initial_call=True)
+
+# --- Layout positions: the default layout ships with the page, others are added to the store when first selected ---
+LAYOUT_DROPDOWNS = {'faro': 'cytoscape-layout-dropdown', 'actor': 'cytoscape-actor-layout-dropdown', 'causal': 'cytoscape-causal-layout-dropdown'}
+
+
+def register_layout_loader(graph_name):
+    @app.callback([Output(f'{graph_name}-layout-positions', 'data'), Output(f'{graph_name}-layouts-loaded', 'data')],
+                  Input(LAYOUT_DROPDOWNS[graph_name], 'value'), State(f'{graph_name}-layouts-loaded', 'data'), prevent_initial_call=True)
+    def load_layout_positions(layout_name, loaded):
+        loaded = loaded or []
+        if layout_name in loaded or not layout_engine.supports(layout_name): raise PreventUpdate # Already in the browser
+        patch = Patch()
+        patch[layout_name] = layout_positions(graph_name, layout_name) # Adds one key; the layouts already sent stay put
+        return patch, loaded + [layout_name]
+
+
+for graph_name in LAYOUT_DROPDOWNS: register_layout_loader(graph_name)
+
+# The positions store is an Input too: a layout selected for the first time is applied once its positions arrive
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='faroLayout'), Output('cytoscape-faro-network', 'layout'),
+                        [Input('cytoscape-layout-dropdown', 'value'), Input('faro-view-store', 'data'), Input('faro-layout-positions', 'data')], prevent_initial_call=True)
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='actorLayout'), Output('cytoscape-actor-network', 'layout'),
+                        [Input('cytoscape-actor-layout-dropdown', 'value'), Input('actor-view-store', 'data'), Input('actor-layout-positions', 'data')], prevent_initial_call=True)
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='causalLayout'), Output('cytoscape-causal-graph', 'layout'),
+                        [Input('cytoscape-causal-layout-dropdown', 'value'), Input('reset-causal-layout', 'n_clicks'), Input('causal-layout-positions', 'data')], prevent_initial_call=True)
+
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='faroHover'), Output('cytoscape-hover-output', 'children'),
+                        [Input('cytoscape-faro-network', 'mouseoverNodeData'), Input('cytoscape-faro-network', 'mouseoverEdgeData')], prevent_initial_call=True)
+app.clientside_callback(ClientsideFunction(namespace='crimea', function_name='actorHover'), Output('cytoscape-actor-hover-output', 'children'),
+                        [Input('cytoscape-actor-network', 'mouseoverNodeData'), Input('cytoscape-actor-network', 'mouseoverEdgeData')], prevent_initial_call=True)
 
 # ------------------------------------------------------------------------------
 # RUN THE APPLICATION
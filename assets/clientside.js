@@ -0,0 +1,124 @@
+// ------------------------------------------------------------------------------
+// CLIENTSIDE CALLBACKS (registered in Crimea.py via ClientsideFunction)
+// ------------------------------------------------------------------------------
+// Presentation-only updates run in the browser and never reach the server:
+// stylesheet font size, switching between precomputed layouts and hover panels.
+// Hover text is built from the details_json already embedded in element data.
+
+function htmlComponent(type, children, style) {
+    var props = {children: children};
+    if (style) props.style = style;
+    return {type: type, namespace: 'dash_html_components', props: props};
+}
+
+function parseDetails(data) {
+    try { return JSON.parse(data.details_json || '{}'); } catch (e) { return {}; }
+}
+
+function isEmpty(value) {
+    if (!value) return true;
+    if (Array.isArray(value)) return value.length === 0;
+    if (typeof value === 'object') return Object.keys(value).length === 0;
+    return false;
+}
+
+function titleCase(key) {
+    return key.split('_').map(function(w) { return w.charAt(0).toUpperCase() + w.slice(1); }).join(' ');
+}
+
+function triggeredId() {
+    var triggered = window.dash_clientside.callback_context.triggered;
+    return triggered && triggered.length ? triggered[0].prop_id.split('.')[0] : 'initial_load';
+}
+
+// Preset layout for a view: the view store changing means new elements (with positions) arrived,
+// so only fit them; a layout change applies the precomputed full-graph positions of that layout,
+// or waits for them if the server has not sent that layout yet (the positions store then triggers).
+function viewLayout(layoutName, view, positionsByLayout, focusPadding) {
+    var padding = view && view.mode === 'focus' ? focusPadding : 50;
+    var layout = {name: 'preset', animate: false, fit: true, padding: padding};
+    if (triggeredId().indexOf('view-store') !== -1) return layout;
+    if (!positionsByLayout[layoutName]) return window.dash_clientside.no_update;
+    layout.positions = positionsByLayout[layoutName];
+    return layout;
+}
+
+var HOVER_SKIP_KEYS = ['details_dict', 'actors', 'color', 'date_parsed', 'actors_str', 'end_date'];
+var HOVER_STYLE = {margin: '2px 0', fontSize: '0.85em'};
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    crimea: {
+        setFontSize: function(fontSize, stylesheet) {
+            return (stylesheet || []).map(function(rule) {
+                if (rule.selector !== 'node') return rule;
+                return {selector: rule.selector, style: Object.assign({}, rule.style, {'font-size': (fontSize || 10) + 'px'})};
+            });
+        },
+
+        nodeStyle: function(fontSize, sizeBy, colourBy, styles) {
+            // Base stylesheet + metric mapping rules (later rules win), then the font size
+            var rules = styles.base.concat(styles.size[sizeBy] || [], styles.colour[colourBy] || []);
+            return window.dash_clientside.crimea.setFontSize(fontSize, rules);
+        },
+
+        faroLayout: function(layoutName, view, positionsByLayout) {
+            return viewLayout(layoutName, view, positionsByLayout, 60);
+        },
+
+        actorLayout: function(layoutName, view, positionsByLayout) {
+            return viewLayout(layoutName, view, positionsByLayout, 70);
+        },
+
+        causalLayout: function(layoutValue, resetClicks, positionsByLayout) {
+            var layoutName = triggeredId() === 'reset-causal-layout' ? 'dagre' : (layoutValue || 'dagre');
+            if (!positionsByLayout[layoutName]) return window.dash_clientside.no_update; // Arrives with the positions store
+            return {name: 'preset', animate: false, fit: true, padding: 50, positions: positionsByLayout[layoutName]};
+        },
+
+        faroHover: function(nodeData, edgeData) {
+            if (nodeData) {
+                var details = parseDetails(nodeData);
+                var content = [htmlComponent('Strong', (nodeData.label || 'Node') + ' (' + (nodeData.type || 'N/A') + ')')];
+                Object.keys(details).forEach(function(key) {
+                    var value = details[key];
+                    if (isEmpty(value) || HOVER_SKIP_KEYS.indexOf(key) !== -1) return; // Filter internal/redundant keys
+                    var displayValue = Array.isArray(value) ? value.join(', ') : String(value);
+                    if (typeof value === 'string' && value.length > 150) displayValue = value.slice(0, 150) + '...';
+                    content.push(htmlComponent('P', titleCase(key) + ': ' + displayValue, HOVER_STYLE));
+                });
+                return content;
+            }
+            if (edgeData) {
+                var edgeDetails = parseDetails(edgeData);
+                var desc = '';
+                if (edgeData.edge_type === 'causal') desc = ' (' + (edgeDetails.description || '') + ')';
+                else if (edgeData.edge_type === 'shared_event') {
+                    var shared = edgeDetails.shared_events || [];
+                    desc = ' - Events: ' + shared.slice(0, 5).join(', ') + (shared.length > 5 ? '...' : '');
+                }
+                // Node labels equal node ids, so source/target can be shown directly
+                return [htmlComponent('Strong', 'Relationship:'), htmlComponent('Br'),
+                        (edgeData.source || '?') + ' → ' + (edgeData.label || 'related to') + ' → ' + (edgeData.target || '?') + desc];
+            }
+            return 'Hover over a node or edge.';
+        },
+
+        actorHover: function(nodeData, edgeData) {
+            if (nodeData) {
+                var details = parseDetails(nodeData);
+                var content = [htmlComponent('Strong', (nodeData.label || 'Actor') + ' (' + (nodeData.type || 'N/A') + ')')];
+                var roleDesc = details.role || details.description; // Get role/desc from details
+                if (roleDesc) content.push(htmlComponent('P', 'Role/Desc: ' + roleDesc, HOVER_STYLE));
+                return content;
+            }
+            if (edgeData) {
+                var shared = parseDetails(edgeData).shared_events || [];
+                var count = edgeData.weight !== undefined ? edgeData.weight : shared.length;
+                var desc = ' - Shared Events (' + count + '): ' + shared.slice(0, 5).join(', ') + (count > 5 ? '...' : '');
+                return [htmlComponent('Strong', 'Link (Shared Events):'), htmlComponent('Br'),
+                        (edgeData.source || '?') + ' ↔︎ ' + (edgeData.target || '?'), htmlComponent('Br'), htmlComponent('Small', desc)];
+            }
+            return 'Hover over an actor/individual node or link.';
+        }
+    }
+});
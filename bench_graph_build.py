@@ -0,0 +1,197 @@
+"""
+Benchmark: legacy iterrows() graph construction vs. the columnar builders in graph_builder.py.
+
+    python bench_graph_build.py                      # 10k, 100k and 1M events
+    python bench_graph_build.py --sizes 10000 100000 --skip-legacy-above 100000
+    python bench_graph_build.py --sizes 10000 --workers 4 --snapshot-size 100000
+
+Memory columns are the bytes still allocated after the build (tracemalloc, measured in a separate run),
+i.e. what each worker holds for the graph before any views are serialized.
+
+The snapshot table (Linux only) writes a prepared-graph snapshot of a synthetic dataset, loads it in --workers
+fresh processes at once and reports what loading added to each one (/proc/self/smaps_rollup): file-backed pages
+of the memory-mapped arrays, shared by all workers, and private memory for everything unpickled.
+"""
+import os
+import argparse
+import gc
+import time
+import tempfile
+import tracemalloc
+import multiprocessing
+import numpy as np
+import pandas as pd
+from graph_builder import build_graph, NODE_TYPES
+
+node_types = { "Event": "#4285F4", "Actor": "#EA4335", "Country": "#FBBC05", "Organization": "#34A853", "Individual": "#8F44AD", "Location": "#F39C12", "Method": "#3498DB", "Outcome": "#E74C3C" }
+ACTOR_TYPES = ["Country (Aggressor)", "International Organization", "Military", "Group (Civil)", "Regional Leader (De Facto)", "Political Party"]
+
+
+# ------------------------------------------------------------------------------
+# SYNTHETIC DATASET
+# ------------------------------------------------------------------------------
+def make_dataset(n_events, seed=0):
+    """Synthetic tables with the same columns as a real dataset: ~n/10 actors, ~n/50 individuals, n causal links."""
+    rng = np.random.default_rng(seed)
+    titles = np.array([f"Event {i}" for i in range(n_events)], dtype=object)
+    n_actors, n_individuals = max(n_events // 10, 1), max(n_events // 50, 1)
+
+    def random_event_lists(count, max_len):
+        lengths = rng.integers(1, max_len + 1, count)
+        flat = titles[rng.integers(0, n_events, lengths.sum())]
+        return [list(chunk) for chunk in np.split(flat, np.cumsum(lengths)[:-1])]
+
+    events_df = pd.DataFrame({
+        'date': '1 Mar 2014', 'title': titles, 'type': rng.choice(['Political', 'Military', 'Diplomatic'], n_events),
+        'actors': [[] for _ in range(n_events)], 'location': 'Somewhere', 'summary': 'Synthetic event summary.',
+        'date_parsed': pd.Timestamp('2014-03-01'), 'date_end': pd.Timestamp('2014-03-01'),
+    })
+    actors_df = pd.DataFrame({'name': [f"Actor {i}" for i in range(n_actors)], 'type': rng.choice(ACTOR_TYPES, n_actors), 'role': 'Synthetic role.', 'events': random_event_lists(n_actors, 20)})
+    individuals_df = pd.DataFrame({'name': [f"Person {i}" for i in range(n_individuals)], 'role': 'Official', 'description': 'Synthetic person.', 'involvement': 'Synthetic involvement.', 'events': random_event_lists(n_individuals, 10)})
+    causal_links_df = pd.DataFrame({'source_event': titles[rng.integers(0, n_events, n_events)], 'target_event': titles[rng.integers(0, n_events, n_events)], 'relationship': 'Escalation', 'description': 'Synthetic link.'})
+    return events_df, actors_df, individuals_df, causal_links_df
+
+
+# ------------------------------------------------------------------------------
+# LEGACY BUILDER (the iterrows() code previously inlined in Crimea.py)
+# ------------------------------------------------------------------------------
+def legacy_build(events_df, actors_df, individuals_df, causal_links_df):
+    event_nodes = []
+    for _, r in events_df.iterrows():
+        details = r.to_dict()
+        details.pop('title', None); details.pop('date_parsed', None); details.pop('date_end', None)
+        event_nodes.append({'id': r['title'], 'label': r['title'], 'type': 'Event', 'color': node_types['Event'], 'details_dict': details})
+    actor_nodes = []
+    for _, r in actors_df.iterrows():
+        type_str = r.get('type', '')
+        color, node_class = node_types['Actor'], 'Actor'
+        if "Country" in type_str: color, node_class = node_types['Country'], 'Country'
+        elif any(sub in type_str for sub in ["Organization", "Union", "Alliance", "Body", "Legislative", "Force", "Military", "Paramilitary", "Group", "Party", "Community", "Government", "Grouping", "Council", "Administration"]):
+            color, node_class = node_types['Organization'], 'Organization'
+        details = r.to_dict(); details.pop('name', None)
+        actor_nodes.append({'id': r['name'], 'label': r['name'], 'type': node_class, 'color': color, 'details_dict': details})
+    individual_nodes = []
+    for _, r in individuals_df.iterrows():
+        details = r.to_dict(); details.pop('name', None)
+        individual_nodes.append({'id': r['name'], 'label': r['name'], 'type': 'Individual', 'color': node_types['Individual'], 'details_dict': details})
+    all_nodes_base = event_nodes + actor_nodes + individual_nodes
+    node_ids = {n['id'] for n in all_nodes_base}
+    causal_edges = [{'source': r['source_event'], 'target': r['target_event'], 'label': r['relationship'], 'type': 'causal', 'details_dict': r.to_dict()} for i, r in causal_links_df.iterrows() if r['source_event'] in node_ids and r['target_event'] in node_ids]
+    actor_event_edges = [{'source': a['id'], 'target': e, 'label': 'involved_in', 'type': 'participation', 'details_dict': {'relation': 'involved_in'}} for a in actor_nodes for e in a['details_dict'].get('events', []) if a['id'] in node_ids and e in node_ids]
+    individual_event_edges = [{'source': ind['id'], 'target': e, 'label': 'participated_in', 'type': 'participation', 'details_dict': {'relation': 'participated_in'}} for ind in individual_nodes for e in ind['details_dict'].get('events', []) if ind['id'] in node_ids and e in node_ids]
+    return {'all_nodes_base': all_nodes_base, 'all_edges_base': causal_edges + actor_event_edges + individual_event_edges}
+
+
+# ------------------------------------------------------------------------------
+# RUN
+# ------------------------------------------------------------------------------
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def retained_mib(fn, *args):
+    """MiB allocated by fn(*args) and still held by its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 2**20
+
+
+# ------------------------------------------------------------------------------
+# SNAPSHOT MEMORY PER WORKER
+# ------------------------------------------------------------------------------
+def memory_rollup():
+    """Rss / Pss / Shared_* / Private_* of this process in MiB, from /proc/self/smaps_rollup."""
+    with open('/proc/self/smaps_rollup') as f:
+        fields = dict(line.split()[:2] for line in f if line.split()[0].endswith(':'))
+    return {key: int(fields[key + ':']) / 1024 for key in ['Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty']}
+
+
+def prepare_synthetic(n_events):
+    """prepare_data's output for a synthetic dataset (no entity resolution or metrics: names are already distinct)."""
+    from search_index import SearchIndex
+    from causal_analysis import CausalAnalysis
+    events_df, actors_df, individuals_df, causal_links_df = make_dataset(n_events)
+    graph_base = build_graph(events_df, actors_df, individuals_df, causal_links_df, NODE_TYPES)
+    return {
+        'events': events_df, 'actors': actors_df, 'individuals': individuals_df, 'causal_links': causal_links_df,
+        'graph': graph_base, 'search_index': SearchIndex(graph_base['store'].iter_nodes()),
+        'causal': CausalAnalysis(graph_base['store'], graph_base['causal_edges'].positions, [n['id'] for n in graph_base['event_nodes']]),
+    }
+
+
+def snapshot_worker(key, snapshot_dir, barrier, results):
+    """Loads the snapshot, reads every mapped array and reports the memory the load added, while all workers hold it."""
+    from snapshot import read_snapshot
+    before = memory_rollup()
+    prepared = read_snapshot(key, snapshot_dir)
+    store = prepared['graph']['store']
+    owners = [store, prepared['search_index'], prepared['causal'], *(details for _, _, details in store._batches)]
+    for value in (value for owner in owners for value in vars(owner).values() if isinstance(value, np.memmap)):
+        value.sum() # Fault every page in, as serving requests eventually does
+    barrier.wait()
+    after = memory_rollup()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait() # Stay alive until every worker has measured
+
+
+def snapshot_memory(n_events, workers):
+    """Per-worker memory after loading a snapshot of n_events synthetic events in `workers` processes at once."""
+    from snapshot import write_snapshot
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        path = write_snapshot(prepare_synthetic(n_events), 'bench', snapshot_dir)
+        mapped = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path) if name.endswith('.npy')) / 2**20
+        pickled = os.path.getsize(os.path.join(path, 'prepared.pkl')) / 2**20
+        context = multiprocessing.get_context('spawn') # Fresh interpreters, like gunicorn workers importing the app
+        barrier, results = context.Barrier(workers), context.Queue()
+        processes = [context.Process(target=snapshot_worker, args=('bench', snapshot_dir, barrier, results)) for _ in range(workers)]
+        for process in processes: process.start()
+        measured = [results.get() for _ in processes]
+        for process in processes: process.join()
+    return mapped, pickled, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--skip-legacy-above', type=int, default=None, help="Don't time the legacy builder above this many events")
+    parser.add_argument('--workers', type=int, default=4, help="Processes loading the snapshot at once (0 skips the snapshot table)")
+    parser.add_argument('--snapshot-size', type=int, default=100_000, help="Events in the snapshot's synthetic dataset")
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'nodes':>10} {'edges':>10} {'legacy (s)':>12} {'columnar (s)':>13} {'speedup':>8} {'legacy MiB':>11} {'columnar MiB':>13}")
+    for n_events in args.sizes:
+        tables = make_dataset(n_events)
+        columnar, t_columnar = timed(build_graph, *tables, node_types)
+        legacy_time, speedup, legacy_mib = "skipped", "-", "-"
+        if args.skip_legacy_above is None or n_events <= args.skip_legacy_above:
+            legacy, t_legacy = timed(legacy_build, *tables)
+            assert legacy['all_nodes_base'] == list(columnar['store'].iter_nodes()), "node lists differ"
+            assert legacy['all_edges_base'] == list(columnar['all_edges_base']), "edge lists differ"
+            legacy_time, speedup = f"{t_legacy:.2f}", f"{t_legacy / t_columnar:.1f}x"
+            del legacy
+            legacy_mib = f"{retained_mib(legacy_build, *tables):.0f}"
+        n_nodes, n_edges = len(columnar['all_nodes_base']), len(columnar['all_edges_base'])
+        del columnar
+        columnar_mib = retained_mib(build_graph, *tables, node_types)
+        print(f"{n_events:>10} {n_nodes:>10} {n_edges:>10} {legacy_time:>12} {t_columnar:>13.2f} {speedup:>8} {legacy_mib:>11} {columnar_mib:>13.0f}")
+
+    if args.workers <= 0: return
+    if not os.path.isfile('/proc/self/smaps_rollup'):
+        print("\nSnapshot memory per worker skipped (needs /proc/self/smaps_rollup)")
+        return
+    mapped, pickled, measured = snapshot_memory(args.snapshot_size, args.workers)
+    print(f"\nSnapshot of {args.snapshot_size} events: {mapped:.0f} MiB of .npy arrays (memory-mapped), {pickled:.0f} MiB pickle (unpickled in each worker)")
+    print(f"{'worker':>6} {'RSS MiB':>8} {'PSS MiB':>8} {'shared MiB':>11} {'private MiB':>12}")
+    for i, m in enumerate(measured):
+        print(f"{i:>6} {m['Rss']:>8.0f} {m['Pss']:>8.0f} {m['Shared_Clean'] + m['Shared_Dirty']:>11.0f} {m['Private_Clean'] + m['Private_Dirty']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
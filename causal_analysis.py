@@ -0,0 +1,319 @@
+import os
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from graph_api import LRUCache
+
+# ------------------------------------------------------------------------------
+# CAUSAL CHAIN ANALYTICS (reachability index over the causal_links graph, built once)
+# ------------------------------------------------------------------------------
+CAUSAL_REACH_BLOCK = int(os.environ.get('CAUSAL_REACH_BLOCK', 4096)) # Small components share bit matrices of about this many nodes
+CAUSAL_REACH_MAX_NODES = int(os.environ.get('CAUSAL_REACH_MAX_NODES', 20000)) # Larger components: no matrix, memoized BFS per query
+CAUSAL_COUNT_CHUNK = 8192 # Target columns per pass when counting descendants in a component without a matrix
+CAUSAL_MAX_PATHS = 100
+CAUSAL_PATH_MAX_STEPS = 200000 # Edges the path walk may follow; inside large cycles most simple paths are dead ends
+CAUSAL_CACHE_SIZE = 1024
+
+
+def _csr(rows, cols, n):
+    """(ptr, idx) adjacency with sorted, de-duplicated neighbors."""
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    matrix.sum_duplicates(); matrix.sort_indices()
+    return matrix.indptr.astype(np.int64), matrix.indices.astype(np.int32)
+
+
+def _gather(ptr, values, rows):
+    """Concatenated ptr-delimited runs of `values` for the given rows."""
+    rows = np.asarray(rows, dtype=np.int64)
+    lengths = ptr[rows + 1] - ptr[rows]
+    offsets = np.repeat(ptr[rows] - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+    return values[offsets]
+
+
+def _bfs(ptr, idx, start, n):
+    """Sorted nodes reachable from `start` (excluded) over a CSR adjacency."""
+    seen = np.zeros(n, dtype=bool)
+    frontier = np.array([start], dtype=np.int64)
+    while len(frontier):
+        nxt = np.unique(_gather(ptr, idx, frontier))
+        frontier = nxt[~seen[nxt]]
+        seen[frontier] = True
+    seen[start] = False
+    return np.flatnonzero(seen)
+
+
+def _closure(height, edge_src, edge_dst, size, col_lo=0, col_hi=None):
+    """
+    Packed reachability bits (size x ceil((col_hi - col_lo) / 8) uint8, big-endian bit order) for nodes
+    0..size-1 of a DAG, restricted to targets in [col_lo, col_hi). Sinks have height 0 and every edge goes
+    from a higher to a lower height, so processing edges level by level ORs in finished child rows.
+    """
+    col_hi = size if col_hi is None else col_hi
+    reach = np.zeros((size, (col_hi - col_lo + 7) // 8), dtype=np.uint8)
+    if not len(edge_src): return reach # No links: nothing reaches anything
+    order = np.lexsort((edge_src, height[edge_src]))
+    edge_src, edge_dst = edge_src[order], edge_dst[order]
+    levels = np.flatnonzero(np.diff(height[edge_src])) + 1
+    in_range = (edge_dst >= col_lo) & (edge_dst < col_hi)
+    direct = edge_dst - col_lo
+    for lo, hi in zip(np.r_[0, levels], np.r_[levels, len(edge_src)]):
+        if hi == lo: continue
+        src, dst = edge_src[lo:hi], edge_dst[lo:hi]
+        starts = np.r_[0, np.flatnonzero(np.diff(src)) + 1]
+        nth = np.arange(len(src)) - np.repeat(starts, np.diff(np.r_[starts, len(src)])) # Child number within its parent
+        for k in range(nth.max() + 1): # Parents are unique per pass, so fancy-index OR is safe
+            pick = nth == k
+            reach[src[pick]] |= reach[dst[pick]] # Children's rows (lower level, already final)
+        hit = in_range[lo:hi]
+        np.bitwise_or.at(reach, (src[hit], direct[lo:hi][hit] >> 3), (0x80 >> (direct[lo:hi][hit] & 7)).astype(np.uint8))
+    return reach
+
+
+BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcounts(reach, weights):
+    """Weighted number of set bits per row (weights per column), a chunk of rows at a time."""
+    counts = np.zeros(len(reach), dtype=np.int64)
+    heavy = np.flatnonzero(weights != 1) # Cycles count all their events; unpack only those columns
+    for start in range(0, len(reach), 1024):
+        rows = reach[start:start + 1024]
+        counts[start:start + 1024] = BYTE_POPCOUNT[rows].sum(axis=1, dtype=np.int64)
+        if len(heavy):
+            bits = (rows[:, heavy >> 3] & (0x80 >> (heavy & 7)).astype(np.uint8)) != 0
+            counts[start:start + 1024] += bits @ (weights[heavy] - 1)
+    return counts
+
+
+class CausalAnalysis:
+    """
+    Ancestors, descendants, paths, longest chains and topological order over the causal edges of a
+    GraphStore. Events are condensed into strongly connected components (a cycle becomes one node,
+    reported in `cycles`), giving a DAG. Every weakly connected part of that DAG gets a packed bit
+    matrix of its transitive closure (small parts share one matrix per ~CAUSAL_REACH_BLOCK nodes), so
+    reachability is one bit test and descendant/ancestor sets are one row/column read. Parts larger
+    than CAUSAL_REACH_MAX_NODES fall back to a BFS per query. Query results are LRU-cached.
+    """
+
+    def __init__(self, store, causal_positions, event_ids):
+        self.node_ids = store.node_ids
+        self.events = store.positions(event_ids)
+        self.events = self.events[self.events >= 0] # Store positions, base (date) order
+        n = len(self.events)
+        event_of = np.full(len(store.node_ids), -1, dtype=np.int64)
+        event_of[self.events] = np.arange(n)
+        causal_positions = np.asarray(causal_positions, dtype=np.int64)
+        src, dst = event_of[store.src[causal_positions]], event_of[store.dst[causal_positions]]
+        keep = (src >= 0) & (dst >= 0)
+        src, dst = src[keep], dst[keep]
+        self.event_index = {store.node_ids[pos]: i for i, pos in enumerate(self.events)}
+        self.out_ptr, self.out_idx = _csr(src, dst, n) # Event-level adjacency (paths)
+
+        # Strongly connected components -> condensed DAG
+        n_scc, scc = csgraph.connected_components(sparse.csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n)), directed=True, connection='strong')
+        self.scc = scc.astype(np.int32)
+        self.scc_size = np.bincount(self.scc, minlength=n_scc).astype(np.int64)
+        self.member_ptr = np.r_[0, np.cumsum(self.scc_size)]
+        self.members = np.argsort(self.scc, kind='stable').astype(np.int32) # Events per component, base order
+        first_member = self.members[self.member_ptr[:-1]]
+        cyclic = (self.scc_size > 1) | np.isin(np.arange(n_scc), self.scc[src[src == dst]])
+        self.cycles = [[self.event_id(e) for e in self.members[self.member_ptr[c]:self.member_ptr[c + 1]]] for c in np.flatnonzero(cyclic)]
+        cs, cd = self.scc[src], self.scc[dst]
+        keep = cs != cd
+        self.c_ptr, self.c_idx = _csr(cs[keep], cd[keep], n_scc)
+        self.p_ptr, self.p_idx = _csr(cd[keep], cs[keep], n_scc)
+        edge_src = np.repeat(np.arange(n_scc, dtype=np.int32), np.diff(self.c_ptr))
+        edge_dst = self.c_idx
+
+        # Heights (longest chain down to a sink), Kahn's algorithm one level at a time
+        self.height = np.zeros(n_scc, dtype=np.int32)
+        remaining = np.diff(self.c_ptr).astype(np.int64)
+        frontier, level = np.flatnonzero(remaining == 0), 0
+        while len(frontier):
+            self.height[frontier] = level
+            parents = _gather(self.p_ptr, self.p_idx, frontier)
+            np.subtract.at(remaining, parents, 1)
+            parents = np.unique(parents)
+            frontier, level = parents[remaining[parents] == 0], level + 1
+        self.topo = np.lexsort((first_member, -self.height)).astype(np.int32) # Causes before effects, ties in base order
+        chain_edges = self.height[edge_src] == self.height[edge_dst] + 1
+        order = np.lexsort((first_member[edge_dst[chain_edges]], edge_src[chain_edges]))
+        chain_src, chain_dst = edge_src[chain_edges][order], edge_dst[chain_edges][order]
+        firsts = np.r_[0, np.flatnonzero(np.diff(chain_src)) + 1] if len(chain_src) else np.zeros(0, dtype=np.int64)
+        self.chain_next = np.full(n_scc, -1, dtype=np.int32) # Next component on a longest chain
+        self.chain_next[chain_src[firsts]] = chain_dst[firsts]
+
+        # Reachability blocks: weakly connected parts packed into bit matrices
+        _, part = csgraph.connected_components(sparse.csr_matrix((np.ones(len(edge_src)), (edge_src, edge_dst)), shape=(n_scc, n_scc)), directed=True, connection='weak')
+        by_part = np.argsort(part, kind='stable')
+        part_sizes = np.bincount(part)
+        self.block = np.zeros(n_scc, dtype=np.int32)
+        self.local = np.zeros(n_scc, dtype=np.int32)
+        block_sizes, has_matrix = [], []
+        for part_size in part_sizes:
+            if part_size > CAUSAL_REACH_MAX_NODES or not block_sizes or not has_matrix[-1] or block_sizes[-1] + part_size > CAUSAL_REACH_BLOCK:
+                block_sizes.append(0); has_matrix.append(part_size <= CAUSAL_REACH_MAX_NODES)
+            block_sizes[-1] += part_size
+        self.block_ptr = np.r_[0, np.cumsum(block_sizes)].astype(np.int64)
+        self.block_members = by_part.astype(np.int32) # Components per block; local index = offset in the block
+        for b in range(len(block_sizes)):
+            members = self.block_members[self.block_ptr[b]:self.block_ptr[b + 1]]
+            self.block[members], self.local[members] = b, np.arange(len(members))
+        self.block_has_matrix = np.asarray(has_matrix, dtype=bool)
+        self.block_width = np.where(self.block_has_matrix, (np.asarray(block_sizes, dtype=np.int64) + 7) // 8, 0)
+        self.block_offset = np.r_[0, np.cumsum(np.asarray(block_sizes, dtype=np.int64) * self.block_width)]
+        self.reach_bits = np.zeros(int(self.block_offset[-1]), dtype=np.uint8)
+        self.scc_downstream = np.zeros(n_scc, dtype=np.int64) # Events reachable from each component
+        block_of_edge = self.block[edge_src]
+        for b in range(len(block_sizes)):
+            members = self.block_members[self.block_ptr[b]:self.block_ptr[b + 1]]
+            in_block = block_of_edge == b
+            height, local_src, local_dst = self.height[members], self.local[edge_src[in_block]], self.local[edge_dst[in_block]]
+            weights = self.scc_size[members]
+            if self.block_has_matrix[b]:
+                reach = _closure(height, local_src, local_dst, len(members))
+                self.reach_bits[self.block_offset[b]:self.block_offset[b + 1]] = reach.ravel()
+                self.scc_downstream[members] = _popcounts(reach, weights)
+            else: # Count in column chunks, bounded memory; queries use BFS
+                for col_lo in range(0, len(members), CAUSAL_COUNT_CHUNK):
+                    col_hi = min(col_lo + CAUSAL_COUNT_CHUNK, len(members))
+                    self.scc_downstream[members] += _popcounts(_closure(height, local_src, local_dst, len(members), col_lo, col_hi), weights[col_lo:col_hi])
+        self.downstream = self.scc_downstream[self.scc] + self.scc_size[self.scc] - 1 # Per event; the rest of its cycle counts too
+        self._cache = LRUCache(CAUSAL_CACHE_SIZE)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_cache'] # Holds a lock; rebuilt empty on load
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = LRUCache(CAUSAL_CACHE_SIZE)
+
+    def _cached(self, key, compute):
+        value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            self._cache.put(key, value)
+        return value
+
+    # --- Component-level reachability ---
+    def _matrix(self, b):
+        return self.reach_bits[self.block_offset[b]:self.block_offset[b + 1]].reshape(-1, self.block_width[b])
+
+    def _reaches(self, c, d):
+        """True if component d is reachable from component c (c != d)."""
+        b = self.block[c]
+        if b != self.block[d]: return False
+        if not self.block_has_matrix[b]:
+            reachable = self._descendant_components(c) # Sorted
+            return bool(len(reachable)) and reachable[min(np.searchsorted(reachable, d), len(reachable) - 1)] == d
+        j = self.local[d]
+        return bool(self._matrix(b)[self.local[c], j >> 3] & (0x80 >> (j & 7)))
+
+    def _descendant_components(self, c):
+        b = self.block[c]
+        if not self.block_has_matrix[b]: return self._cached(('bfs-down', int(c)), lambda: _bfs(self.c_ptr, self.c_idx, c, len(self.height)))
+        bits = np.unpackbits(self._matrix(b)[self.local[c]])[:self.block_ptr[b + 1] - self.block_ptr[b]]
+        return self.block_members[self.block_ptr[b] + np.flatnonzero(bits)]
+
+    def _ancestor_components(self, c):
+        b = self.block[c]
+        if not self.block_has_matrix[b]: return self._cached(('bfs-up', int(c)), lambda: _bfs(self.p_ptr, self.p_idx, c, len(self.height)))
+        j = self.local[c]
+        return self.block_members[self.block_ptr[b] + np.flatnonzero(self._matrix(b)[:, j >> 3] & (0x80 >> (j & 7)))]
+
+    def _events_of(self, components, exclude=None):
+        """Event ids of the given components in base order, without `exclude` (an event index)."""
+        events = np.sort(_gather(self.member_ptr, self.members, components))
+        return [self.event_id(e) for e in events if e != exclude]
+
+    # --- Queries (event ids in, event ids out) ---
+    def event_id(self, event):
+        return self.node_ids[self.events[event]]
+
+    def has_event(self, event_id):
+        return event_id in self.event_index
+
+    def reaches(self, source_id, target_id):
+        """True if a chain of causal links leads from source to target."""
+        s, t = self.event_index.get(source_id), self.event_index.get(target_id)
+        if s is None or t is None or s == t: return False
+        if self.scc[s] == self.scc[t]: return True
+        return self._reaches(self.scc[s], self.scc[t])
+
+    def descendants(self, event_id):
+        """Every event reachable from event_id (its downstream consequences), in base order."""
+        e = self.event_index.get(event_id)
+        if e is None: return []
+        c = self.scc[e]
+        return self._cached(('down', event_id), lambda: self._events_of(np.r_[c, self._descendant_components(c)], exclude=e))
+
+    def ancestors(self, event_id):
+        """Every event that leads to event_id (its upstream causes), in base order."""
+        e = self.event_index.get(event_id)
+        if e is None: return []
+        c = self.scc[e]
+        return self._cached(('up', event_id), lambda: self._events_of(np.r_[c, self._ancestor_components(c)], exclude=e))
+
+    def downstream_count(self, event_id):
+        """'Leads to N downstream events' score."""
+        e = self.event_index.get(event_id)
+        return int(self.downstream[e]) if e is not None else 0
+
+    def top_events(self, k=10):
+        """(event id, downstream count) of the k events with the most downstream consequences."""
+        order = np.lexsort((np.arange(len(self.downstream)), -self.downstream))[:k]
+        return [(self.event_id(e), int(self.downstream[e])) for e in order if self.downstream[e] > 0]
+
+    def paths(self, source_id, target_id, max_paths=CAUSAL_MAX_PATHS):
+        """
+        Simple paths (lists of event ids) from source to target, at most `max_paths`. The walk only
+        enters events that can still reach the target; within a cycle that does not rule out dead ends,
+        so it also stops after CAUSAL_PATH_MAX_STEPS steps with the paths found so far.
+        """
+        s, t = self.event_index.get(source_id), self.event_index.get(target_id)
+        if s is None or t is None or s == t or not self.reaches(source_id, target_id): return []
+
+        def compute():
+            target_scc = self.scc[t]
+            can_reach = {}
+            def useful(e):
+                if e not in can_reach: can_reach[e] = e == t or self.scc[e] == target_scc or self._reaches(self.scc[e], target_scc)
+                return can_reach[e]
+            found, path, on_path = [], [s], {s}
+            stack = [iter(self.out_idx[self.out_ptr[s]:self.out_ptr[s + 1]].tolist())]
+            steps = 0
+            while stack and len(found) < max_paths and steps < CAUSAL_PATH_MAX_STEPS:
+                nxt, steps = next(stack[-1], None), steps + 1
+                if nxt is None:
+                    stack.pop(); on_path.discard(path.pop())
+                    continue
+                if nxt in on_path or not useful(nxt): continue
+                if nxt == t:
+                    found.append([self.event_id(e) for e in path + [t]])
+                    continue
+                path.append(nxt); on_path.add(nxt)
+                stack.append(iter(self.out_idx[self.out_ptr[nxt]:self.out_ptr[nxt + 1]].tolist()))
+            return found
+        return self._cached(('paths', source_id, target_id, max_paths), compute)
+
+    def longest_chain(self, event_id=None):
+        """Longest chain of causal links starting at event_id (default: the longest chain overall), as event ids."""
+        if event_id is None: c = self.topo[0] if len(self.topo) else None
+        else: c = self.scc[self.event_index[event_id]] if event_id in self.event_index else None
+        if c is None: return []
+        chain = [event_id] if event_id is not None else [self.event_id(self.members[self.member_ptr[c]])]
+        while self.chain_next[c] >= 0:
+            c = self.chain_next[c]
+            chain.append(self.event_id(self.members[self.member_ptr[c]])) # First event of a cycle stands for it
+        return chain
+
+    def topological_order(self):
+        """All events, causes before effects (members of a cycle stay together, in base order)."""
+        return self._cached(('topo',), lambda: [self.event_id(e) for e in _gather(self.member_ptr, self.members, self.topo)])
+
+    def summary(self):
+        return {'events': len(self.events), 'links': int(len(self.out_idx)), 'cycles': len(self.cycles),
+                'longest_chain': int(self.height.max()) + 1 if len(self.height) else 0,
+                'components': int(self.block_ptr[-1]), 'index_bytes': int(self.reach_bits.nbytes)}
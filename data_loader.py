@@ -0,0 +1,229 @@
+import os
+import json
+import glob
+import pandas as pd
+import numpy as np
+
+# Parquet support is optional - only needed when a dataset ships .parquet tables
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# ------------------------------------------------------------------------------
+# DATASET LAYOUT
+# ------------------------------------------------------------------------------
+# A dataset is a directory holding one file per table (events, actors, individuals,
+# causal_links) in JSON Lines, CSV or Parquet, plus an optional dataset.json with
+# display metadata (title, key dates, ...). See data/crimea_2014 for an example.
+DEFAULT_DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'crimea_2014')
+DEFAULT_CHUNKSIZE = 50000
+CSV_LIST_SEPARATOR = '|' # Titles may contain ';' and ',', so list cells in CSV are pipe-separated
+
+TABLE_SCHEMAS = {
+    'events': ['date', 'title', 'type', 'actors', 'location', 'summary'],
+    'actors': ['name', 'type', 'role', 'events'],
+    'individuals': ['name', 'role', 'description', 'involvement', 'events'],
+    'causal_links': ['source_event', 'target_event', 'relationship', 'description'],
+}
+REQUIRED_COLUMNS = {
+    'events': ['date', 'title'],
+    'actors': ['name'],
+    'individuals': ['name'],
+    'causal_links': ['source_event', 'target_event'],
+}
+LIST_COLUMNS = {'events': ['actors'], 'actors': ['events'], 'individuals': ['events']}
+REQUIRED_TABLES = ['events', 'actors']
+
+TABLE_SUFFIXES = {
+    '.jsonl': 'jsonl', '.jsonl.gz': 'jsonl', '.ndjson': 'jsonl',
+    '.csv': 'csv', '.csv.gz': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+}
+
+DEFAULT_METADATA = {
+    'title': "Conflict Event Network: Interactive Analysis",
+    'subtitle': "A comprehensive visualization based on the FARO ontology.",
+    'timeline_title': "Chronology of Events",
+    'root_event': None,
+    'key_dates': [],
+    'key_events': [],
+    'key_events_title': "Critical Events", # Heading of the key-events chart in the causal analysis tab
+    'fallback_date': None, # Used for event dates that cannot be parsed (defaults to the earliest parsed date)
+    'entity_aliases': {}, # Alias name -> canonical name, on top of entity_resolution.DEFAULT_ALIASES
+    'event_type_colors': {}, # Event type -> colour in the timelines (other types get Plotly's default colours)
+    'analysis_tabs': [], # Extra Analysis sub-tabs of dataset-specific prose and charts (see README)
+}
+
+
+# ------------------------------------------------------------------------------
+# CHUNKED TABLE READERS
+# ------------------------------------------------------------------------------
+def find_table_file(dataset_path, table_name):
+    """Returns (path, format) of the first supported file for a table, or (None, None)."""
+    for candidate in sorted(glob.glob(os.path.join(dataset_path, f"{table_name}.*"))):
+        for suffix, fmt in TABLE_SUFFIXES.items():
+            if candidate.endswith(suffix):
+                return candidate, fmt
+    return None, None
+
+
+def iter_table_chunks(path, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Yields raw DataFrame chunks of at most `chunksize` rows from a table file."""
+    if fmt == 'jsonl':
+        # convert_dates/dtype off: keep the raw 'date' strings for parse_date
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, convert_dates=False, dtype=False)
+        with reader:
+            for chunk in reader:
+                yield chunk
+    elif fmt == 'csv':
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False):
+            yield chunk
+    elif fmt == 'parquet':
+        if pq is None:
+            raise ImportError(f"Reading '{path}' requires pyarrow (pip install pyarrow).")
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported table format '{fmt}' for {path}")
+
+
+def _to_list(value):
+    if isinstance(value, list): return value
+    if isinstance(value, (tuple, np.ndarray)): return list(value)
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(CSV_LIST_SEPARATOR) if v.strip()] if value.strip() else []
+    return []
+
+
+def normalize_chunk(chunk, table_name):
+    """Brings one raw chunk to the table's canonical columns and dtypes."""
+    schema = TABLE_SCHEMAS[table_name]
+    missing = [c for c in REQUIRED_COLUMNS[table_name] if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Table '{table_name}' is missing required column(s): {', '.join(missing)}")
+    list_columns = LIST_COLUMNS.get(table_name, [])
+    columns = {}
+    for col in schema:
+        if col in list_columns:
+            columns[col] = [_to_list(v) for v in chunk[col].to_numpy()] if col in chunk.columns else [[] for _ in range(len(chunk))]
+        elif col in chunk.columns:
+            columns[col] = chunk[col].fillna('').astype(str).str.strip().to_numpy()
+        else:
+            columns[col] = np.full(len(chunk), '', dtype=object)
+    # Canonical columns first (this order ends up in the node details), extras after
+    for col in chunk.columns:
+        if col not in columns: columns[col] = chunk[col].to_numpy()
+    return pd.DataFrame(columns)
+
+
+def read_table(path, fmt, table_name, chunksize=DEFAULT_CHUNKSIZE):
+    """Streams a table file chunk by chunk and concatenates the normalized columns once."""
+    chunks = [normalize_chunk(chunk, table_name) for chunk in iter_table_chunks(path, fmt, chunksize)]
+    if not chunks:
+        return pd.DataFrame(columns=TABLE_SCHEMAS[table_name])
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0].reset_index(drop=True)
+
+
+def load_metadata(dataset_path):
+    metadata = dict(DEFAULT_METADATA)
+    meta_path = os.path.join(dataset_path, 'dataset.json')
+    if os.path.isfile(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            metadata.update(json.load(f))
+    return metadata
+
+
+# ------------------------------------------------------------------------------
+# BULK DATE PARSING
+# ------------------------------------------------------------------------------
+# Matches "21 Nov 2013", "18-20 Feb 2014" / "3-8 Mar 2014" and "22 Apr - 3 May 2014".
+# Start month/year are optional and fall back to the end date's (same-month / same-year ranges);
+# a start without a year that falls after the end ("28 Dec - 3 Jan 2014") is in the year before.
+DATE_PATTERN = (
+    r"^\s*(?P<d1>\d{1,2})(?:\s+(?P<m1>[A-Za-z]{3})[A-Za-z]*\.?)?(?:\s+(?P<y1>\d{4}))?"
+    r"(?:\s*-\s*(?P<d2>\d{1,2})\s+(?P<m2>[A-Za-z]{3})[A-Za-z]*\.?)?(?:\s+(?P<y2>\d{4}))?\s*$"
+)
+
+
+def _parse_unique_dates(raw):
+    """Parses an array of unique raw strings with whole-column str.extract + to_datetime."""
+    raw = pd.Series(raw, dtype=object)
+    parts = raw.str.extract(DATE_PATTERN).astype('string') # String dtype even when nothing matched
+    end_month, end_year = parts['m2'].fillna(parts['m1']), parts['y2'].fillna(parts['y1'])
+    start_month, start_year = parts['m1'].fillna(end_month), parts['y1'].fillna(end_year)
+    start = pd.to_datetime(parts['d1'] + ' ' + start_month.str.title() + ' ' + start_year, format='%d %b %Y', errors='coerce')
+    end = pd.to_datetime(parts['d2'] + ' ' + end_month.str.title() + ' ' + end_year, format='%d %b %Y', errors='coerce')
+    open_start = parts['y1'].isna() & parts['m1'].notna() & end.notna() & (start.isna() | (start > end)) # NaT: e.g. 29 Feb in the end's year
+    if open_start.any():
+        prior_year = (end_year[open_start].astype(int) - 1).astype(str)
+        prior = pd.to_datetime(parts['d1'][open_start] + ' ' + start_month[open_start].str.title() + ' ' + prior_year, format='%d %b %Y', errors='coerce')
+        start[prior.index[prior.notna()]] = prior.dropna()
+
+    # Anything the day-month-year pattern missed (ISO dates, "March 16, 2014", ...) gets one generic pass
+    unmatched = start.isna() & raw.notna()
+    if unmatched.any():
+        start[unmatched] = pd.to_datetime(raw[unmatched], errors='coerce', format='mixed', dayfirst=True)
+    return start, end.fillna(start)
+
+
+def parse_dates(date_series, default=None):
+    """
+    Vectorized date normalization for a whole column of raw date strings.
+    Returns a DataFrame (same index) with 'date_parsed' (start day) and 'date_end' (last day of a range).
+    Unparsed rows get `default` (or stay NaT) and are reported in a single summary line.
+    """
+    raw = date_series.astype(object).where(date_series.notna(), None)
+    raw = raw.map(lambda s: s.strip() if isinstance(s, str) else s)
+    codes, uniques = pd.factorize(raw) # each distinct string is parsed once per call; nothing is kept between calls
+    start, end = _parse_unique_dates(uniques)
+
+    unique_start = pd.DatetimeIndex(start).append(pd.DatetimeIndex([pd.NaT])).to_numpy()
+    unique_end = pd.DatetimeIndex(end).append(pd.DatetimeIndex([pd.NaT])).to_numpy()
+    # factorize marks missing values with -1, which indexes the trailing NaT
+    result = pd.DataFrame({'date_parsed': unique_start[codes], 'date_end': unique_end[codes]}, index=date_series.index)
+
+    failed = result['date_parsed'].isna()
+    if failed.any():
+        examples = ", ".join(f"'{s}'" for s in pd.unique(raw[failed])[:5])
+        print(f"Warning: Could not parse {int(failed.sum())} of {len(result)} date string(s) (e.g. {examples}).")
+        if default is not None:
+            result.loc[failed, ['date_parsed', 'date_end']] = pd.Timestamp(default)
+    return result
+
+
+def parse_date(date_str, default=None):
+    """Single-string convenience wrapper around parse_dates."""
+    parsed = parse_dates(pd.Series([date_str]), default=default)
+    value = parsed['date_parsed'].iloc[0]
+    return None if pd.isna(value) else value.to_pydatetime()
+
+
+# ------------------------------------------------------------------------------
+# DATASET LOADER
+# ------------------------------------------------------------------------------
+def resolve_dataset_path(dataset_path=None):
+    return dataset_path or os.environ.get('CONFLICT_DATASET') or DEFAULT_DATASET_PATH
+
+
+def load_dataset(dataset_path=None, chunksize=DEFAULT_CHUNKSIZE, debug=False):
+    """
+    Loads a conflict dataset directory into DataFrames.
+    Returns a dict with 'events', 'actors', 'individuals', 'causal_links' DataFrames and 'metadata'.
+    """
+    dataset_path = resolve_dataset_path(dataset_path)
+    if not os.path.isdir(dataset_path):
+        raise FileNotFoundError(f"Dataset directory not found: {dataset_path}")
+
+    dataset = {'metadata': load_metadata(dataset_path)}
+    for table_name in TABLE_SCHEMAS:
+        path, fmt = find_table_file(dataset_path, table_name)
+        if path is None:
+            if table_name in REQUIRED_TABLES:
+                raise FileNotFoundError(f"Dataset '{dataset_path}' has no '{table_name}' table (.jsonl, .csv or .parquet)")
+            dataset[table_name] = pd.DataFrame(columns=TABLE_SCHEMAS[table_name])
+            continue
+        dataset[table_name] = read_table(path, fmt, table_name, chunksize)
+        if debug: print(f"Loaded {len(dataset[table_name])} rows for '{table_name}' from {path}")
+    return dataset
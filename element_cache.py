@@ -0,0 +1,91 @@
+import json
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# CYTOSCAPE ELEMENT SERIALIZATION (done once per node/edge at load time)
+# ------------------------------------------------------------------------------
+NODE_SIZES = {'Event': 30, 'Country': 25, 'Organization': 25, 'Individual': 15}
+EDGE_WIDTHS = {'causal': 2.5, 'participation': 1.5}
+
+
+def node_element(node, extra_data=None):
+    details = node.get('details_dict', {}) # Use pre-processed details dict
+    node_data_cy = {
+        'id': node['id'],
+        'label': node['label'],
+        'type': node['type'],
+        'size': NODE_SIZES.get(node['type'], 20),
+        'details_json': json.dumps(details, default=str), # Store details as JSON string for callbacks
+        **(extra_data or {}) # e.g. network metrics for stylesheet mappings
+    }
+    return {'data': node_data_cy, 'classes': node['type']} # Use node type as class
+
+
+def edge_id(pos):
+    """Element id of the edge at a store position; stable, so the browser can patch an edge in place."""
+    return f"edge:{pos}"
+
+
+def edge_element(edge, element_id=None):
+    details = edge.get('details_dict', {})
+    edge_data = {
+        **({'id': element_id} if element_id is not None else {}),
+        'source': edge['source'],
+        'target': edge['target'],
+        'label': edge.get('label', ''),
+        'edge_type': edge['type'],
+        'details_json': json.dumps(details, default=str)
+    }
+    # Assign width based on type
+    if edge['type'] == 'shared_event':
+        edge_data['weight'] = edge.get('weight', len(details.get('shared_events', []))) # Shared-event count
+        edge_data['width'] = min(1 + edge_data['weight'], 5)
+    else: edge_data['width'] = EDGE_WIDTHS.get(edge['type'], 1.5) # participation
+    return {'data': edge_data, 'classes': edge['type']}
+
+
+class ElementCache:
+    """
+    Serialized Cytoscape elements: every base node is serialized once at load, edges are serialized
+    from the GraphStore arrays the first time a view needs them and kept by store position.
+    Views select cached elements instead of re-running json.dumps, and whole-graph views
+    (per layout) are memoized as ready-made lists.
+    Cached dicts are shared between responses, so they must never be mutated.
+    """
+
+    def __init__(self, store, node_data=None):
+        self.store = store
+        self.node_data = node_data or {} # node id -> extra data fields (graph_metrics.GraphMetrics.element_data)
+        self.node_elements = {n['id']: node_element(store.node(pos), self.node_data.get(n['id'])) for pos, n in enumerate(store.nodes)}
+        self.edge_elements = {} # Store edge position -> element, filled on first use
+        self._views = {}
+
+    def node(self, node):
+        cached = self.node_elements.get(node['id'])
+        return cached if cached is not None else node_element(node, self.node_data.get(node['id']))
+
+    def edge(self, pos):
+        cached = self.edge_elements.get(pos)
+        if cached is None: cached = self.edge_elements[pos] = edge_element(self.store.edge(pos), edge_id(pos))
+        return cached
+
+    def elements(self, nodes, edges, positions=None):
+        """Element list for a node selection and an EdgeList; edges need both endpoints in `nodes`."""
+        elements = []
+        for node in nodes:
+            element = self.node(node)
+            if positions and node['id'] in positions: element = {**element, 'position': positions[node['id']]} # Copy, cache stays untouched
+            elements.append(element)
+        store = self.store
+        member = np.zeros(len(store.node_ids), dtype=bool)
+        node_positions = store.positions([n['id'] for n in nodes])
+        member[node_positions[node_positions >= 0]] = True
+        edge_positions = edges.positions
+        keep = edge_positions[member[store.src[edge_positions]] & member[store.dst[edge_positions]]]
+        elements.extend(self.edge(pos) for pos in keep.tolist())
+        return elements
+
+    def view(self, key, build):
+        """Memoized element list for a fixed view (e.g. ('faro', 'cose')); `build` runs on first use only."""
+        if key not in self._views: self._views[key] = build()
+        return self._views[key]
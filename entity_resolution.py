@@ -0,0 +1,285 @@
+import os
+import re
+import itertools
+import math
+import unicodedata
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# ENTITY RESOLUTION (aliases, transliteration variants, fuzzy name references)
+# ------------------------------------------------------------------------------
+# Trigram similarity (Dice) needed to merge two entity nodes / to resolve a name reference to a node
+ENTITY_MERGE_THRESHOLD = float(os.environ.get('ENTITY_MERGE_THRESHOLD', 0.9))
+ENTITY_MATCH_THRESHOLD = float(os.environ.get('ENTITY_MATCH_THRESHOLD', 0.8))
+ENTITY_SUGGEST_THRESHOLD = 0.7 # Near misses at or above this are reported, not merged
+
+# Folded name -> folded canonical name; extended per dataset by the 'entity_aliases' metadata key
+DEFAULT_ALIASES = {'usa': 'united states', 'us': 'united states', 'united states of america': 'united states',
+                   'uk': 'united kingdom', 'kiev': 'kyiv', 'russian federation': 'russia'}
+STOPWORDS = {'the', 'of', 'and', 'for', 'in', 'on', 'de', 'la'}
+QUALIFIED_NAME = re.compile(r'^\s*([^()]*[^()\s])\s*\(([^()]+)\)\s*$') # 'Name (qualifier)': one parenthetical, at the end
+
+# Romanization variants of Cyrillic names (Kyiv/Kiev, Aksyonov/Aksenov, Yanukovych/Yanukovich, Zelenskyy/Zelensky)
+TRANSLITERATION_RULES = [(re.compile(p), r) for p, r in [
+    (r'[yj]o', 'e'), (r'(?<=[^aeiou\s])[yj]e', 'e'), (r'iy|yy|ij|yi', 'i'), (r'kh', 'h'), (r'[yj]', 'i'), (r'ie', 'i'), (r'([a-z])\1+', r'\1'), # Letters only: A33 and A3 stay apart
+]]
+
+
+def fold(text):
+    """Lowercase, accent-free, punctuation-free name key with romanization variants folded together."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r"['`’ʼ]", '', text)
+    text = ' '.join(re.findall(r'[a-z0-9]+', text))
+    for pattern, replacement in TRANSLITERATION_RULES: text = pattern.sub(replacement, text)
+    return text
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    Resolves free-text names to a fixed list of target names. Exact keys first (folded name, alias,
+    word set, parenthetical qualifier / abbreviation), then a trigram index with prefix filtering:
+    a name reaching the Dice threshold must share one of the query's rarest trigrams, so only
+    those postings are probed and no all-pairs comparison is needed.
+    """
+
+    def __init__(self, names, aliases=None, targets=None):
+        self.names = list(names)
+        self.targets = list(targets) if targets is not None else self.names # What a match on names[i] resolves to
+        self.aliases = {fold(k): fold(v) for k, v in {**DEFAULT_ALIASES, **(aliases or {})}.items()}
+        self.full_keys, self.word_keys, self.secondary = {}, {}, {}
+        self._key_cache = {}
+        self.grams, postings = [], {}
+        for i, name in enumerate(self.names):
+            full, words, forms = self.keys(name)
+            self.full_keys.setdefault(full, []).append(i)
+            self.word_keys.setdefault(words, []).append(i)
+            for form in forms: self.secondary.setdefault(form, set()).add(i)
+            grams = _trigrams(full)
+            self.grams.append(len(grams))
+            for gram in grams: postings.setdefault(gram, []).append(i)
+        self.postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+        self.grams = np.asarray(self.grams, dtype=np.int32)
+        self._slots = np.zeros(len(self.names) + 1, dtype=np.int32) # Scratch: name position -> 1-based slot in the current probe
+
+    def canonical_key(self, text):
+        key = fold(text)
+        return self.aliases.get(key, key)
+
+    def keys(self, name):
+        """(full key, word-set key, secondary forms): for 'Name (qualifier)', the name and the qualifier on their own."""
+        if name not in self._key_cache: self._key_cache[name] = self._keys(name)
+        return self._key_cache[name]
+
+    def _keys(self, name):
+        full = self.canonical_key(name)
+        words = ' '.join(sorted(set(full.split()) - STOPWORDS))
+        qualified = QUALIFIED_NAME.match(str(name)) # 'European Union (EU) and G7' is not a qualified 'EU'
+        forms = {self.canonical_key(f) for f in qualified.groups()} - {full, ''} if qualified else set()
+        return full, words, forms
+
+    def _unique(self, ids, exclude):
+        ids = [i for i in ids if i not in exclude]
+        return ids[0] if len(ids) == 1 or (ids and all(self.targets[i] == self.targets[ids[0]] for i in ids)) else None
+
+    def candidates(self, key, threshold, exclude=()):
+        """(target position, Dice score) pairs with score >= threshold, best first."""
+        grams = _trigrams(key)
+        min_overlap = math.ceil(threshold / (2 - threshold) * len(grams)) # Dice >= t needs this many shared trigrams
+        rarest = sorted(grams, key=lambda g: (len(self.postings.get(g, ())), g))[:len(grams) - min_overlap + 1]
+        probed = [self.postings[g] for g in rarest if g in self.postings]
+        if not probed: return []
+        probe = np.unique(np.concatenate(probed))
+        lengths = self.grams[probe]
+        probe = probe[(lengths >= threshold / (2 - threshold) * len(grams)) & (lengths <= (2 - threshold) / threshold * len(grams))]
+        if exclude: probe = probe[[i not in exclude for i in probe.tolist()]] if len(exclude) < len(probe) else np.setdiff1d(probe, list(exclude))
+        if not len(probe): return []
+        # Shared-trigram counts for the probed names only, via a dense slot lookup (reset afterwards)
+        self._slots[probe] = np.arange(1, len(probe) + 1)
+        slot = self._slots[np.concatenate([self.postings[g] for g in grams if g in self.postings])]
+        self._slots[probe] = 0
+        shared = np.bincount(slot, minlength=len(probe) + 1)[1:]
+        scores = 2.0 * shared / (len(grams) + self.grams[probe])
+        keep = scores >= threshold
+        return sorted(zip(probe[keep].tolist(), scores[keep].tolist()), key=lambda item: (-item[1], item[0]))
+
+    def match(self, name, threshold=ENTITY_MATCH_THRESHOLD, exclude=()):
+        """(target name, score, method) for the best unambiguous match, or None."""
+        hit = self.match_position(name, threshold, exclude)
+        return (self.targets[hit[0]], *hit[1:]) if hit else None
+
+    def match_position(self, name, threshold=ENTITY_MATCH_THRESHOLD, exclude=()):
+        """Like match(), with the target's position in `names` instead of its name."""
+        full, words, forms = self.keys(name)
+        exclude = set(exclude)
+        for ids, method in [(self.full_keys.get(full, []), 'exact'), (self.word_keys.get(words, []) if words else [], 'words'),
+                            (sorted(self.secondary.get(full, ())), 'qualifier'), (sorted({i for f in forms for i in self.full_keys.get(f, [])}), 'qualifier')]:
+            target = self._unique(ids, exclude)
+            if target is not None: return target, 1.0, method
+        numbers = re.findall(r'\d+', full) # Digits are identifiers, not spelling: 'A333' is no typo of 'A33'
+        scored = [(i, score) for i, score in self.candidates(full, threshold, exclude) if re.findall(r'\d+', self.keys(self.names[i])[0]) == numbers]
+        if scored and (len(scored) == 1 or scored[0][1] - scored[1][1] > 0.05 or self.targets[scored[0][0]] == self.targets[scored[1][0]]):
+            return scored[0][0], round(scored[0][1], 3), 'trigram'
+        return None
+
+
+# ------------------------------------------------------------------------------
+# RESOLUTION STAGE (runs on the DataFrames before the graph build)
+# ------------------------------------------------------------------------------
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def merge_aliases(entity_df, aliases=None, threshold=ENTITY_MERGE_THRESHOLD):
+    """
+    Merges rows whose names are aliases of each other (union-find over matcher hits). The canonical
+    row is the one listed in most events (then the longest name); it gets the union of 'events'
+    and an 'aliases' list. Returns (merged DataFrame, report rows, alias name -> canonical name).
+    """
+    if entity_df.empty: return entity_df, [], {}
+    names = entity_df['name'].tolist()
+    matcher = NameMatcher(names, aliases)
+    parent = list(range(len(names)))
+    hits, suggestions = {}, []
+    for i, name in enumerate(names):
+        hit = matcher.match_position(name, threshold, exclude={i})
+        if hit is None:
+            near = matcher.candidates(matcher.keys(name)[0], ENTITY_SUGGEST_THRESHOLD, exclude={i})
+            if near and i < near[0][0]:
+                suggestions.append({'action': 'suggested', 'alias': name, 'canonical': names[near[0][0]], 'score': round(near[0][1], 3), 'method': 'trigram'})
+            continue
+        j = hit[0]
+        hits.setdefault(i, hit[1:]); hits.setdefault(j, hit[1:])
+        root_i, root_j = _find(parent, i), _find(parent, j)
+        if root_i != root_j: parent[root_i] = root_j
+
+    groups = {}
+    for i in range(len(names)): groups.setdefault(_find(parent, i), []).append(i)
+    event_counts = [len(ev) if isinstance(ev, list) else 0 for ev in entity_df['events']]
+    rows, renames, report = [], {}, []
+    for members in groups.values():
+        canonical = max(members, key=lambda k: (event_counts[k], len(names[k]), -k))
+        row = entity_df.iloc[canonical].to_dict()
+        if len(members) > 1:
+            row['events'] = list(dict.fromkeys(e for k in [canonical, *members] for e in (entity_df.iloc[k]['events'] or [])))
+            row['aliases'] = [names[k] for k in members if k != canonical]
+            for k in members:
+                if k == canonical: continue
+                renames[names[k]] = names[canonical]
+                score, method = hits[k]
+                report.append({'action': 'merged', 'alias': names[k], 'canonical': names[canonical], 'score': score, 'method': method})
+        rows.append((min(members), row))
+    merged_df = pd.DataFrame([row for _, row in sorted(rows, key=lambda r: r[0])]).reset_index(drop=True)
+    if 'aliases' in merged_df: merged_df['aliases'] = [a if isinstance(a, list) else [] for a in merged_df['aliases']] # No NaN in details_json
+    return merged_df, report + suggestions, renames
+
+
+def _free_id(node_id, qualifier, taken):
+    """node_id, or the first of 'id (Qualifier)', 'id (Qualifier 2)', ... (events: 'id (2)', 'id (3)', ...) not in `taken`."""
+    if node_id not in taken: return node_id
+    for n in itertools.count(1 if qualifier else 2):
+        candidate = f"{node_id} ({' '.join(p for p in (qualifier, str(n) if n > 1 else '') if p)})"
+        if candidate not in taken: return candidate
+
+
+def qualify_colliding_ids(events_df, actors_df, individuals_df):
+    """
+    Node ids must be unique across the three tables. A repeated event title gets ' (2)', ' (3)', ...; an actor
+    named like an event, or an individual named like an event or actor, gets its table's qualifier
+    ('Bob (Individual)'). References by the plain name keep pointing at the first holder.
+    Returns (events, actors, individuals, report rows); frames without collisions are returned as they are.
+    """
+    taken, report, frames = set(), [], []
+    for table, df, column, qualifier in [('events', events_df, 'title', None), ('actors', actors_df, 'name', 'Actor'), ('individuals', individuals_df, 'name', 'Individual')]:
+        ids = df[column].tolist() if not df.empty else []
+        unique = []
+        for node_id in ids:
+            new_id = _free_id(node_id, qualifier, taken)
+            if new_id != node_id: report.append({'table': table, 'action': 'renamed', 'alias': node_id, 'canonical': new_id, 'score': None, 'method': 'duplicate id'})
+            taken.add(new_id); unique.append(new_id)
+        if unique != ids: df = df.assign(**{column: unique})
+        frames.append(df)
+    if report: print(f"Warning: {len(report)} duplicate node id(s) renamed (e.g. '{report[0]['alias']}' -> '{report[0]['canonical']}')")
+    return (*frames, report)
+
+
+def resolve_entities(events_df, actors_df, individuals_df, aliases=None, merge_threshold=ENTITY_MERGE_THRESHOLD, match_threshold=ENTITY_MATCH_THRESHOLD):
+    """
+    Entity-resolution stage before the graph build:
+    1. merges alias rows within actors and within individuals (e.g. 'USA' / 'United States'),
+    2. resolves names in events' 'actors' lists to canonical node names and adds the event to that
+       entity's 'events' list, so the participation edge is no longer dropped,
+    3. resolves entity 'events' references to event titles.
+    Ids still shared after step 1 (repeated titles, a name in two tables) are qualified first (qualify_colliding_ids).
+    Returns a dict with the resolved events/actors/individuals DataFrames and the 'report' rows.
+    """
+    actors_df, actor_report, actor_renames = merge_aliases(actors_df, aliases, merge_threshold)
+    individuals_df, individual_report, individual_renames = merge_aliases(individuals_df, aliases, merge_threshold)
+    report = [{'table': 'actors', **e} for e in actor_report] + [{'table': 'individuals', **e} for e in individual_report]
+    events_df, actors_df, individuals_df, id_report = qualify_colliding_ids(events_df, actors_df, individuals_df)
+    report += id_report
+    renames = {**actor_renames, **individual_renames}
+
+    entity_names = actors_df['name'].tolist() + individuals_df['name'].tolist()
+    entity_matcher = NameMatcher(entity_names + list(renames), aliases, targets=entity_names + list(renames.values())) # Merged aliases still match
+    known_entities = set(entity_names)
+    resolved_refs = {}
+    def resolve_entity(name):
+        if name in known_entities: return name
+        if name in renames: return renames[name]
+        if name not in resolved_refs:
+            hit = entity_matcher.match(name, match_threshold)
+            resolved_refs[name] = hit[0] if hit else None
+            report.append({'table': 'events.actors', 'action': 'resolved' if hit else 'unresolved', 'alias': name,
+                           'canonical': hit[0] if hit else None, 'score': hit[1] if hit else None, 'method': hit[2] if hit else None})
+        return resolved_refs[name] or name
+
+    events_df = events_df.copy()
+    events_df['actors'] = [[resolve_entity(a) for a in actors] if isinstance(actors, list) else actors for actors in events_df['actors']]
+
+    titles = events_df['title'].tolist()
+    title_set, title_matcher, resolved_titles = set(titles), None, {}
+    def resolve_title(title):
+        nonlocal title_matcher
+        if title in title_set: return title
+        if title not in resolved_titles:
+            title_matcher = title_matcher or NameMatcher(titles)
+            hit = title_matcher.match(title, match_threshold)
+            resolved_titles[title] = hit[0] if hit else None
+            report.append({'table': 'entity.events', 'action': 'resolved' if hit else 'unresolved', 'alias': title,
+                           'canonical': hit[0] if hit else None, 'score': hit[1] if hit else None, 'method': hit[2] if hit else None})
+        return resolved_titles[title] or title
+
+    # Event -> entity links from the events table become entity -> event references
+    listed_in = {}
+    for title, actors in zip(events_df['title'], events_df['actors']):
+        for actor in actors if isinstance(actors, list) else []:
+            if actor in known_entities: listed_in.setdefault(actor, []).append(title)
+    for table, df in [('actors', actors_df), ('individuals', individuals_df)]:
+        if df.empty: continue # Resolved in place: both DataFrames are fresh copies from merge_aliases
+        resolved_events = []
+        for name, events in zip(df['name'], df['events']):
+            events = [resolve_title(e) for e in (events if isinstance(events, list) else [])]
+            added = [t for t in listed_in.get(name, []) if t not in events]
+            if added: report.append({'table': table, 'action': 'linked', 'alias': name, 'canonical': name, 'score': len(added), 'method': 'events.actors'})
+            resolved_events.append(list(dict.fromkeys(events + added)))
+        df['events'] = resolved_events
+    return {'events': events_df, 'actors': actors_df, 'individuals': individuals_df, 'report': report}
+
+
+def print_resolution_report(report, debug=False):
+    counts = Counter(e['action'] for e in report)
+    print(f"Entity resolution: {counts.get('merged', 0)} aliases merged, {counts.get('resolved', 0)} references resolved, "
+          f"{counts.get('linked', 0)} entities gained event links, {counts.get('unresolved', 0)} unresolved, {counts.get('suggested', 0)} suggestions, {counts.get('renamed', 0)} duplicate ids renamed")
+    if debug:
+        for e in report:
+            if e['action'] != 'linked': print(f"  [{e['table']}] {e['action']}: '{e['alias']}' -> '{e['canonical']}' ({e['method']}, {e['score']})")
@@ -0,0 +1,233 @@
+import os
+import json
+import threading
+from collections import OrderedDict, deque
+import pandas as pd
+from flask import Blueprint, Response, request
+
+# ------------------------------------------------------------------------------
+# GRAPH QUERY API (JSON endpoints on the Flask server behind the Dash app)
+# ------------------------------------------------------------------------------
+API_CACHE_SIZE = int(os.environ.get('GRAPH_API_CACHE_SIZE', 1024)) # Cached responses (entries)
+API_CACHE_MAX_BYTES = int(os.environ.get('GRAPH_API_CACHE_MAX_BYTES', 64 * 2**20)) # Total size of the cached response bodies
+API_MAX_NODES = int(os.environ.get('GRAPH_API_MAX_NODES', 5000)) # Upper bound on nodes per response
+API_MAX_HOPS = 5
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache; thread-safe so it can be shared by threaded workers.
+    With `max_bytes`, the summed `sizeof(value)` is bounded too (values larger than that are not kept).
+    """
+
+    def __init__(self, max_entries=API_CACHE_SIZE, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.nbytes = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data: self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes: return
+            self._data[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                self._drop(next(iter(self._data)))
+
+    def _drop(self, key):
+        del self._data[key]
+        self.nbytes -= self._sizes.pop(key)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class GraphQueries:
+    """Neighborhood, k-hop, shortest-path and filtered-subgraph queries on a GraphIndex."""
+
+    def __init__(self, index, event_dates=None):
+        self.index = index
+        # Event id -> [date_parsed, date_end], used by the subgraph date filter
+        self.event_dates = event_dates if event_dates is not None else pd.DataFrame(columns=['date_parsed', 'date_end'])
+
+    def k_hop(self, node_id, hops=1, edge_types=None, max_nodes=API_MAX_NODES):
+        """Nodes within `hops` edges of node_id (undirected BFS) and the edges among them. Returns (nodes, edges, truncated)."""
+        visited, frontier, truncated = {node_id}, [node_id], False
+        for _ in range(hops):
+            next_frontier = []
+            for current in frontier:
+                for _, other in self.index.neighbors(current, edge_types):
+                    if other in visited: continue
+                    if len(visited) >= max_nodes: truncated = True; break
+                    visited.add(other); next_frontier.append(other)
+                if truncated: break
+            frontier = next_frontier
+            if not frontier or truncated: break
+        return self.index.nodes_for(visited), self.index.induced_edges(visited, edge_types), truncated
+
+    def shortest_path(self, source, target, edge_types=None, directed=False):
+        """Node ids and edges (EdgeList) of one shortest path (BFS, fewest edges); no ids if none exists."""
+        if source == target: return [source], self.index.edge_list()
+        parent = {source: None} # node id -> (previous node id, edge)
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for edge, other in self.index.neighbors(current, edge_types, 'out' if directed else 'both'):
+                if other in parent: continue
+                parent[other] = (current, edge)
+                if other == target: queue.clear(); break
+                queue.append(other)
+        if target not in parent: return [], self.index.edge_list()
+        path_ids, path_edges, step = [target], [], parent[target]
+        while step is not None:
+            previous, edge = step
+            path_ids.append(previous); path_edges.append(edge)
+            step = parent[previous]
+        return path_ids[::-1], self.index.edge_list(path_edges[::-1])
+
+    def subgraph(self, node_types=None, edge_types=None, start=None, end=None, max_nodes=API_MAX_NODES):
+        """
+        Nodes of `node_types` (all if None) and the `edge_types` edges among them. With a date range,
+        events must overlap [start, end] and other nodes must touch at least one remaining event.
+        Returns (nodes, edges, truncated).
+        """
+        nodes = [n for n in self.index.nodes if node_types is None or n['type'] in node_types]
+        if start is not None or end is not None:
+            dates = self.event_dates
+            in_range = pd.Series(True, index=dates.index)
+            if start is not None: in_range &= dates['date_end'] >= start
+            if end is not None: in_range &= dates['date_parsed'] <= end
+            events_in_range = set(dates.index[in_range])
+            touching = {other for event_id in events_in_range for _, other in self.index.neighbors(event_id, edge_types)}
+            nodes = [n for n in nodes if (n['id'] in events_in_range if n['type'] == 'Event' else n['id'] in touching)]
+        truncated = len(nodes) > max_nodes
+        node_ids = {n['id'] for n in nodes[:max_nodes]}
+        return self.index.nodes_for(node_ids), self.index.induced_edges(node_ids, edge_types), truncated
+
+
+# ------------------------------------------------------------------------------
+# FLASK ROUTES
+# ------------------------------------------------------------------------------
+class BadRequest(ValueError):
+    pass
+
+
+class UnknownNode(LookupError):
+    pass
+
+
+def _split_param(name):
+    value = request.args.get(name, '').strip()
+    return tuple(sorted(v.strip() for v in value.split(',') if v.strip())) or None
+
+
+def _int_param(name, default, low, high):
+    try: value = int(request.args.get(name, default))
+    except ValueError: raise BadRequest(f"'{name}' must be an integer")
+    if not low <= value <= high: raise BadRequest(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def _date_param(name):
+    """Naive timestamp (event dates are naive); an offset or zone is converted to UTC first."""
+    value = request.args.get(name)
+    if not value: return None
+    try: timestamp = pd.Timestamp(value)
+    except (ValueError, OverflowError): raise BadRequest(f"'{name}' is not a valid date")
+    if pd.isna(timestamp): raise BadRequest(f"'{name}' is not a valid date")
+    return timestamp.tz_convert('UTC').tz_localize(None) if timestamp.tzinfo is not None else timestamp
+
+
+def _json_response(body, status=200):
+    return Response(body, status=status, mimetype='application/json')
+
+
+def register_graph_api(server, index, element_cache, event_dates=None, layout_engine=None, graph_name='faro', search_index=None, cache_size=API_CACHE_SIZE, cache_bytes=API_CACHE_MAX_BYTES):
+    """
+    Adds /api/graph/neighbors/<id>, /api/graph/path, /api/graph/subgraph and (with a search_index)
+    /api/graph/search to the Flask server.
+    Responses hold Cytoscape elements (same serialization as the app); `layout=<name>` attaches
+    precomputed positions. Serialized responses are kept in an LRU cache bounded by count and total size.
+    """
+    queries = GraphQueries(index, event_dates)
+    cache = LRUCache(cache_size, cache_bytes)
+    api = Blueprint('graph_api', __name__, url_prefix='/api/graph')
+
+    def respond(key, compute):
+        """Cached JSON body for `key`; compute() returns (nodes, edges, extra fields)."""
+        body = cache.get(key)
+        if body is None:
+            try:
+                layout_name = request.args.get('layout')
+                if layout_name and (layout_engine is None or not layout_engine.supports(layout_name)): raise BadRequest(f"Unknown layout '{layout_name}'")
+                nodes, edges, extra = compute()
+                positions = layout_engine.positions(graph_name, layout_name) if layout_name else None
+                elements = element_cache.elements(nodes, edges, positions)
+                body = json.dumps({'elements': elements, 'node_count': len(nodes), 'edge_count': len(edges), **extra})
+            except BadRequest as e:
+                return _json_response(json.dumps({'error': str(e)}), 400)
+            except UnknownNode as e:
+                return _json_response(json.dumps({'error': f"Unknown node '{e}'"}), 404)
+            cache.put(key, body)
+        return _json_response(body)
+
+    def require_node(node_id):
+        if index.get_node(node_id) is None: raise UnknownNode(node_id)
+
+    @api.route('/neighbors/<path:node_id>')
+    def neighbors(node_id):
+        def compute():
+            require_node(node_id)
+            hops = _int_param('hops', 1, 1, API_MAX_HOPS)
+            nodes, edges, truncated = queries.k_hop(node_id, hops, _split_param('types'), _int_param('limit', API_MAX_NODES, 1, API_MAX_NODES))
+            return nodes, edges, {'center': node_id, 'hops': hops, 'truncated': truncated}
+        return respond(('neighbors', node_id, tuple(sorted(request.args.items()))), compute)
+
+    @api.route('/path')
+    def path():
+        def compute():
+            source, target = request.args.get('from'), request.args.get('to')
+            if not source or not target: raise BadRequest("'from' and 'to' are required")
+            require_node(source); require_node(target)
+            directed = request.args.get('directed', 'false').lower() in ('1', 'true', 'yes')
+            path_ids, path_edges = queries.shortest_path(source, target, _split_param('types'), directed)
+            return index.nodes_for(path_ids), path_edges, {'path': path_ids, 'length': len(path_edges) if path_ids else None}
+        return respond(('path', tuple(sorted(request.args.items()))), compute)
+
+    @api.route('/subgraph')
+    def subgraph():
+        def compute():
+            nodes, edges, truncated = queries.subgraph(_split_param('node_types'), _split_param('types'), _date_param('start'), _date_param('end'),
+                                                       _int_param('limit', API_MAX_NODES, 1, API_MAX_NODES))
+            return nodes, edges, {'truncated': truncated}
+        return respond(('subgraph', tuple(sorted(request.args.items()))), compute)
+
+    @api.route('/search')
+    def search():
+        def compute():
+            query = request.args.get('q', '').strip()
+            if not query: raise BadRequest("'q' is required")
+            if search_index is None: raise BadRequest("Search is not available")
+            ranked_ids = search_index.search(query, _int_param('limit', API_MAX_NODES, 1, API_MAX_NODES))
+            nodes = [index.get_node(i) for i in ranked_ids if index.get_node(i) is not None] # Ranked order, best first
+            return nodes, index.edge_list(), {'query': query, 'ranked_ids': [n['id'] for n in nodes]}
+        return respond(('search', tuple(sorted(request.args.items()))), compute)
+
+    server.register_blueprint(api)
+    return cache
@@ -0,0 +1,180 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from graph_store import GraphStore, RowDetails, ConstantDetails, ListDetails
+
+# ------------------------------------------------------------------------------
+# NODE CLASSIFICATION
+# ------------------------------------------------------------------------------
+# Node class -> colour (legend, stylesheet and node 'color')
+NODE_TYPES = { "Event": "#4285F4", "Actor": "#EA4335", "Country": "#FBBC05", "Organization": "#34A853", "Individual": "#8F44AD", "Location": "#F39C12", "Method": "#3498DB", "Outcome": "#E74C3C" }
+ACTOR_NODE_TYPES = ['Country', 'Organization', 'Individual', 'Actor'] # Node classes of actors and individuals (actor graph)
+# Substrings of an actor's free-text 'type' that put it in the Organization class
+ORGANIZATION_KEYWORDS = ["Organization", "Union", "Alliance", "Body", "Legislative", "Force", "Military", "Paramilitary", "Group", "Party", "Community", "Government", "Grouping", "Council", "Administration"]
+
+
+def classify_actor_types(type_series):
+    """Maps the free-text actor 'type' column to a node class (Country / Organization / Actor), whole column at once."""
+    type_str = type_series.fillna('').astype(str)
+    is_country = type_str.str.contains('Country', regex=False).to_numpy()
+    is_org = type_str.str.contains('|'.join(ORGANIZATION_KEYWORDS), regex=True).to_numpy()
+    return np.where(is_country, 'Country', np.where(is_org, 'Organization', 'Actor'))
+
+
+# ------------------------------------------------------------------------------
+# COLUMNAR NODE BUILDERS
+# ------------------------------------------------------------------------------
+def _object_columns(df, drop_columns=()):
+    columns = [c for c in df.columns if c not in drop_columns]
+    # astype(object) boxes numpy scalars (Timestamp, int, ...) once per column instead of once per cell
+    return columns, [df[c].to_numpy() if df[c].dtype == object else df[c].astype(object).to_numpy() for c in columns]
+
+
+def _details_getter(df, drop_columns=()):
+    """details(row) for GraphStore nodes and edges: the row dict of every column except `drop_columns`, rebuilt on demand instead of stored."""
+    return RowDetails(*_object_columns(df, drop_columns))
+
+
+# Table columns left out of a node's details (its id and the parsed dates)
+NODE_DETAILS_DROP = {'event': ['title', 'date_parsed', 'date_end'], 'actor': ['name'], 'individual': ['name']}
+
+
+def _make_nodes(ids, node_classes, colors):
+    """Thin node dicts; their details stay in the table columns (GraphStore.add_node_details)."""
+    return [{'id': i, 'label': i, 'type': t, 'color': c} for i, t, c in zip(ids, node_classes, colors)]
+
+
+def build_event_nodes(events_df, node_types):
+    ids = events_df['title'].tolist()
+    return _make_nodes(ids, ['Event'] * len(ids), [node_types['Event']] * len(ids))
+
+
+def build_actor_nodes(actors_df, node_types):
+    node_classes = classify_actor_types(actors_df['type']).tolist() if len(actors_df) else []
+    colors = [node_types[t] for t in node_classes]
+    return _make_nodes(actors_df['name'].tolist(), node_classes, colors)
+
+
+def build_individual_nodes(individuals_df, node_types):
+    ids = individuals_df['name'].tolist()
+    return _make_nodes(ids, ['Individual'] * len(ids), [node_types['Individual']] * len(ids))
+
+
+# ------------------------------------------------------------------------------
+# COLUMNAR EDGE BUILDERS (edges go straight into a GraphStore as id arrays)
+# ------------------------------------------------------------------------------
+def add_causal_edges(store, causal_links_df):
+    """Causal edges between known nodes; details are the link rows, read back from the table on demand."""
+    if causal_links_df.empty: return np.zeros(0, dtype=np.int32)
+    links = causal_links_df.reset_index(drop=True)
+    return store.add_edges('causal', links['source_event'].to_numpy(dtype=object), links['target_event'].to_numpy(dtype=object),
+                           links['relationship'].to_numpy(dtype=object), _details_getter(links))
+
+
+def add_participation_edges(store, entity_df, relation):
+    """(entity name, event title) pairs from the 'events' list column via explode; unknown names/events are dropped by the store."""
+    if entity_df.empty: return np.zeros(0, dtype=np.int32)
+    pairs = entity_df[['name', 'events']].explode('events')
+    return store.add_edges('participation', pairs['name'].to_numpy(dtype=object), pairs['events'].to_numpy(dtype=object),
+                           np.full(len(pairs), relation, dtype=object), ConstantDetails({'relation': relation}))
+
+
+# ------------------------------------------------------------------------------
+# ACTOR CO-PARTICIPATION (actor <-> actor via shared events)
+# ------------------------------------------------------------------------------
+def co_participation(store, participation_positions, actor_positions, min_weight=1, block_size=2048):
+    """
+    Actor x actor shared-event counts as a sparse incidence product B @ B.T, where B is the
+    binary actor x event matrix (CSR, sorted indices). Returns a dict with the actor order and
+    event order (store node positions), B and the upper-triangle pairs (rows, cols, weights)
+    kept after `min_weight`. The product is computed `block_size` actor rows at a time.
+    """
+    sources, targets = store.src[participation_positions], store.dst[participation_positions]
+    is_actor = np.zeros(len(store.node_ids), dtype=bool)
+    is_actor[actor_positions] = True
+    sources, targets = sources[is_actor[sources]], targets[is_actor[sources]]
+
+    # Actors sorted by name, so pairs come out as (u, v) with u < v
+    actors = np.unique(sources)
+    actors = actors[np.argsort(np.asarray(store.node_ids, dtype=object)[actors], kind='stable')] if len(actors) else actors
+    rank = np.zeros(len(store.node_ids), dtype=np.int64)
+    rank[actors] = np.arange(len(actors))
+    actor_idx = rank[sources]
+    event_idx, events = pd.factorize(targets) if len(targets) else (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32))
+    incidence = sparse.csr_matrix((np.ones(len(actor_idx), dtype=np.int32), (actor_idx, event_idx)), shape=(len(actors), len(events)))
+    incidence.sum_duplicates(); incidence.data[:] = 1 # Binary: listing an event twice doesn't count twice
+    incidence.sort_indices()
+
+    # Multiply in row blocks and threshold each block, so dense events never hold the full product in memory
+    incidence_t = incidence.T.tocsc()
+    rows, cols, weights = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int32)]
+    for start in range(0, len(actors), block_size):
+        block = sparse.triu(incidence[start:start + block_size] @ incidence_t, k=1 + start).tocoo()
+        keep = block.data >= min_weight
+        rows.append(block.row[keep] + start); cols.append(block.col[keep]); weights.append(block.data[keep])
+    rows, cols, weights = np.concatenate(rows), np.concatenate(cols), np.concatenate(weights)
+    order = np.lexsort((cols, rows))
+    return {'actors': actors.astype(np.int32), 'events': np.asarray(events, dtype=np.int32), 'incidence': incidence,
+            'rows': rows[order], 'cols': cols[order], 'weights': weights[order]}
+
+
+def shared_event_ids(co, row, col):
+    """Event positions shared by two actors: intersection of their sorted CSR rows, O(degree)."""
+    indptr, indices = co['incidence'].indptr, co['incidence'].indices
+    return np.intersect1d(indices[indptr[row]:indptr[row + 1]], indices[indptr[col]:indptr[col + 1]], assume_unique=True)
+
+
+def shared_event_index(co):
+    """Compact CSR-style index from each kept pair k to its shared events: co['events'][idx[ptr[k]:ptr[k + 1]]]."""
+    shared_lists = [shared_event_ids(co, r, c) for r, c in zip(co['rows'], co['cols'])]
+    ptr = np.zeros(len(shared_lists) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(lst) for lst in shared_lists])
+    idx = np.concatenate(shared_lists).astype(np.int32) if shared_lists else np.zeros(0, dtype=np.int32)
+    return ptr, idx
+
+
+def add_shared_event_edges(store, participation_positions, actor_positions, min_weight=1, max_listed_events=None):
+    """
+    Actor-graph edges; 'weight' is the number of shared events. The shared event titles of each edge
+    are kept as a CSR index and listed on demand; `max_listed_events` caps them for hover text on very dense graphs.
+    """
+    co = co_participation(store, participation_positions, actor_positions, min_weight)
+    ptr, idx = shared_event_index(co)
+    node_ids = np.asarray(store.node_ids, dtype=object)
+    details = ListDetails('shared_events', node_ids[co['events']], ptr, idx, max_listed_events)
+    return store.add_edges('shared_event', node_ids[co['actors'][co['rows']]], node_ids[co['actors'][co['cols']]],
+                           np.array([f"{w} shared" for w in co['weights']], dtype=object), details, co['weights'])
+
+
+# ------------------------------------------------------------------------------
+# GRAPH BUILD STAGE
+# ------------------------------------------------------------------------------
+def build_graph(events_df, actors_df, individuals_df, causal_links_df, node_types, actor_edge_min_weight=1):
+    """
+    Builds the base node lists and a frozen GraphStore holding every edge (causal, participation and
+    actor shared-event edges). Edge groups are returned as EdgeLists over the store.
+    """
+    graph = {
+        'event_nodes': build_event_nodes(events_df, node_types),
+        'actor_nodes': build_actor_nodes(actors_df, node_types),
+        'individual_nodes': build_individual_nodes(individuals_df, node_types),
+    }
+    graph['all_nodes_base'] = graph['event_nodes'] + graph['actor_nodes'] + graph['individual_nodes']
+
+    store = GraphStore(graph['all_nodes_base'])
+    store.add_node_details(events_df['title'], _details_getter(events_df, NODE_DETAILS_DROP['event']))
+    store.add_node_details(actors_df['name'], _details_getter(actors_df, NODE_DETAILS_DROP['actor']))
+    store.add_node_details(individuals_df['name'], _details_getter(individuals_df, NODE_DETAILS_DROP['individual']))
+    causal = add_causal_edges(store, causal_links_df)
+    actor_event = add_participation_edges(store, actors_df, 'involved_in')
+    individual_event = add_participation_edges(store, individuals_df, 'participated_in')
+    actor_positions = store.positions([n['id'] for n in graph['actor_nodes'] + graph['individual_nodes']])
+    shared_event = add_shared_event_edges(store, np.concatenate([actor_event, individual_event]), actor_positions, actor_edge_min_weight)
+    store.freeze()
+
+    graph['store'] = store
+    graph['causal_edges'] = store.edge_list(causal)
+    graph['actor_event_edges'], graph['individual_event_edges'] = store.edge_list(actor_event), store.edge_list(individual_event)
+    graph['all_edges_base'] = store.edge_list(np.concatenate([causal, actor_event, individual_event]))
+    graph['shared_event_edges'] = store.edge_list(shared_event)
+    return graph
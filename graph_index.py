@@ -0,0 +1,94 @@
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# GRAPH INDEX (built once at startup, shared by callbacks)
+# ------------------------------------------------------------------------------
+def _csr_gather(ptr, values, rows):
+    """Concatenation of values[ptr[r]:ptr[r + 1]] for every r in rows, without a Python loop."""
+    starts, lengths = ptr[rows], ptr[rows + 1] - ptr[rows]
+    if not lengths.sum(): return values[:0]
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+    return values[offsets]
+
+
+class GraphIndex:
+    """
+    Neighbor and subgraph queries for one graph inside a frozen GraphStore: a node subset plus the
+    edge types that belong to it. Lookups walk the store's int32 CSR adjacency, so a query costs
+    O(degree) instead of scanning every edge and node. Results keep the order of the base node/edge
+    lists (store positions), so views look the same as before; edges come back as EdgeLists.
+    """
+
+    def __init__(self, store, nodes, edge_types):
+        self.store = store
+        self.nodes = nodes
+        self.edge_types = tuple(edge_types)
+        self.in_graph = np.zeros(len(store.node_ids), dtype=bool)
+        node_positions = store.positions([n['id'] for n in nodes])
+        self.in_graph[node_positions[node_positions >= 0]] = True
+        self.type_mask = self._type_mask(None)
+        keep = self.type_mask[store.edge_type] & self.in_graph[store.src] & self.in_graph[store.dst] # Dangling edges are left out
+        self.edges = store.edge_list(np.flatnonzero(keep))
+
+    def _type_mask(self, edge_types):
+        """Boolean mask over store edge type codes: the graph's types, narrowed to `edge_types` if given."""
+        names = self.edge_types if edge_types is None else [t for t in edge_types if t in self.edge_types]
+        mask = np.zeros(max(len(self.store.edge_type_names), 1), dtype=bool)
+        mask[self.store.edge_type_codes(names)] = True
+        return mask
+
+    def _position(self, node_id):
+        pos = self.store.position_of.get(node_id)
+        return pos if pos is not None and self.in_graph[pos] else None
+
+    def get_node(self, node_id):
+        pos = self._position(node_id)
+        return self.store.nodes[pos] if pos is not None else None
+
+    def node_details(self, node_id):
+        """Details dict of a node (rebuilt from the store's columns), {} for unknown ids."""
+        pos = self._position(node_id)
+        return self.store.node_details(pos) if pos is not None else {}
+
+    def incident_edge_positions(self, node_id, edge_types=None, direction='both'):
+        """Sorted store positions of edges touching node_id."""
+        pos = self._position(node_id)
+        if pos is None: return np.zeros(0, dtype=np.int32)
+        store, type_mask = self.store, self._type_mask(edge_types)
+        parts = []
+        if direction in ('both', 'out'): parts.append(store.out_edges[store.out_ptr[pos]:store.out_ptr[pos + 1]])
+        if direction in ('both', 'in'): parts.append(store.in_edges[store.in_ptr[pos]:store.in_ptr[pos + 1]])
+        positions = np.unique(np.concatenate(parts))
+        return positions[type_mask[store.edge_type[positions]] & self.in_graph[store.src[positions]] & self.in_graph[store.dst[positions]]]
+
+    def neighbors(self, node_id, edge_types=None, direction='both'):
+        """List of (edge position, other node id) pairs for every edge touching node_id."""
+        positions = self.incident_edge_positions(node_id, edge_types, direction)
+        if not len(positions): return []
+        pos, store = self.store.position_of[node_id], self.store
+        others = np.where(store.src[positions] == pos, store.dst[positions], store.src[positions])
+        return [(edge_pos, store.node_ids[other]) for edge_pos, other in zip(positions.tolist(), others.tolist())]
+
+    def nodes_for(self, node_ids):
+        """Nodes for a set of ids, in base-list order (unknown ids and ids outside this graph are skipped)."""
+        positions = sorted(p for p in map(self._position, node_ids) if p is not None)
+        return [self.store.nodes[pos] for pos in positions]
+
+    def induced_edges(self, node_ids, edge_types=None):
+        """Edges with both endpoints in node_ids, in base-list order. Cost is the out-degree sum of node_ids."""
+        store = self.store
+        positions = np.array([p for p in map(self._position, node_ids) if p is not None], dtype=np.int64)
+        member = np.zeros(len(store.node_ids), dtype=bool)
+        member[positions] = True
+        candidates = _csr_gather(store.out_ptr, store.out_edges, positions)
+        keep = candidates[member[store.dst[candidates]] & self._type_mask(edge_types)[store.edge_type[candidates]]]
+        return store.edge_list(np.sort(keep))
+
+    def edge_list(self, positions=()):
+        return self.store.edge_list(positions)
+
+    def neighborhood(self, node_id, edge_types=None):
+        """(nodes, edges) of the 1-hop star around node_id: the node, its neighbors and the connecting edges."""
+        incident = self.neighbors(node_id, edge_types)
+        neighbor_ids = {node_id} | {other for _, other in incident}
+        return self.nodes_for(neighbor_ids), self.edge_list([edge_pos for edge_pos, _ in incident])
@@ -0,0 +1,168 @@
+import os
+import json
+import hashlib
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from layout_engine import graph_signature
+
+# ------------------------------------------------------------------------------
+# NETWORK METRICS (centrality and communities per registered graph, cached on disk)
+# ------------------------------------------------------------------------------
+METRICS_CACHE_DIR = os.environ.get('METRICS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'metrics'))
+BETWEENNESS_EXACT_MAX_NODES = int(os.environ.get('BETWEENNESS_EXACT_MAX_NODES', 2000)) # Larger graphs: sampled betweenness
+BETWEENNESS_SAMPLES = int(os.environ.get('BETWEENNESS_SAMPLES', 256)) # Source nodes sampled (k) above that size
+LOUVAIN_MAX_NODES = int(os.environ.get('LOUVAIN_MAX_NODES', 50000)) # Larger graphs: label propagation communities
+BETWEENNESS_BATCH = 16 # BFS sources advanced together (columns of one sparse x dense product)
+METRICS_FORMAT = 1
+METRICS = ['degree', 'betweenness', 'eigenvector', 'community']
+CENTRALITY_METRICS = ['degree', 'betweenness', 'eigenvector']
+
+
+def _weighted_graph(nodes, edges):
+    """Undirected nx.Graph over the node ids; parallel edges add up their weights (shared-event counts, else 1)."""
+    G = nx.Graph()
+    G.add_nodes_from(n['id'] for n in nodes)
+    store = edges.store
+    ids, weights = store.node_ids, store.weight[edges.positions]
+    for s, t, w in zip(store.src[edges.positions].tolist(), store.dst[edges.positions].tolist(), weights.tolist()):
+        s, t = ids[s], ids[t]
+        if s == t or s not in G or t not in G: continue
+        if G.has_edge(s, t): G[s][t]['weight'] += max(w, 1)
+        else: G.add_edge(s, t, weight=max(w, 1))
+    return G
+
+
+def betweenness_centrality(adjacency, sources=None):
+    """
+    Normalized (undirected) betweenness, as nx.betweenness_centrality, over an unweighted symmetric CSR
+    adjacency. Brandes' algorithm runs for a batch of sources at once: every BFS level and every step of
+    the dependency accumulation is one sparse x dense product. With `sources` (a sample of k nodes), the
+    sums are rescaled by n / k to estimate the exact values.
+    """
+    n = adjacency.shape[0]
+    if n <= 2: return np.zeros(n)
+    sources = np.arange(n) if sources is None else np.asarray(sources)
+    adjacency = sparse.csr_matrix(adjacency, dtype=np.float64)
+    adjacency.data[:] = 1.0
+    total = np.zeros(n)
+    for start in range(0, len(sources), BETWEENNESS_BATCH):
+        batch = sources[start:start + BETWEENNESS_BATCH]
+        columns = np.arange(len(batch))
+        dist = np.full((n, len(batch)), -1, dtype=np.int32)
+        sigma = np.zeros((n, len(batch)))
+        dist[batch, columns], sigma[batch, columns] = 0, 1.0
+        frontier, level = sigma.copy(), 0
+        while True: # Forward: shortest-path counts, one level per product
+            reached = adjacency @ frontier
+            reached[dist >= 0] = 0
+            new = reached > 0
+            if not new.any(): break
+            level += 1
+            dist[new], sigma[new] = level, reached[new]
+            frontier = np.where(new, reached, 0.0)
+        delta = np.zeros_like(sigma)
+        for depth in range(level, 0, -1): # Backward: dependencies flow from each level to the one before
+            coef = np.where(dist == depth, (1.0 + delta) / np.where(sigma > 0, sigma, 1.0), 0.0)
+            delta += np.where(dist == depth - 1, sigma * (adjacency @ coef), 0.0)
+        delta[batch, columns] = 0
+        total += delta.sum(axis=1)
+    return total / ((n - 1) * (n - 2)) * (n / len(sources))
+
+
+def compute_metrics(nodes, edges, seed=42):
+    """{metric: list in node order}: degree, betweenness, eigenvector centrality and community number (0 = largest)."""
+    G = _weighted_graph(nodes, edges)
+    node_ids = [n['id'] for n in nodes]
+    n = G.number_of_nodes()
+    degree = nx.degree_centrality(G) if n > 1 else {}
+    sources = np.random.default_rng(seed).choice(n, BETWEENNESS_SAMPLES, replace=False) if n > max(BETWEENNESS_EXACT_MAX_NODES, BETWEENNESS_SAMPLES) else None # Sampled above the threshold
+    betweenness = dict(zip(node_ids, betweenness_centrality(nx.to_scipy_sparse_array(G, nodelist=node_ids, weight=None, format='csr'), sources).tolist()))
+    try: eigenvector = nx.eigenvector_centrality_numpy(G, weight='weight') if G.number_of_edges() else {}
+    except Exception as e: # No convergence (e.g. many small components); sizes fall back to the other metrics
+        print(f"Warning: Eigenvector centrality failed ({e}); using zeros")
+        eigenvector = {}
+    if not G.number_of_edges(): groups = [{node_id} for node_id in G] # Louvain divides by the total weight
+    elif n > LOUVAIN_MAX_NODES: groups = nx.community.asyn_lpa_communities(G, weight='weight', seed=seed)
+    else: groups = nx.community.louvain_communities(G, weight='weight', seed=seed)
+    order = {node_id: i for i, node_id in enumerate(node_ids)}
+    community = {}
+    for number, group in enumerate(sorted(groups, key=lambda g: (-len(g), min(order[x] for x in g)))): # Largest first, stable across runs
+        for node_id in group: community[node_id] = number
+    return {
+        'degree': [round(degree.get(i, 0.0), 6) for i in node_ids],
+        'betweenness': [round(betweenness.get(i, 0.0), 6) for i in node_ids],
+        'eigenvector': [round(abs(eigenvector.get(i, 0.0)), 6) for i in node_ids],
+        'community': [community.get(i, -1) for i in node_ids],
+    }
+
+
+class GraphMetrics:
+    """Computes network metrics once per registered graph and keeps them in memory and on disk (keyed by the graph signature)."""
+
+    def __init__(self, cache_dir=METRICS_CACHE_DIR, debug=False):
+        self.cache_dir = cache_dir
+        self.debug = debug
+        self.graphs = {} # graph name -> (nodes, edges, signature)
+        self._memory = {}
+
+    def register(self, graph_name, nodes, edges):
+        self.graphs[graph_name] = (nodes, edges, graph_signature(nodes, edges))
+
+    def _cache_key(self, graph_name):
+        settings = [METRICS_FORMAT, BETWEENNESS_EXACT_MAX_NODES, BETWEENNESS_SAMPLES, LOUVAIN_MAX_NODES]
+        raw = json.dumps([graph_name, settings, self.graphs[graph_name][2]], sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _read_disk(self, key):
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        if not os.path.isfile(path): return None
+        try:
+            with open(path, encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable metrics cache {path}: {e}")
+            return None
+
+    def _write_disk(self, key, metrics):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(metrics, f)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json")) # Atomic: safe with several workers
+        except OSError as e:
+            print(f"Warning: Could not write metrics cache: {e}")
+
+    def metrics(self, graph_name):
+        """{metric: list in the registered node order}; computed at most once per graph signature across restarts."""
+        key = self._cache_key(graph_name)
+        if key not in self._memory:
+            cached = self._read_disk(key)
+            if cached is None:
+                nodes, edges, _ = self.graphs[graph_name]
+                cached = compute_metrics(nodes, edges)
+                self._write_disk(key, cached)
+                if self.debug: print(f"Metrics computed: {graph_name} ({len(nodes)} nodes)")
+            self._memory[key] = cached
+        return self._memory[key]
+
+    def node_metrics(self, graph_name):
+        """node id -> {metric: value} for one graph."""
+        nodes = self.graphs[graph_name][0]
+        metrics = self.metrics(graph_name)
+        return {n['id']: {name: metrics[name][i] for name in METRICS} for i, n in enumerate(nodes)}
+
+    def element_data(self):
+        """
+        node id -> extra Cytoscape data fields ('<graph>_<metric>') for every registered graph: centralities
+        scaled to 0-1 by their maximum (fixed mapData ranges in the stylesheets) and the community number.
+        """
+        data = {}
+        for graph_name, (nodes, _, _) in self.graphs.items():
+            metrics = self.metrics(graph_name)
+            columns = {name: np.asarray(metrics[name], dtype=float) for name in CENTRALITY_METRICS}
+            columns = {name: np.round(values / values.max(), 4) if len(values) and values.max() > 0 else values for name, values in columns.items()}
+            for i, node in enumerate(nodes):
+                fields = data.setdefault(node['id'], {})
+                for name, values in columns.items(): fields[f"{graph_name}_{name}"] = float(values[i])
+                fields[f"{graph_name}_community"] = metrics['community'][i]
+        return data
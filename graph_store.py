@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# INTERNED GRAPH STORE (int32 node ids, edges as NumPy columns)
+# ------------------------------------------------------------------------------
+class GraphStore:
+    """
+    Node ids are interned to int32 positions in `nodes`; edges are parallel arrays (src, dst, type code,
+    label code, weight) in insertion order, with per-batch details getters instead of a dict per edge.
+    Node details are held the same way (add_node_details): `nodes` keeps thin dicts (id, label, type,
+    colour) that views filter and select, node() adds the details on demand.
+    Edge dicts and strings are only materialized by edge() at the serialization boundary
+    (element cache, layout engine). Add edges with add_edges(), then freeze() before queries.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = nodes # Thin node dicts shared by the view lists; details via node_details()
+        self.node_ids = [n['id'] for n in nodes]
+        self.node_index = pd.Index(self.node_ids) # Vectorized id -> position
+        if not self.node_index.is_unique: # entity_resolution.qualify_colliding_ids makes dataset ids unique
+            raise ValueError(f"Duplicate node ids: {', '.join(map(repr, self.node_index[self.node_index.duplicated()].unique()[:5]))}")
+        self.position_of = {node_id: pos for pos, node_id in enumerate(self.node_ids)} # Scalar id -> position
+        codes, names = pd.factorize(pd.Series([n['type'] for n in nodes], dtype=object))
+        self.node_type, self.node_type_names = codes.astype(np.int8), list(names)
+        self.node_batch, self.node_row = np.full(len(nodes), -1, dtype=np.int8), np.zeros(len(nodes), dtype=np.int32) # -1: details in the node dict
+        self._node_batches = [] # Per add_node_details call: details(row) function
+        self.edge_type_names, self.label_names, self._label_codes = [], [], {}
+        self._batches = [] # Per add_edges call: (edge type, has weight, details(row) function)
+        self.src, self.dst, self.row = (np.zeros(0, dtype=np.int32) for _ in range(3)) # Endpoint positions, row within the batch
+        self.edge_type, self.batch = np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int8)
+        self.label, self.weight = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        self.frozen = False
+
+    def positions(self, node_ids):
+        """int32 positions for an array of ids; -1 for unknown ids."""
+        return self.node_index.get_indexer(pd.Index(node_ids, dtype=object)).astype(np.int32) if len(node_ids) else np.zeros(0, dtype=np.int32)
+
+    def _codes(self, labels):
+        """Label codes into the shared `label_names` vocabulary."""
+        codes, uniques = pd.factorize(pd.Series(labels, dtype=object), use_na_sentinel=False)
+        lookup = []
+        for label in uniques:
+            if label not in self._label_codes:
+                self._label_codes[label] = len(self.label_names)
+                self.label_names.append(label)
+            lookup.append(self._label_codes[label])
+        return np.asarray(lookup, dtype=np.int32)[codes] if len(codes) else np.zeros(0, dtype=np.int32)
+
+    def add_edges(self, edge_type, sources, targets, labels, details, weights=None):
+        """
+        Appends one batch of edges given as id arrays; edges with an unknown endpoint are dropped.
+        `details(row)` rebuilds the details dict of the batch's row-th edge on demand (one of the
+        picklable getters below, so a store can be written to a snapshot).
+        Returns the store positions of the added edges.
+        """
+        if self.frozen: raise RuntimeError("GraphStore is frozen")
+        src, dst = self.positions(sources), self.positions(targets)
+        rows = np.flatnonzero((src >= 0) & (dst >= 0)).astype(np.int32)
+        if edge_type not in self.edge_type_names: self.edge_type_names.append(edge_type)
+        batch = len(self._batches)
+        self._batches.append((edge_type, weights is not None, details))
+        start = len(self.src)
+        columns = {
+            'src': src[rows], 'dst': dst[rows], 'row': rows,
+            'edge_type': np.full(len(rows), self.edge_type_names.index(edge_type), dtype=np.int8),
+            'label': self._codes(np.asarray(labels, dtype=object)[rows]),
+            'weight': np.asarray(weights, dtype=np.int32)[rows] if weights is not None else np.zeros(len(rows), dtype=np.int32),
+            'batch': np.full(len(rows), batch, dtype=np.int8),
+        }
+        for name, values in columns.items(): setattr(self, name, np.concatenate([getattr(self, name), values]))
+        return np.arange(start, start + len(rows), dtype=np.int32)
+
+    def add_node_details(self, node_ids, details):
+        """`details(row)` rebuilds the details dict of the node node_ids[row] (a picklable getter, like edge details)."""
+        positions = self.positions(node_ids)
+        known = positions >= 0
+        self.node_batch[positions[known]] = len(self._node_batches)
+        self.node_row[positions[known]] = np.flatnonzero(known)
+        self._node_batches.append(details)
+
+    def node_details(self, pos):
+        batch = self.node_batch[pos]
+        return self._node_batches[batch](int(self.node_row[pos])) if batch >= 0 else self.nodes[pos].get('details_dict', {})
+
+    def node(self, pos):
+        """Materialized node dict with its 'details_dict'."""
+        return {**self.nodes[pos], 'details_dict': self.node_details(pos)}
+
+    def iter_nodes(self):
+        """Materialized node dicts in position order, one at a time."""
+        return (self.node(pos) for pos in range(len(self.nodes)))
+
+    def freeze(self):
+        """Builds CSR adjacency: out/in edge positions per node, ordered by edge type then position."""
+        positions = np.arange(len(self.src), dtype=np.int32)
+        n_nodes = len(self.node_ids)
+        self.out_edges = positions[np.lexsort((positions, self.edge_type, self.src))]
+        self.in_edges = positions[np.lexsort((positions, self.edge_type, self.dst))]
+        self.out_ptr = np.r_[0, np.cumsum(np.bincount(self.src, minlength=n_nodes))].astype(np.int64)
+        self.in_ptr = np.r_[0, np.cumsum(np.bincount(self.dst, minlength=n_nodes))].astype(np.int64)
+        self.frozen = True
+        return self
+
+    def edge_type_codes(self, edge_types):
+        """int8 codes for edge type names (unknown names are ignored)."""
+        return np.array([self.edge_type_names.index(t) for t in edge_types if t in self.edge_type_names], dtype=np.int8)
+
+    def edge(self, pos):
+        """Materialized edge dict (same keys as the graph builders used to produce)."""
+        edge_type, has_weight, details = self._batches[self.batch[pos]]
+        edge = {'source': self.node_ids[self.src[pos]], 'target': self.node_ids[self.dst[pos]], 'label': self.label_names[self.label[pos]], 'type': edge_type}
+        if has_weight: edge['weight'] = int(self.weight[pos])
+        edge['details_dict'] = details(int(self.row[pos]))
+        return edge
+
+    def edge_list(self, positions):
+        return EdgeList(self, positions)
+
+    def nbytes(self):
+        """Bytes held by the edge columns and adjacency arrays."""
+        return sum(getattr(self, name).nbytes for name in ('src', 'dst', 'row', 'edge_type', 'label', 'weight', 'batch', 'out_edges', 'in_edges', 'out_ptr', 'in_ptr'))
+
+
+class EdgeList:
+    """Read-only sequence of edges selected by store position; items are materialized on access."""
+
+    def __init__(self, store, positions):
+        self.store = store
+        self.positions = np.asarray(positions, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return (self.store.edge(pos) for pos in self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return EdgeList(self.store, self.positions[i])
+        return self.store.edge(self.positions[i])
+
+    def __add__(self, other):
+        return EdgeList(self.store, np.concatenate([self.positions, other.positions]))
+
+    def endpoints(self):
+        """(source id, target id, type) tuples without building details."""
+        store = self.store
+        ids, types = store.node_ids, store.edge_type_names
+        return [(ids[s], ids[t], types[k]) for s, t, k in zip(store.src[self.positions].tolist(), store.dst[self.positions].tolist(), store.edge_type[self.positions].tolist())]
+
+
+
+# ------------------------------------------------------------------------------
+# EDGE DETAILS GETTERS (picklable, so the store can be snapshotted)
+# ------------------------------------------------------------------------------
+class RowDetails:
+    """Row dict of a table (column arrays), rebuilt per call."""
+
+    def __init__(self, columns, arrays):
+        self.columns, self.arrays = columns, arrays
+
+    def __call__(self, row):
+        return {c: a[row] for c, a in zip(self.columns, self.arrays)}
+
+
+class ConstantDetails:
+    """The same details for every edge of a batch (a fresh dict per call, callers may mutate it)."""
+
+    def __init__(self, details):
+        self.details = details
+
+    def __call__(self, row):
+        return dict(self.details)
+
+
+class ListDetails:
+    """{key: values[idx[ptr[row]:ptr[row + 1]]]} from a CSR index, capped at `limit` items."""
+
+    def __init__(self, key, values, ptr, idx, limit=None):
+        self.key, self.values, self.ptr, self.idx, self.limit = key, values, ptr, idx, limit
+
+    def __call__(self, row):
+        return {self.key: self.values[self.idx[self.ptr[row]:self.ptr[row + 1]][:self.limit]].tolist()}
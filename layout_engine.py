@@ -0,0 +1,290 @@
+import os
+import json
+import hashlib
+import math
+import numpy as np
+import networkx as nx
+from scipy.sparse import csgraph
+
+# ------------------------------------------------------------------------------
+# SERVER-SIDE LAYOUTS
+# ------------------------------------------------------------------------------
+# Dropdown layout name -> (server algorithm, default parameters). Positions are computed
+# once per (graph, layout, parameters), cached on disk and sent with the 'preset' layout,
+# so the browser no longer runs cose/dagre on every render.
+SERVER_LAYOUTS = {
+    'cose': ('force', {}),
+    'dagre': ('layered', {'direction': 'TB'}),
+    'breadthfirst': ('breadthfirst', {'direction': 'TB'}),
+    'grid': ('grid', {}),
+    'circle': ('circle', {}),
+    'concentric': ('concentric', {}),
+}
+LAYOUT_CACHE_DIR = os.environ.get('LAYOUT_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'layouts'))
+KAMADA_KAWAI_MAX_NODES = 500 # Kamada-Kawai is O(N^2) memory; spring_layout above this
+FORCE_LAYOUT_MAX_NODES = int(os.environ.get('FORCE_LAYOUT_MAX_NODES', 2000)) # spring_layout is O(N^2) per iteration; pivot MDS above this
+PIVOT_MDS_PIVOTS = 50 # BFS sources of the pivot MDS layout
+NODE_SPACING = 90 # Approximate pixels per node used to scale unit layouts
+LAYOUT_FORMAT = 3 # Part of the cache key: bump when an algorithm's output changes
+
+
+def _endpoints(edges):
+    """(source, target, type) per edge; EdgeLists (graph_store) answer from their arrays without building details."""
+    if hasattr(edges, 'endpoints'): return edges.endpoints()
+    return [(e['source'], e['target'], e.get('type', '')) for e in edges]
+
+
+def graph_signature(nodes, edges):
+    """Stable hash of node ids and edge endpoints, so cached positions follow dataset changes."""
+    digest = hashlib.sha1()
+    for node in nodes: digest.update(f"n\x00{node['id']}\x01".encode('utf-8'))
+    for source, target, edge_type in _endpoints(edges): digest.update(f"e\x00{source}\x00{target}\x00{edge_type}\x01".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _to_networkx(nodes, edges, directed=False):
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(n['id'] for n in nodes)
+    G.add_edges_from((s, t) for s, t, _ in _endpoints(edges) if s in G and t in G and s != t)
+    return G
+
+
+def _scaled(unit_positions, n_nodes):
+    """Scales [-1, 1] coordinates to pixels, growing with sqrt(N) so node density stays readable."""
+    scale = max(250.0, NODE_SPACING * math.sqrt(max(n_nodes, 1)))
+    return {node_id: {'x': round(float(x) * scale, 1), 'y': round(float(y) * scale, 1)} for node_id, (x, y) in unit_positions.items()}
+
+
+# ------------------------------------------------------------------------------
+# ALGORITHMS
+# ------------------------------------------------------------------------------
+def pivot_mds_layout(G, seed=42, pivots=PIVOT_MDS_PIVOTS):
+    """
+    Unit positions for a large connected graph by pivot MDS (Brandes & Pich): BFS distances from a few
+    max-min spread pivots, double-centered, projected on their two main axes. O(pivots * (N + E)) time and
+    O(pivots * N) memory, so it stays in seconds where spring_layout would take minutes. Nodes with equal
+    distances to every pivot (e.g. leaves of one hub) are spread by a small jitter.
+    """
+    node_ids = list(G)
+    n = len(node_ids)
+    adjacency = nx.to_scipy_sparse_array(G, nodelist=node_ids, weight=None, format='csr')
+    rng = np.random.default_rng(seed)
+    k = min(pivots, n)
+    distances, nearest = np.empty((n, k)), np.full(n, np.inf)
+    pivot = int(rng.integers(n))
+    for i in range(k): # Next pivot: the node farthest from all chosen ones
+        distances[:, i] = csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=pivot)
+        nearest = np.minimum(nearest, distances[:, i])
+        pivot = int(np.argmax(nearest))
+    squared = distances ** 2
+    centered = -0.5 * (squared - squared.mean(axis=0) - squared.mean(axis=1)[:, None] + squared.mean())
+    u, s, _ = np.linalg.svd(centered, full_matrices=False)
+    coords = u[:, :2] * s[:2]
+    coords /= max(np.abs(coords).max(), 1e-9)
+    coords += rng.normal(0, 0.5 / math.sqrt(n), coords.shape)
+    return dict(zip(node_ids, coords / np.abs(coords).max()))
+
+
+def _component_layout(G, seed, iterations):
+    """Unit ([-1, 1]) positions for one connected graph: Kamada-Kawai when small, spring_layout up to FORCE_LAYOUT_MAX_NODES, pivot MDS above."""
+    if G.number_of_nodes() == 1: return {next(iter(G)): (0.0, 0.0)}
+    if G.number_of_nodes() <= KAMADA_KAWAI_MAX_NODES:
+        try:
+            return nx.kamada_kawai_layout(G)
+        except nx.NetworkXError:
+            pass
+    if G.number_of_nodes() > FORCE_LAYOUT_MAX_NODES: return pivot_mds_layout(G, seed)
+    return nx.spring_layout(G, k=1.0 / math.sqrt(G.number_of_nodes()), iterations=iterations, seed=seed)
+
+
+def _pack(parts):
+    """
+    Shelf packing of separately laid out parts (pixel positions dicts, largest first): left to right in
+    rows about as wide as the square root of their total area, NODE_SPACING apart.
+    """
+    boxes = []
+    for positions in parts:
+        xs, ys = [p['x'] for p in positions.values()], [p['y'] for p in positions.values()]
+        boxes.append((min(xs), min(ys), max(xs) - min(xs) + NODE_SPACING, max(ys) - min(ys) + NODE_SPACING))
+    row_width = max(max(b[2] for b in boxes), math.sqrt(sum(b[2] * b[3] for b in boxes)))
+    packed, x, y, row_height = {}, 0.0, 0.0, 0.0
+    for positions, (min_x, min_y, width, height) in zip(parts, boxes):
+        if x > 0 and x + width > row_width: x, y, row_height = 0.0, y + row_height, 0.0
+        for node_id, p in positions.items(): packed[node_id] = {'x': round(p['x'] - min_x + x, 1), 'y': round(p['y'] - min_y + y, 1)}
+        x, row_height = x + width, max(row_height, height)
+    return packed
+
+
+def force_layout(nodes, edges, seed=42, iterations=50):
+    """
+    Kamada-Kawai for small graphs (as in Crimea2.create_actor_relationships), spring_layout for mid-sized
+    and pivot MDS for large ones.
+    Each connected component is laid out on its own and the components are packed side by side,
+    so disconnected parts never overlap.
+    """
+    G = _to_networkx(nodes, edges)
+    if not G: return {}
+    order_in_base = {n['id']: i for i, n in enumerate(nodes)}
+    components = sorted(nx.connected_components(G), key=lambda c: (-len(c), min(order_in_base[n] for n in c)))
+    if len(components) == 1: return _scaled(_component_layout(G, seed, iterations), G.number_of_nodes())
+    parts = [_scaled(_component_layout(G.subgraph(c), seed, iterations), len(c)) if len(c) > 1 else {next(iter(c)): {'x': 0.0, 'y': 0.0}} for c in components]
+    return _pack(parts)
+
+
+def _layer_positions(layers, G, order_in_base, direction='TB'):
+    """Places layers top to bottom, ordering each layer by the mean x of its already placed neighbours."""
+    neighbours = G.predecessors if G.is_directed() else G.neighbors
+    positions, x_of = {}, {}
+    for depth, layer in enumerate(layers):
+        def barycenter(node_id):
+            placed = [x_of[p] for p in neighbours(node_id) if p in x_of]
+            return sum(placed) / len(placed) if placed else order_in_base[node_id]
+        for i, node_id in enumerate(sorted(layer, key=barycenter)):
+            x_of[node_id] = i - (len(layer) - 1) / 2.0
+            positions[node_id] = (x_of[node_id] * NODE_SPACING * 1.5, depth * NODE_SPACING * 1.5)
+    if direction == 'LR': positions = {k: (y, x) for k, (x, y) in positions.items()}
+    return {k: {'x': round(x, 1), 'y': round(y, 1)} for k, (x, y) in positions.items()}
+
+
+def layered_layout(nodes, edges, direction='TB'):
+    """Hierarchical (dagre-like) layout: layers are topological generations of the condensation, so cycles are fine."""
+    G = _to_networkx(nodes, edges, directed=True)
+    if not G: return {}
+    condensed = nx.condensation(G)
+    members = nx.get_node_attributes(condensed, 'members')
+    order_in_base = {n['id']: i for i, n in enumerate(nodes)}
+    layers = [[m for comp in generation for m in sorted(members[comp], key=order_in_base.get)] for generation in nx.topological_generations(condensed)]
+    return _layer_positions(layers, G, order_in_base, direction)
+
+
+def breadthfirst_layout(nodes, edges, roots=None, direction='TB'):
+    """Layers by BFS distance from `roots` (undirected); other components start from their first node."""
+    G = _to_networkx(nodes, edges)
+    if not G: return {}
+    order_in_base = {n['id']: i for i, n in enumerate(nodes)}
+    sources = [r for r in (roots or []) if r in G]
+    layers, reached = [], set()
+    for start in [sources, *([n['id']] for n in nodes)]: # Roots first, then each component not yet reached
+        if not start or start[0] in reached: continue
+        for depth, layer in enumerate(nx.bfs_layers(G, start)):
+            if depth == len(layers): layers.append([])
+            layers[depth].extend(layer)
+            reached.update(layer)
+    layers = [sorted(layer, key=order_in_base.get) for layer in layers]
+    return _layer_positions(layers, G, order_in_base, direction)
+
+
+def grid_layout(nodes, edges):
+    cols = max(1, math.ceil(math.sqrt(len(nodes))))
+    return {n['id']: {'x': (i % cols) * NODE_SPACING * 1.5, 'y': (i // cols) * NODE_SPACING} for i, n in enumerate(nodes)}
+
+
+def circle_layout(nodes, edges):
+    return _scaled(nx.circular_layout([n['id'] for n in nodes]), len(nodes)) if nodes else {}
+
+
+def concentric_layout(nodes, edges):
+    """Rings by degree, highest-degree nodes in the centre."""
+    G = _to_networkx(nodes, edges)
+    if not G: return {}
+    ordered = sorted(G.nodes(), key=lambda n: -G.degree(n))
+    positions, start, ring = {}, 0, 0
+    while start < len(ordered):
+        size = 1 if ring == 0 else 6 * ring
+        members = ordered[start:start + size]
+        for i, node_id in enumerate(members):
+            angle = 2 * math.pi * i / len(members)
+            positions[node_id] = {'x': round(ring * NODE_SPACING * math.cos(angle), 1), 'y': round(ring * NODE_SPACING * math.sin(angle), 1)}
+        start, ring = start + size, ring + 1
+    return positions
+
+
+ALGORITHMS = {'force': force_layout, 'layered': layered_layout, 'breadthfirst': breadthfirst_layout, 'grid': grid_layout, 'circle': circle_layout, 'concentric': concentric_layout}
+
+
+# ------------------------------------------------------------------------------
+# LAYOUT ENGINE (memory + disk cache)
+# ------------------------------------------------------------------------------
+class LayoutEngine:
+    """Computes node positions once per (graph, layout, parameters) and keeps them in memory and on disk."""
+
+    def __init__(self, cache_dir=LAYOUT_CACHE_DIR, debug=False):
+        self.cache_dir = cache_dir
+        self.debug = debug
+        self.graphs = {} # graph name -> (nodes, edges, signature)
+        self.graph_params = {} # graph name -> layout name -> parameter overrides
+        self._memory = {}
+
+    def register(self, graph_name, nodes, edges, layout_params=None):
+        """Registers a graph; layout_params maps layout name -> parameter overrides (e.g. breadthfirst roots)."""
+        self.graphs[graph_name] = (nodes, edges, graph_signature(nodes, edges))
+        self.graph_params[graph_name] = layout_params or {}
+
+    def supports(self, layout_name):
+        return layout_name in SERVER_LAYOUTS
+
+    def _cache_key(self, graph_name, layout_name, params):
+        signature = self.graphs[graph_name][2]
+        raw = json.dumps([graph_name, layout_name, params, signature, LAYOUT_FORMAT], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _read_disk(self, key):
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        if not os.path.isfile(path): return None
+        try:
+            with open(path, encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable layout cache {path}: {e}")
+            return None
+
+    def _write_disk(self, key, positions):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(positions, f)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json")) # Atomic: safe with several workers
+        except OSError as e:
+            print(f"Warning: Could not write layout cache: {e}")
+
+    def positions(self, graph_name, layout_name, **params):
+        """Node id -> {'x', 'y'} for a registered graph; computed at most once per key across restarts."""
+        algorithm, defaults = SERVER_LAYOUTS[layout_name]
+        params = {**defaults, **self.graph_params[graph_name].get(layout_name, {}), **params}
+        key = self._cache_key(graph_name, layout_name, params)
+        if key not in self._memory:
+            cached = self._read_disk(key)
+            if cached is None:
+                nodes, edges, _ = self.graphs[graph_name]
+                cached = ALGORITHMS[algorithm](nodes, edges, **params)
+                self._write_disk(key, cached)
+                if self.debug: print(f"Layout computed: {graph_name}/{layout_name} ({len(cached)} nodes)")
+            self._memory[key] = cached
+        return self._memory[key]
+
+    def place_new_nodes(self, known_positions, nodes, edges, seed=42):
+        """
+        Incremental placement for subgraph views: nodes that already have a position keep it,
+        only new nodes are placed (spring layout with the known nodes fixed).
+        """
+        positions = {n['id']: known_positions[n['id']] for n in nodes if n['id'] in known_positions}
+        new_ids = [n['id'] for n in nodes if n['id'] not in positions]
+        if not new_ids: return positions
+        G = _to_networkx(nodes, edges)
+        if not positions:
+            return force_layout(nodes, edges, seed=seed)
+        rng = np.random.default_rng(seed)
+        initial = {node_id: (p['x'], p['y']) for node_id, p in positions.items()}
+        for node_id in new_ids: # Start new nodes at the centroid of their placed neighbours
+            placed = [initial[nb] for nb in G.neighbors(node_id) if nb in initial]
+            cx, cy = np.mean(placed, axis=0) if placed else np.mean(list(initial.values()), axis=0)
+            initial[node_id] = (cx + rng.normal(0, NODE_SPACING / 2), cy + rng.normal(0, NODE_SPACING / 2))
+        placed = nx.spring_layout(G, pos=initial, fixed=list(positions), k=NODE_SPACING, iterations=30, seed=seed)
+        positions.update({node_id: {'x': round(float(placed[node_id][0]), 1), 'y': round(float(placed[node_id][1]), 1)} for node_id in new_ids})
+        return positions
+
+
+def preset_layout(positions=None, padding=50):
+    """Cytoscape layout config that uses the precomputed positions."""
+    layout = {'name': 'preset', 'animate': False, 'fit': True, 'padding': padding}
+    if positions is not None: layout['positions'] = positions
+    return layout
@@ -0,0 +1,154 @@
+import json
+import math
+import numpy as np
+from element_cache import edge_id
+
+# ------------------------------------------------------------------------------
+# NODE GROUPS (actors collapsed by type class into super-nodes with bundled edges)
+# ------------------------------------------------------------------------------
+GROUP_TYPES = ('Country', 'Organization', 'Individual', 'Actor') # Node classes assigned by graph_builder (actor and individual nodes)
+HIDDEN_CLASS = 'hidden' # Bundled edges of an expanded group (display: none in the stylesheet)
+MEMBER_CLASS = 'member' # Group members; hidden while they have no parent (':orphan'), i.e. while their group is collapsed
+
+
+def group_id(group):
+    return f"group:{group}"
+
+
+def member_id(group, element_id):
+    """Id of a member node or edge inside a group block; namespaced, so leaving the grouped view adds the plain elements back."""
+    return f"{group_id(group)}/{element_id}"
+
+
+def group_node_element(group, count, linked, position=None, expanded=False):
+    """Super-node for a group; expanded, it is the compound parent of its members."""
+    data = {
+        'id': group_id(group),
+        'label': f"{group} ({count})",
+        'type': 'Group',
+        'group': group,
+        'size': 40,
+        'details_json': json.dumps({'members': count, 'linked_nodes': linked})
+    }
+    element = {'data': data, 'classes': f"Group {group}" + (" expanded" if expanded else "")}
+    if position: element['position'] = position
+    return element
+
+
+def with_class(element, name):
+    return {**element, 'classes': f"{element.get('classes', '')} {name}".strip()} # Copy, cached elements stay untouched
+
+
+def bundled_edge_element(element_id, source, target, edge_type, label, count):
+    """One edge standing for `count` edges between the same (display) endpoints."""
+    edge_data = {
+        'id': element_id,
+        'source': source,
+        'target': target,
+        'label': f"{label} ×{count}" if count > 1 else label,
+        'edge_type': edge_type,
+        'weight': count,
+        'width': min(1 + math.log2(count), 5),
+        'details_json': json.dumps({'bundled_edges': count})
+    }
+    return {'data': edge_data, 'classes': f"{edge_type} bundled"}
+
+
+class NodeGroups:
+    """
+    Collapsible groups over one graph inside a GraphStore: nodes whose type is in `group_types` form one
+    group per type, all other nodes (events) and the edges between them are the fixed base. An edge touching
+    a grouped node belongs to the group of its source (else of its target), and its other grouped endpoint,
+    if any, is always drawn as that group's super-node. So a group's block - collapsed: the super-node and one
+    bundled edge per distinct neighbor; expanded: the super-node as a compound parent, its members and their
+    edges - depends on that group only. Both states hold the same elements in the same order (the other
+    state's ones hidden), so a toggle only changes the super-node's and bundles' classes and the members'
+    parent: O(group size + its bundles); member edges hide and show with their member endpoint.
+    """
+
+    def __init__(self, store, nodes, edges, group_types=GROUP_TYPES):
+        self.store = store
+        present = {n['type'] for n in nodes}
+        self.groups = [t for t in group_types if t in present]
+        code = {t: i for i, t in enumerate(self.groups)}
+        self.node_group = np.full(len(store.node_ids), -1, dtype=np.int32) # Store position -> group number, -1 = base
+        self.node_group[store.positions([n['id'] for n in nodes])] = [code.get(n['type'], -1) for n in nodes]
+        self.base_nodes = [n for n in nodes if n['type'] not in code]
+        self.members = {g: [n for n in nodes if n['type'] == g] for g in self.groups}
+        positions = edges.positions
+        src_group, dst_group = self.node_group[store.src[positions]], self.node_group[store.dst[positions]]
+        owner = np.where(src_group >= 0, src_group, dst_group)
+        self.base_edges = store.edge_list(positions[owner < 0])
+        self.owned = {g: positions[owner == i] for i, g in enumerate(self.groups)} # Base order
+        self.bundles = {g: self._bundle(i, self.owned[g]) for i, g in enumerate(self.groups)}
+
+    def _display(self, node_positions, keep_group=-1):
+        """Display codes: grouped nodes become n_nodes + group number (except members of `keep_group`), others stay."""
+        groups = self.node_group[node_positions]
+        grouped = (groups >= 0) & (groups != keep_group)
+        return np.where(grouped, len(self.store.node_ids) + groups, node_positions).astype(np.int64)
+
+    def _display_id(self, code):
+        n_nodes = len(self.store.node_ids)
+        return self.store.node_ids[code] if code < n_nodes else group_id(self.groups[code - n_nodes])
+
+    def _bundle(self, group_number, positions):
+        """(source code, target code, first edge position, count) arrays: the group's edges merged by display endpoints and type."""
+        store = self.store
+        keys = np.stack([self._display(store.src[positions]), self._display(store.dst[positions]), store.edge_type[positions].astype(np.int64)], axis=1)
+        if not len(keys): return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        unique, first, counts = np.unique(keys, axis=0, return_index=True, return_counts=True)
+        return unique[:, :2], positions[first], counts
+
+    def group_of(self, node_id):
+        pos = self.store.position_of.get(node_id)
+        return self.groups[self.node_group[pos]] if pos is not None and self.node_group[pos] >= 0 else None
+
+    def centroid(self, group, positions):
+        points = [positions[n['id']] for n in self.members[group] if n['id'] in positions]
+        if not points: return None
+        return {'x': float(np.mean([p['x'] for p in points])), 'y': float(np.mean([p['y'] for p in points]))}
+
+    def centroids(self, positions):
+        """Super-node id -> position (mean of its members) for a layout's node positions."""
+        return {group_id(g): c for g in self.groups for c in [self.centroid(g, positions)] if c}
+
+    def base_elements(self, element_cache, positions=None):
+        return element_cache.elements(self.base_nodes, self.base_edges, positions)
+
+    def block(self, group, expanded, element_cache, positions=None):
+        """
+        Elements of one group in either state: the super-node, its bundled edges (shown collapsed), its members
+        and their edges (shown expanded). Only classes and the members' parent (set while expanded; a compound
+        parent would ignore preset positions) depend on `expanded`. Members and their edges get ids of their own
+        (member_id), because Cytoscape removes a compound node together with its children; a member's node
+        id stays in data['node_id'].
+        """
+        store, positions = self.store, positions or {}
+        ends, first, counts = self.bundles[group]
+        bundle_class = HIDDEN_CLASS if expanded else ''
+        elements = [group_node_element(group, len(self.members[group]), len(ends), self.centroid(group, positions), expanded)]
+        edge_types, labels = store.edge_type[first].tolist(), store.label[first].tolist()
+        for i, ((source, target), edge_type, label, count) in enumerate(zip(ends.tolist(), edge_types, labels, counts.tolist())):
+            element = bundled_edge_element(f"bundle:{group}:{i}", self._display_id(source), self._display_id(target), store.edge_type_names[edge_type], store.label_names[label], count)
+            elements.append(with_class(element, bundle_class))
+        parent = group_id(group)
+        for node in self.members[group]:
+            element = element_cache.node(node)
+            data = {**element['data'], 'id': member_id(group, node['id']), 'node_id': node['id'], 'parent': parent if expanded else None}
+            element = with_class({**element, 'data': data}, MEMBER_CLASS)
+            if node['id'] in positions: element['position'] = positions[node['id']]
+            elements.append(element)
+        owned = self.owned[group]
+        number = self.groups.index(group)
+        sources, targets = self._display(store.src[owned], number), self._display(store.dst[owned], number) # Other groups: their super-node
+        for pos, source, target in zip(owned.tolist(), sources.tolist(), targets.tolist()):
+            element = element_cache.edge(pos)
+            data = {**element['data'], 'id': member_id(group, edge_id(pos)), 'source': self._block_id(source, group), 'target': self._block_id(target, group)}
+            elements.append({**element, 'data': data})
+        return elements
+
+    def _block_id(self, code, group):
+        """Element id of a display code inside `group`'s block: its members are namespaced, other nodes keep their id."""
+        element_id = self._display_id(code)
+        return member_id(group, element_id) if code < len(self.store.node_ids) and self.node_group[code] == self.groups.index(group) else element_id
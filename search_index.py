@@ -0,0 +1,107 @@
+import re
+import bisect
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# FULL-TEXT NODE SEARCH (inverted index built once at load time)
+# ------------------------------------------------------------------------------
+TOKEN_PATTERN = re.compile(r'\w+')
+# Indexed fields and their weights; other details (linked event titles / actor names, dates, type codes)
+# would make every neighbor of a matching node match too, so they are not searched
+FIELD_WEIGHTS = {'label': 3.0, 'aliases': 2.0, 'summary': 1.0, 'description': 1.0, 'role': 1.0, 'involvement': 1.0, 'location': 1.0}
+EXACT_MATCH_BONUS = 2.0 # A whole-token match counts double compared to a prefix match
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _field_texts(node, fields=FIELD_WEIGHTS):
+    """(field, text) pairs for a node: its label plus the string / list-of-strings details named in `fields`."""
+    yield 'label', node['label']
+    for field, value in node.get('details_dict', {}).items():
+        if field not in fields: continue
+        if isinstance(value, str): yield field, value
+        elif isinstance(value, (list, tuple)): yield field, ' '.join(str(v) for v in value)
+
+
+class SearchIndex:
+    """
+    Token -> (node, field) postings stored CSR-style over a sorted vocabulary, so a prefix query
+    is one bisect plus one contiguous slice. Queries are whitespace-separated terms, all required
+    (AND), each matched as a token prefix; `field:term` restricts a term to one field
+    (e.g. `location:sevastopol`). Results are ranked by field weight and exact-vs-prefix match.
+    """
+
+    def __init__(self, nodes):
+        """`nodes`: node dicts with their 'details_dict', iterated once (may be a generator, e.g. GraphStore.iter_nodes())."""
+        self.node_ids = []
+        tokens, positions, fields = [], [], []
+        field_codes = {}
+        for pos, node in enumerate(nodes):
+            self.node_ids.append(node['id'])
+            for field, text in _field_texts(node):
+                field_code = field_codes.setdefault(field, len(field_codes))
+                for token in set(tokenize(text)):
+                    tokens.append(token); positions.append(pos); fields.append(field_code)
+        self.fields = list(field_codes)
+        self.field_weights = np.array([FIELD_WEIGHTS[f] for f in self.fields] or [1.0])
+        self.score_levels = np.unique(np.r_[self.field_weights, self.field_weights * EXACT_MATCH_BONUS]) # Every possible term score
+
+        codes, vocab = pd.factorize(pd.Series(tokens, dtype=object), sort=True)
+        order = np.lexsort((np.asarray(positions, dtype=np.int64), codes))
+        self.vocab = list(vocab)
+        self.post_positions = np.asarray(positions, dtype=np.int32)[order]
+        self.post_fields = np.asarray(fields, dtype=np.int16)[order]
+        self.offsets = np.searchsorted(codes[order], np.arange(len(self.vocab) + 1))
+
+    def _parse(self, query):
+        """List of (token, field code or None) terms; unknown `field:` prefixes are searched as plain text."""
+        terms = []
+        for part in query.split():
+            field, sep, value = part.partition(':')
+            field_code = self.fields.index(field.lower()) if sep and field.lower() in self.fields else None
+            text = value if field_code is not None else part
+            terms.extend((token, field_code) for token in tokenize(text))
+        return terms
+
+    def _term_scores(self, token, field_code):
+        """(unique node positions, best score per position) for one prefix term."""
+        lo = bisect.bisect_left(self.vocab, token)
+        hi = bisect.bisect_left(self.vocab, token + '\U0010ffff', lo)
+        start, stop = self.offsets[lo], self.offsets[hi]
+        positions, fields = self.post_positions[start:stop], self.post_fields[start:stop]
+        scores = self.field_weights[fields]
+        if lo < len(self.vocab) and self.vocab[lo] == token: scores[:self.offsets[lo + 1] - start] *= EXACT_MATCH_BONUS
+        if field_code is not None:
+            keep = fields == field_code
+            positions, scores = positions[keep], scores[keep]
+        if not len(positions): return positions, scores
+        if len(positions) > len(self.node_ids) // 8: # Broad prefix: one dense pass instead of sorting the postings
+            dense = np.zeros(len(self.node_ids), dtype=scores.dtype)
+            for level in self.score_levels: dense[positions[scores == level]] = level # Ascending, so the best score wins
+            positions = np.flatnonzero(dense).astype(np.int32)
+            return positions, dense[positions]
+        order = np.argsort(positions, kind='stable')
+        positions, scores = positions[order], scores[order]
+        starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        return positions[starts], np.maximum.reduceat(scores, starts)
+
+    def search(self, query, limit=None):
+        """Node ids matching every term of `query`, best first (ties keep base order)."""
+        terms = self._parse(query or '')
+        if not terms: return []
+        positions, scores = None, None
+        for token, field_code in terms:
+            term_positions, term_scores = self._term_scores(token, field_code)
+            if positions is None:
+                positions, scores = term_positions, term_scores
+            else:
+                # Both position arrays are sorted: binary-search one in the other instead of a merge sort
+                right = np.minimum(np.searchsorted(term_positions, positions), max(len(term_positions) - 1, 0))
+                found = term_positions[right] == positions if len(term_positions) else np.zeros(len(positions), dtype=bool)
+                positions, scores = positions[found], scores[found] + term_scores[right[found]]
+            if not len(positions): return []
+        ranked = positions[np.lexsort((positions, -scores))][:limit]
+        return [self.node_ids[pos] for pos in ranked]
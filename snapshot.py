@@ -0,0 +1,268 @@
+"""
+Prepared-graph snapshot: the dataset is loaded, resolved and built into the graph store once, then
+written to disk. App workers load the snapshot instead of redoing the data prep. Only the large numeric
+arrays (edge columns, CSR adjacency, search postings, causal reachability) are memory-mapped read-only and
+shared by the gunicorn workers through the page cache; the rest (node dicts, data frames, id lists and other
+Python objects) is unpickled into each worker's own memory. The build step prints both sizes.
+
+The build step also computes every dropdown layout into the layout cache, so no page request waits
+for a force layout (gunicorn kills workers that stay silent past its timeout).
+
+    python snapshot.py            # build (or refresh) the snapshot and layouts for CONFLICT_DATASET
+    python snapshot.py --force    # rebuild even if an up-to-date snapshot exists
+
+With GRAPH_SNAPSHOT=0 nothing is written (workers prepare the data themselves); layouts are still computed.
+"""
+import os
+import sys
+import json
+import glob
+import pickle
+import shutil
+import hashlib
+import argparse
+import time
+import numpy as np
+from data_loader import load_dataset, parse_dates, resolve_dataset_path
+from entity_resolution import resolve_entities, print_resolution_report, ENTITY_MERGE_THRESHOLD, ENTITY_MATCH_THRESHOLD
+from graph_builder import build_graph, NODE_TYPES, ACTOR_NODE_TYPES
+from search_index import SearchIndex
+from causal_analysis import CausalAnalysis
+from layout_engine import LayoutEngine, LAYOUT_CACHE_DIR
+from graph_metrics import GraphMetrics, BETWEENNESS_EXACT_MAX_NODES, BETWEENNESS_SAMPLES, LOUVAIN_MAX_NODES
+
+# ------------------------------------------------------------------------------
+# SETTINGS
+# ------------------------------------------------------------------------------
+SNAPSHOT_DIR = os.environ.get('GRAPH_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'snapshot'))
+SNAPSHOT_ENABLED = os.environ.get('GRAPH_SNAPSHOT', '1') != '0'
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_KEEP = int(os.environ.get('GRAPH_SNAPSHOT_KEEP', 3)) # Most recent snapshots kept (the current one included)
+SNAPSHOT_MIN_AGE = 3600 # Seconds; older snapshots are only removed once no worker can still be starting from them
+MMAP_MIN_ELEMENTS = 4096 # Smaller arrays stay inside the pickle
+# Modules whose code shapes the prepared data; editing any of them invalidates the snapshot
+SOURCE_MODULES = ['data_loader.py', 'entity_resolution.py', 'graph_builder.py', 'graph_store.py', 'search_index.py', 'causal_analysis.py', 'graph_metrics.py', 'snapshot.py']
+METRIC_GRAPHS = ['faro', 'actor'] # Graphs with centrality/community metrics
+# Dropdown layouts per graph, default first; all of them are computed by the build step
+GRAPH_LAYOUTS = {
+    'faro': ['cose', 'grid', 'circle', 'breadthfirst', 'dagre'],
+    'actor': ['cose', 'grid', 'circle', 'concentric'],
+    'causal': ['dagre', 'cose', 'breadthfirst', 'grid', 'circle'],
+}
+ROOTED_GRAPHS = ['faro', 'causal'] # breadthfirst starts from the root event
+
+
+# ------------------------------------------------------------------------------
+# DATA PREPARATION (everything the app derives from the dataset before building views)
+# ------------------------------------------------------------------------------
+def app_graphs(graph_base):
+    """(nodes, edges) of every graph the app shows: FARO (all nodes), actor co-participation and causal."""
+    actor_nodes = [n for n in graph_base['all_nodes_base'] if n['type'] in ACTOR_NODE_TYPES]
+    return {'faro': (graph_base['all_nodes_base'], graph_base['all_edges_base']), 'actor': (actor_nodes, graph_base['shared_event_edges']),
+            'causal': (graph_base['event_nodes'], graph_base['causal_edges'])}
+
+
+def compute_metrics(graph_base, debug=False):
+    """Network metrics of the FARO and actor graphs: element data fields for the stylesheets and per-node values of the actor graph."""
+    metrics = GraphMetrics(debug=debug)
+    graphs = app_graphs(graph_base)
+    for name in METRIC_GRAPHS: metrics.register(name, *graphs[name])
+    return {'element_data': metrics.element_data(), 'actor': metrics.node_metrics('actor')}
+
+
+def root_event(prepared):
+    """Root for breadthfirst layouts: the dataset's root_event, else the earliest event."""
+    return prepared['metadata']['root_event'] or prepared['events']['title'].iloc[0]
+
+
+def register_layouts(layout_engine, prepared):
+    """Registers the app's graphs with the layout engine (same parameters, hence cache keys, in the app and the build step)."""
+    params = {'breadthfirst': {'roots': [root_event(prepared)]}}
+    for graph_name, (nodes, edges) in app_graphs(prepared['graph']).items():
+        layout_engine.register(graph_name, nodes, edges, layout_params=params if graph_name in ROOTED_GRAPHS else None)
+    return layout_engine
+
+
+def warm_layouts(prepared, debug=False):
+    """Computes every dropdown layout of every graph into the layout disk cache; cached ones are only read back."""
+    layout_engine = register_layouts(LayoutEngine(debug=debug), prepared)
+    for graph_name, layout_names in GRAPH_LAYOUTS.items():
+        for layout_name in layout_names: layout_engine.positions(graph_name, layout_name)
+
+
+def prepare_data(dataset_path=None, actor_edge_min_weight=1, debug=False):
+    """Loads the dataset, parses dates, resolves entities and builds the graph store, search index, causal index and metrics."""
+    dataset = load_dataset(dataset_path, debug=debug)
+    dataset_meta = dataset['metadata']
+    events_df = dataset['events']
+    parsed_dates = parse_dates(events_df['date'], default=dataset_meta['fallback_date']) # Bulk parse; keeps range end dates
+    events_df[['date_parsed', 'date_end']] = parsed_dates.fillna(parsed_dates['date_parsed'].min())
+    events_df = events_df.sort_values('date_parsed').reset_index(drop=True)
+
+    # Entity resolution: merge alias actors (USA / United States) and map name variants in event actor lists to nodes
+    resolved = resolve_entities(events_df, dataset['actors'], dataset['individuals'], aliases=dataset_meta['entity_aliases'])
+    graph_base = build_graph(resolved['events'], resolved['actors'], resolved['individuals'], dataset['causal_links'], NODE_TYPES, actor_edge_min_weight=actor_edge_min_weight)
+    return {
+        'metadata': dataset_meta, 'events': resolved['events'], 'actors': resolved['actors'], 'individuals': resolved['individuals'],
+        'causal_links': dataset['causal_links'], 'resolution_report': resolved['report'],
+        'graph': graph_base, 'search_index': SearchIndex(graph_base['store'].iter_nodes()),
+        'causal': CausalAnalysis(graph_base['store'], graph_base['causal_edges'].positions, [n['id'] for n in graph_base['event_nodes']]),
+        'metrics': compute_metrics(graph_base, debug), # Betweenness etc. take minutes on large graphs: done here, not in every worker
+    }
+
+
+# ------------------------------------------------------------------------------
+# SNAPSHOT FILES
+# ------------------------------------------------------------------------------
+def snapshot_key(dataset_path=None, actor_edge_min_weight=1):
+    """Hash of the dataset files (name, size, mtime), the build settings and the prep code."""
+    dataset_path = resolve_dataset_path(dataset_path)
+    digest = hashlib.sha1()
+    settings = {'format': SNAPSHOT_FORMAT, 'actor_edge_min_weight': actor_edge_min_weight, 'node_types': NODE_TYPES,
+                'merge_threshold': ENTITY_MERGE_THRESHOLD, 'match_threshold': ENTITY_MATCH_THRESHOLD, 'dataset': os.path.abspath(dataset_path),
+                'metrics': [BETWEENNESS_EXACT_MAX_NODES, BETWEENNESS_SAMPLES, LOUVAIN_MAX_NODES]}
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for path in sorted(glob.glob(os.path.join(dataset_path, '*'))):
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}\x00{stat.st_size}\x00{stat.st_mtime_ns}\x01".encode('utf-8'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in SOURCE_MODULES:
+        with open(os.path.join(here, module), 'rb') as f: digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _mappable_arrays(prepared):
+    """ids of the large numeric arrays held by the graph store, its edge details getters, the search index and the causal index."""
+    store, search_index = prepared['graph']['store'], prepared['search_index']
+    owners = [store, search_index, prepared['causal'], *(details for _, _, details in store._batches)]
+    return {id(value) for owner in owners for value in vars(owner).values()
+            if type(value) is np.ndarray and value.dtype.kind in 'biuf' and value.size >= MMAP_MIN_ELEMENTS}
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Writes the selected arrays as .npy files next to the pickle instead of into it."""
+
+    def __init__(self, file, array_dir, array_ids):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir, self.array_ids, self.array_files = array_dir, array_ids, []
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or id(obj) not in self.array_ids: return None
+        name = f"array_{len(self.array_files)}.npy"
+        np.save(os.path.join(self.array_dir, name), obj)
+        self.array_files.append(name)
+        return name
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Memory-maps the .npy arrays read-only (shared page cache across workers); everything else is a private copy."""
+
+    def __init__(self, file, array_dir):
+        super().__init__(file)
+        self.array_dir = array_dir
+
+    def persistent_load(self, name):
+        return np.load(os.path.join(self.array_dir, name), mmap_mode='r')
+
+
+def write_snapshot(prepared, key, snapshot_dir=SNAPSHOT_DIR, debug=False):
+    """Writes prepared data under snapshot_dir/<key>; built in a temp dir and renamed, so readers never see a partial snapshot."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    target = os.path.join(snapshot_dir, key)
+    tmp_dir = os.path.join(snapshot_dir, f".{key}.{os.getpid()}.tmp")
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        with open(os.path.join(tmp_dir, 'prepared.pkl'), 'wb') as f:
+            pickler = _SnapshotPickler(f, tmp_dir, _mappable_arrays(prepared))
+            pickler.dump(prepared)
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'format': SNAPSHOT_FORMAT, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'arrays': pickler.array_files,
+                       'mapped_bytes': sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in pickler.array_files),
+                       'pickled_bytes': os.path.getsize(os.path.join(tmp_dir, 'prepared.pkl'))}, f, indent=2)
+        os.rename(tmp_dir, target)
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(target): print(f"Warning: Could not write graph snapshot: {e}") # Else another worker won the race
+        return None
+    prune_snapshots(snapshot_dir, key)
+    if debug: print(f"Graph snapshot written: {target}")
+    return target
+
+
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR, current=None, keep=SNAPSHOT_KEEP, min_age=SNAPSHOT_MIN_AGE):
+    """
+    Removes snapshots beyond the `keep` most recent (never `current`) and leftover temp dirs, but only once they
+    are older than `min_age` seconds: other deployments may share the directory, and a worker that started from an
+    older snapshot still opens its files. Workers already mapping a removed snapshot keep their open files.
+    """
+    now = time.time()
+    entries = [(os.path.getmtime(path), path) for path in glob.glob(os.path.join(snapshot_dir, '*')) + glob.glob(os.path.join(snapshot_dir, '.*.tmp'))
+               if os.path.isdir(path)]
+    snapshots = sorted((entry for entry in entries if not os.path.basename(entry[1]).startswith('.')), reverse=True)
+    kept = {path for _, path in snapshots[:keep]}
+    if current: kept.add(os.path.join(snapshot_dir, current))
+    for mtime, path in entries:
+        if path not in kept and now - mtime > min_age: shutil.rmtree(path, ignore_errors=True)
+
+
+def read_snapshot(key, snapshot_dir=SNAPSHOT_DIR):
+    """Prepared data from snapshot_dir/<key>, or None if there is no (readable) snapshot for this key."""
+    path = os.path.join(snapshot_dir, key)
+    if not os.path.isfile(os.path.join(path, 'prepared.pkl')): return None
+    try:
+        with open(os.path.join(path, 'prepared.pkl'), 'rb') as f: return _SnapshotUnpickler(f, path).load()
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError) as e:
+        print(f"Warning: Ignoring unreadable graph snapshot {path}: {e}")
+        return None
+
+
+def load_prepared(dataset_path=None, actor_edge_min_weight=1, snapshot_dir=SNAPSHOT_DIR, debug=False):
+    """Prepared data from an up-to-date snapshot, else prepared now (and snapshotted for the next worker)."""
+    if not SNAPSHOT_ENABLED: return prepare_data(dataset_path, actor_edge_min_weight, debug)
+    key = snapshot_key(dataset_path, actor_edge_min_weight)
+    prepared = read_snapshot(key, snapshot_dir)
+    if prepared is not None:
+        if debug: print(f"Loaded graph snapshot {key} from {snapshot_dir}")
+        return prepared
+    prepared = prepare_data(dataset_path, actor_edge_min_weight, debug)
+    write_snapshot(prepared, key, snapshot_dir, debug)
+    return prepared
+
+
+# ------------------------------------------------------------------------------
+# BUILD STEP
+# ------------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', default=None, help="Dataset directory (default: CONFLICT_DATASET or data/crimea_2014)")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the snapshot is up to date")
+    args = parser.parse_args()
+
+    actor_edge_min_weight = int(os.environ.get('ACTOR_EDGE_MIN_WEIGHT', 1))
+    key = snapshot_key(args.dataset, actor_edge_min_weight)
+    prepared = None if args.force or not SNAPSHOT_ENABLED else read_snapshot(key)
+    if not SNAPSHOT_ENABLED:
+        print("Graph snapshot disabled (GRAPH_SNAPSHOT=0), workers prepare the data themselves")
+        prepared = prepare_data(args.dataset, actor_edge_min_weight)
+    elif prepared is not None:
+        print(f"Graph snapshot {key} is up to date")
+    else:
+        start = time.perf_counter()
+        prepared = prepare_data(args.dataset, actor_edge_min_weight)
+        print_resolution_report(prepared['resolution_report'])
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, key), ignore_errors=True)
+        path = write_snapshot(prepared, key)
+        if path is None: return 1
+        store = prepared['graph']['store']
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f: manifest = json.load(f)
+        print(f"Graph snapshot {key}: {len(store.node_ids)} nodes, {len(store.src)} edges, built in {time.perf_counter() - start:.1f}s -> {path}")
+        print(f"  {manifest['mapped_bytes'] / 2**20:.1f} MB memory-mapped (shared by the workers), {manifest['pickled_bytes'] / 2**20:.1f} MB pickled (one copy per worker)")
+    start = time.perf_counter()
+    warm_layouts(prepared) # Layout cache keys follow the graph, so an up-to-date snapshot may still lack layouts
+    print(f"Layouts ready in {time.perf_counter() - start:.1f}s -> {LAYOUT_CACHE_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
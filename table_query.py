@@ -0,0 +1,132 @@
+import re
+import math
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# DATATABLE FILTER QUERIES (the filter_query string dash sends with filter_action='custom')
+# ------------------------------------------------------------------------------
+# e.g. `{Name} icontains putin && {Type} s= Country`; an 'i'/'s' prefix makes an operator case-insensitive/-sensitive.
+# Values may be typed as `num(2)` (compared as a number, in any column) or `str(2)` (compared as text).
+FILTER_PART = re.compile(r'^\{(?P<column>[^}]+)\}\s+(?P<case>[is]?)(?P<op>contains|datestartswith|eq|ne|lt|le|gt|ge|!=|<=|>=|=|<|>)\s+(?P<value>.+)$', re.S)
+TYPED_VALUE = re.compile(r'^(?P<type>num|str)\((?P<value>.*)\)$', re.S)
+OPERATOR_ALIASES = {'=': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge'}
+COMPARISONS = {'eq': np.equal, 'ne': np.not_equal, 'lt': np.less, 'le': np.less_equal, 'gt': np.greater, 'ge': np.greater_equal}
+MASK_CACHE_SIZE = 32
+
+
+def _unquote(value):
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`': return value[1:-1].replace('\\' + value[0], value[0])
+    return value
+
+
+def parse_filter_query(filter_query):
+    """
+    List of (column, operator, value, case_insensitive) terms; value is a float for `num(...)`, else a string.
+    Parts in a syntax we don't handle (and `num()` values that are not numbers) are skipped.
+    """
+    terms = []
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_PART.match(part.strip())
+        if not match:
+            if part.strip(): print(f"Warning: Ignoring unsupported table filter '{part.strip()}'")
+            continue
+        typed = TYPED_VALUE.match(match['value'].strip()) # Before unquoting: "num(2)" in quotes is text
+        value = _unquote(typed['value'].strip() if typed else match['value'].strip())
+        if typed and typed['type'] == 'num':
+            try: value = float(value)
+            except ValueError:
+                print(f"Warning: Ignoring table filter with a non-numeric value '{part.strip()}'")
+                continue
+        terms.append((match['column'], OPERATOR_ALIASES.get(match['op'], match['op']), value, match['case'] == 'i'))
+    return terms
+
+
+# ------------------------------------------------------------------------------
+# SERVER-SIDE TABLE PAGES (page_action / sort_action / filter_action = 'custom')
+# ------------------------------------------------------------------------------
+class TableQuery:
+    """
+    Rows of a DataTable kept on the server; callbacks send only the requested page. A dense rank per
+    column (its sort key) and each column's sorted row orders are computed once, so an unfiltered
+    single-column sort is a slice of that order and any other sort is one lexsort over the matching
+    rows. Filter masks are kept for the last MASK_CACHE_SIZE filter queries, so paging is O(page).
+    """
+
+    def __init__(self, df, sort_keys=None):
+        self.df = df.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        sort_keys = sort_keys or {} # column -> values to sort by instead of the displayed ones (e.g. parsed dates)
+        self.order, self.rank = {}, {}
+        for column in self.columns:
+            codes, uniques = pd.factorize(pd.Series(np.asarray(sort_keys.get(column, self.df[column]))), sort=True)
+            # Dense ranks per direction, equal values tie; missing values sort last both ways
+            self.rank[column] = {'asc': np.where(codes < 0, len(uniques), codes).astype(np.int32),
+                                 'desc': np.where(codes < 0, len(uniques), len(uniques) - 1 - codes).astype(np.int32)}
+            self.order[column] = {direction: np.argsort(rank, kind='stable') for direction, rank in self.rank[column].items()} # Ties keep row order
+        self._text = {} # (column, case_insensitive) -> display text, built on first filter
+        self._numbers = {} # column -> float values (NaN where not a number), built on first numeric filter
+        self._masks = OrderedDict()
+
+    def __len__(self):
+        return len(self.df)
+
+    def _column_text(self, column, case_insensitive):
+        key = (column, case_insensitive)
+        if key not in self._text:
+            text = self.df[column].fillna('').astype(str)
+            self._text[key] = text.str.lower() if case_insensitive else text
+        return self._text[key]
+
+    def _column_numbers(self, column):
+        if column not in self._numbers: self._numbers[column] = pd.to_numeric(self.df[column], errors='coerce').to_numpy(dtype=float)
+        return self._numbers[column]
+
+    def _term_mask(self, column, op, value, case_insensitive):
+        if column not in self.columns: return np.ones(len(self.df), dtype=bool)
+        if op in COMPARISONS and not isinstance(value, float) and pd.api.types.is_numeric_dtype(self.df[column]):
+            try: value = float(value) # Plain number typed into a numeric column
+            except ValueError: pass
+        if isinstance(value, float):
+            if op in COMPARISONS: return COMPARISONS[op](self._column_numbers(column), value)
+            value = f"{value:g}" # contains / datestartswith match the text
+        text = self._column_text(column, case_insensitive)
+        value = value.lower() if case_insensitive else value
+        if op == 'contains': return text.str.contains(value, regex=False).to_numpy()
+        if op == 'datestartswith': return text.str.startswith(value).to_numpy()
+        return COMPARISONS[op](text.to_numpy(dtype=object), value).astype(bool)
+
+    def filter_mask(self, filter_query):
+        """Boolean row mask for a filter_query (None if it filters nothing); memoized per query string."""
+        terms = parse_filter_query(filter_query)
+        if not terms: return None
+        if filter_query in self._masks:
+            self._masks.move_to_end(filter_query)
+            return self._masks[filter_query]
+        mask = np.ones(len(self.df), dtype=bool)
+        for term in terms: mask &= self._term_mask(*term)
+        self._masks[filter_query] = mask
+        if len(self._masks) > MASK_CACHE_SIZE: self._masks.popitem(last=False)
+        return mask
+
+    def _sorted(self, rows, sort_by):
+        """rows (None = all rows) ordered by a DataTable sort_by list [{'column_id', 'direction'}, ...]."""
+        if not sort_by: return np.arange(len(self.df)) if rows is None else rows
+        if rows is None and len(sort_by) == 1:
+            return self.order[sort_by[0]['column_id']]['desc' if sort_by[0]['direction'] == 'desc' else 'asc']
+        rows = np.arange(len(self.df)) if rows is None else rows
+        keys = [self.rank[s['column_id']]['desc' if s['direction'] == 'desc' else 'asc'][rows] for s in reversed(sort_by)] # Last key is primary
+        return rows[np.lexsort(keys)]
+
+    def page(self, page_current=0, page_size=15, sort_by=None, filter_query='', mask=None):
+        """(page records, page count, matching row count, page index) for a DataTable request; `mask` pre-filters rows."""
+        match = self.filter_mask(filter_query)
+        if mask is not None: match = mask if match is None else match & mask
+        rows = None if match is None else np.flatnonzero(match)
+        total = len(self.df) if rows is None else len(rows)
+        page_count = max(1, math.ceil(total / page_size))
+        page_current = min(max(page_current or 0, 0), page_count - 1)
+        rows = self._sorted(rows, [s for s in sort_by or [] if s.get('column_id') in self.rank])
+        page_rows = rows[page_current * page_size:(page_current + 1) * page_size]
+        return self.df.iloc[page_rows].to_dict('records'), page_count, total, page_current
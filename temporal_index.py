@@ -0,0 +1,68 @@
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# TEMPORAL GRAPH INDEX (the graph "as of" a date is a prefix of its elements sorted by activation day)
+# ------------------------------------------------------------------------------
+NEVER = np.iinfo(np.int64).max # Activation of nodes no event touches: never shown in time mode
+TIME_PATCH_MAX_DELETES = 200 # Stepping back by more elements than this resends the prefix instead of deleting one by one
+
+
+class TemporalIndex:
+    """
+    Activation day of every node and edge of a graph: an event at its date, any other node at the date
+    of its first event neighbor, an edge once both endpoints are active. Elements are ordered by activation
+    (nodes before edges on the same day), so the graph as of day T is the first count_at(T) elements and
+    moving T only adds or drops a contiguous run at the end of the list.
+    The element order matches ElementCache.elements(nodes, edges): nodes in order, then edges in order.
+    """
+
+    def __init__(self, store, nodes, edges, event_ids, event_dates):
+        node_pos = store.positions([n['id'] for n in nodes])
+        day = np.full(len(store.node_ids), NEVER, dtype=np.int64)
+        event_pos = store.positions(list(event_ids))
+        event_days = np.asarray(event_dates, dtype='datetime64[D]').astype(np.int64)
+        day[event_pos[event_pos >= 0]] = event_days[event_pos >= 0]
+        is_event = np.zeros(len(store.node_ids), dtype=bool)
+        is_event[event_pos[event_pos >= 0]] = True
+        src, dst = store.src[edges.positions].astype(np.int64), store.dst[edges.positions].astype(np.int64)
+        for a, b in ((src, dst), (dst, src)): # Other nodes start with their first event
+            touch = is_event[a] & ~is_event[b]
+            np.minimum.at(day, b[touch], day[a[touch]])
+        member = np.zeros(len(store.node_ids), dtype=bool)
+        member[node_pos] = True
+        keep = member[src] & member[dst]
+        activation = np.concatenate([day[node_pos], np.maximum(day[src[keep]], day[dst[keep]])])
+        order = np.argsort(activation, kind='stable') # Stable: nodes (listed first) precede edges of the same day
+        self.order = order[activation[order] != NEVER]
+        self.days = activation[self.order] # Sorted activation day per position in time order
+        self.steps = np.unique(self.days) # Slider stops: days on which something appears
+
+    def __len__(self):
+        return len(self.order)
+
+    def count_at(self, day):
+        """Number of elements active on `day` (a prefix length of the time-ordered list)."""
+        return int(np.searchsorted(self.days, day, side='right'))
+
+    def step_count(self, step):
+        """Prefix length at slider stop `step` (index into `steps`)."""
+        if not len(self.steps): return 0
+        return self.count_at(self.steps[min(max(int(step), 0), len(self.steps) - 1)])
+
+    def step_date(self, step):
+        return np.datetime64(int(self.steps[min(max(int(step), 0), len(self.steps) - 1)]), 'D') if len(self.steps) else None
+
+    def frames(self, days, stride_days=1):
+        """
+        Playback frames as indexes into `days` (slider stops, sorted): at most one per `stride_days` plus the
+        last stop, keeping only stops where this graph gains elements - so no frame is empty.
+        """
+        if not len(days): return np.zeros(0, dtype=np.int64)
+        grid = np.arange(days[0], days[-1] + stride_days, stride_days)
+        stops = np.unique(np.r_[np.clip(np.searchsorted(days, grid, side='right') - 1, 0, len(days) - 1), len(days) - 1])
+        counts = np.searchsorted(self.days, np.asarray(days)[stops], side='right')
+        return stops[np.r_[counts[0] > 0, np.diff(counts) > 0]]
+
+    def time_ordered(self, elements):
+        """Reorders a full-graph element list (ElementCache order) into activation order, dropping never-active elements."""
+        return [elements[i] for i in self.order.tolist()]
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Flat top-level modules
+
+from graph_store import GraphStore, ConstantDetails
+
+
+def make_store(node_types, edges):
+    """Frozen GraphStore: node_types is {id: type}, edges a list of (source, target, edge type)."""
+    store = GraphStore([{'id': i, 'label': i, 'type': t, 'details_dict': {}} for i, t in node_types.items()])
+    by_type = {}
+    for s, t, k in edges: by_type.setdefault(k, []).append((s, t))
+    positions = {}
+    for k, pairs in by_type.items():
+        sources, targets = (np.array([p[i] for p in pairs], dtype=object) for i in (0, 1))
+        positions[k] = store.add_edges(k, sources, targets, np.full(len(pairs), k, dtype=object), ConstantDetails({}))
+    store.freeze()
+    return store, positions
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
@@ -0,0 +1,81 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import causal_analysis
+from causal_analysis import CausalAnalysis
+from conftest import make_store
+
+
+def build(n_events, links):
+    ids = [f"E{i}" for i in range(n_events)]
+    store, positions = make_store({i: 'Event' for i in ids}, [(ids[s], ids[t], 'causal') for s, t in links])
+    return CausalAnalysis(store, positions.get('causal', np.zeros(0, dtype=np.int32)), ids), ids
+
+
+def check_against_networkx(index, ids, links):
+    G = nx.DiGraph()
+    G.add_nodes_from(ids)
+    G.add_edges_from((ids[s], ids[t]) for s, t in links)
+    order = {e: i for i, e in enumerate(ids)}
+    for e in ids:
+        down = sorted(nx.descendants(G, e) - {e}, key=order.get)
+        up = sorted(nx.ancestors(G, e) - {e}, key=order.get)
+        assert index.descendants(e) == down
+        assert index.ancestors(e) == up
+        assert index.downstream_count(e) == len(down)
+    for s in ids[:8]:
+        for t in ids[:8]:
+            assert index.reaches(s, t) == (s != t and nx.has_path(G, s, t))
+            for path in index.paths(s, t):
+                assert path[0] == s and path[-1] == t and len(set(path)) == len(path)
+                assert all(G.has_edge(a, b) for a, b in zip(path, path[1:]))
+    topo = index.topological_order()
+    assert sorted(topo) == sorted(ids)
+    position = {e: i for i, e in enumerate(topo)}
+    condensed = nx.condensation(G)
+    scc_of = condensed.graph['mapping']
+    assert all(position[a] < position[b] for a, b in G.edges() if scc_of[a] != scc_of[b])
+
+
+@pytest.mark.parametrize('n_events, n_links', [(60, 90), (200, 150), (120, 400)])
+def test_random_cyclic_graphs_match_networkx(rng, n_events, n_links):
+    links = [tuple(map(int, rng.integers(0, n_events, 2))) for _ in range(n_links)]
+    index, ids = build(n_events, links)
+    check_against_networkx(index, ids, links)
+
+
+def test_bfs_fallback_matches_networkx(rng, monkeypatch):
+    monkeypatch.setattr(causal_analysis, 'CAUSAL_REACH_MAX_NODES', 10) # Larger parts use BFS and chunked counts
+    monkeypatch.setattr(causal_analysis, 'CAUSAL_COUNT_CHUNK', 16)
+    links = [tuple(map(int, rng.integers(0, 80, 2))) for _ in range(120)]
+    index, ids = build(80, links)
+    assert not index.block_has_matrix.all()
+    check_against_networkx(index, ids, links)
+
+
+def test_no_causal_links():
+    index, ids = build(50, [])
+    assert index.descendants(ids[0]) == [] and index.ancestors(ids[0]) == []
+    assert index.top_events() == []
+    assert index.summary()['longest_chain'] == 1
+
+
+def test_few_links_among_many_events(rng):
+    links = [tuple(map(int, rng.integers(0, 2000, 2))) for _ in range(20)]
+    index, ids = build(2000, links)
+    check_against_networkx(index, ids[:40] + ids[40:], links)
+
+
+def test_everything_in_one_cycle():
+    n = 30
+    links = [(i, (i + 1) % n) for i in range(n)]
+    index, ids = build(n, links)
+    assert len(index.cycles) == 1
+    assert index.downstream_count(ids[0]) == n - 1
+    check_against_networkx(index, ids, links)
+
+
+def test_no_events():
+    index, _ = build(0, [])
+    assert index.topological_order() == [] and index.longest_chain() == []
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from data_loader import parse_dates
+
+
+@pytest.mark.parametrize('raw, start, end', [
+    ('21 Nov 2013', '2013-11-21', '2013-11-21'),
+    ('18-20 Feb 2014', '2014-02-18', '2014-02-20'),
+    ('22 Apr - 3 May 2014', '2014-04-22', '2014-05-03'),
+    ('28 Dec 2013 - 3 Jan 2014', '2013-12-28', '2014-01-03'),
+    ('28 Dec - 3 Jan 2014', '2013-12-28', '2014-01-03'), # Start year omitted across New Year
+    ('29 Feb - 2 Jan 2017', '2016-02-29', '2017-01-02'), # Not a day of the end's year
+    ('2014-03-01', '2014-03-01', '2014-03-01'),
+])
+def test_parse_dates(raw, start, end):
+    parsed = parse_dates(pd.Series([raw]))
+    assert parsed['date_parsed'].iloc[0] == pd.Timestamp(start)
+    assert parsed['date_end'].iloc[0] == pd.Timestamp(end)
+
+
+def test_unparsed_dates_get_default():
+    parsed = parse_dates(pd.Series(['someday', None, '3 Mar 2014']), default='2014-01-01')
+    assert parsed['date_parsed'].tolist() == [pd.Timestamp('2014-01-01')] * 2 + [pd.Timestamp('2014-03-03')]
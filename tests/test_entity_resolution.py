@@ -0,0 +1,53 @@
+import pandas as pd
+
+from entity_resolution import NameMatcher, fold, merge_aliases
+
+
+def test_fold_keeps_digits():
+    assert fold('A33') != fold('A3')
+    assert fold('Aksyonov') == fold('Aksenov') and fold('Zelenskyy') == fold('Zelensky')
+
+
+def test_numbered_names_do_not_match():
+    matcher = NameMatcher(['A3', 'A33', 'Resolution 2166'])
+    assert matcher.match('A33')[0] == 'A33'
+    assert matcher.match('A333') is None
+    assert matcher.match('Resolution 2167') is None
+    assert matcher.match('Resolutin 2166')[0] == 'Resolution 2166'
+
+
+def test_qualifier_must_be_the_whole_parenthetical():
+    matcher = NameMatcher(['EU', 'G7', 'Sergey Aksyonov', 'Russia (Russian Federation)'])
+    assert matcher.match('European Union (EU) and G7') is None
+    assert matcher.match('Sergey Aksyonov (Crimea PM)')[:2] == ('Sergey Aksyonov', 1.0)
+    assert matcher.match('Russian Federation')[0] == 'Russia (Russian Federation)'
+
+
+def test_merge_aliases_leaves_numbered_rows_apart():
+    df = pd.DataFrame({'name': ['Unit 33', 'Unit 3', 'USA', 'United States'], 'events': [['a'], ['b'], ['c'], ['d', 'e']]})
+    merged, report, renames = merge_aliases(df)
+    assert merged['name'].tolist() == ['Unit 33', 'Unit 3', 'United States']
+    assert renames == {'USA': 'United States'}
+
+
+def test_colliding_ids_are_qualified():
+    from bench_graph_build import make_dataset, node_types
+    from graph_builder import build_graph
+    from entity_resolution import resolve_entities
+    events, actors, individuals, links = make_dataset(50)
+    individuals.loc[0, 'name'] = actors.loc[0, 'name'] # 'Actor 0' is an actor and an individual
+    events.loc[1, 'title'] = events.loc[0, 'title'] # Two events share a title
+    resolved = resolve_entities(events, actors, individuals)
+    assert resolved['individuals'].loc[0, 'name'] == 'Actor 0 (Individual)'
+    assert resolved['events'].loc[1, 'title'] == 'Event 0 (2)'
+    assert {(r['table'], r['alias'], r['canonical']) for r in resolved['report'] if r['action'] == 'renamed'} == {
+        ('individuals', 'Actor 0', 'Actor 0 (Individual)'), ('events', 'Event 0', 'Event 0 (2)')}
+    graph = build_graph(resolved['events'], resolved['actors'], resolved['individuals'], links, node_types)
+    ids = [n['id'] for n in graph['all_nodes_base']]
+    assert len(ids) == len(set(ids))
+    store = graph['store']
+    individual = store.position_of['Actor 0 (Individual)']
+    assert store.node(individual)['type'] == 'Individual'
+    participation = store.edge_type_names.index('participation')
+    linked = {store.node_ids[t] for s, t, k in zip(store.src.tolist(), store.dst.tolist(), store.edge_type.tolist()) if s == individual and k == participation}
+    assert linked == set(resolved['individuals'].loc[0, 'events']) & set(ids) # Its participation edges are kept
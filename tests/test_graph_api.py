@@ -0,0 +1,43 @@
+import flask
+import pandas as pd
+import pytest
+
+from graph_api import LRUCache, BadRequest, _date_param
+
+
+def test_cache_bounded_by_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.put('a', 'xxxx')
+    cache.put('b', 'xxxx')
+    cache.get('a') # 'b' is now least recently used
+    cache.put('c', 'xxxx')
+    assert cache.get('b') is None and cache.get('a') == 'xxxx' and cache.get('c') == 'xxxx'
+    assert cache.nbytes == 8
+    cache.put('a', 'xx') # Replacing a value frees its old size
+    assert cache.nbytes == 6
+    cache.put('big', 'x' * 11) # Larger than the whole budget: not kept, nothing evicted
+    assert cache.get('big') is None and len(cache) == 2
+
+
+def test_cache_bounded_by_entries():
+    cache = LRUCache(max_entries=2)
+    for key in 'abc': cache.put(key, [key])
+    assert cache.get('a') is None and len(cache) == 2
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2014-03-01', pd.Timestamp('2014-03-01')),
+    ('2014-03-01T02:00+02:00', pd.Timestamp('2014-03-01')),
+    ('2014-03-01T00:00Z', pd.Timestamp('2014-03-01')),
+])
+def test_date_param_is_naive(value, expected):
+    with flask.Flask(__name__).test_request_context(query_string={'start': value}):
+        timestamp = _date_param('start')
+    assert timestamp == expected and timestamp.tzinfo is None
+    assert (pd.Series([pd.Timestamp('2014-02-28')]) <= timestamp).all() # Comparable with the naive event dates
+
+
+@pytest.mark.parametrize('value', ['soon', 'NaT', '99999-01-01'])
+def test_bad_date_param(value):
+    with flask.Flask(__name__).test_request_context(query_string={'start': value}):
+        with pytest.raises(BadRequest): _date_param('start')
@@ -0,0 +1,70 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import graph_metrics
+from graph_metrics import GraphMetrics, betweenness_centrality, compute_metrics, CENTRALITY_METRICS
+from conftest import make_store
+
+
+def random_graph(rng, n, m):
+    ids = [f"n{i}" for i in range(n)]
+    pairs = {tuple(sorted(rng.choice(n, 2, replace=False).tolist())) for _ in range(m)}
+    store, positions = make_store({i: 'Country' for i in ids}, [(ids[a], ids[b], 'link') for a, b in sorted(pairs)])
+    nodes = [{'id': i, 'type': 'Country'} for i in ids]
+    return nodes, store.edge_list(positions.get('link', np.zeros(0, dtype=np.int64))), ids
+
+
+@pytest.mark.parametrize('n, m', [(3, 2), (30, 40), (120, 150), (200, 900)])
+def test_betweenness_matches_networkx(rng, n, m):
+    nodes, edges, ids = random_graph(rng, n, m)
+    G = graph_metrics._weighted_graph(nodes, edges)
+    ours = betweenness_centrality(nx.to_scipy_sparse_array(G, nodelist=ids, weight=None, format='csr'))
+    expected = nx.betweenness_centrality(G)
+    np.testing.assert_allclose(ours, [expected[i] for i in ids], atol=1e-9)
+
+
+def test_sampled_betweenness_matches_networkx_sources(rng):
+    nodes, edges, ids = random_graph(rng, 80, 160)
+    G = graph_metrics._weighted_graph(nodes, edges)
+    sources = np.array([0, 5, 17, 42])
+    ours = betweenness_centrality(nx.to_scipy_sparse_array(G, nodelist=ids, weight=None, format='csr'), sources)
+    expected = nx.betweenness_centrality_subset(G, [ids[s] for s in sources], ids, normalized=False)
+    scale = 80 / len(sources) / (79 * 78) * 2 # Subset sums count each pair once; estimate rescales by n / k
+    np.testing.assert_allclose(ours, [expected[i] * scale for i in ids], atol=1e-9)
+
+
+def test_compute_metrics_matches_networkx(rng):
+    nodes, edges, ids = random_graph(rng, 60, 90)
+    G = graph_metrics._weighted_graph(nodes, edges)
+    metrics = compute_metrics(nodes, edges)
+    degree = nx.degree_centrality(G)
+    np.testing.assert_allclose(metrics['degree'], [round(degree[i], 6) for i in ids])
+    communities = {}
+    for i, number in zip(ids, metrics['community']): communities.setdefault(number, set()).add(i)
+    assert set().union(*communities.values()) == set(ids) # Every node in exactly one community
+    assert sorted(communities) == list(range(len(communities)))
+    sizes = [len(communities[k]) for k in sorted(communities)]
+    assert sizes == sorted(sizes, reverse=True) # Largest first
+
+
+def test_no_edges():
+    nodes = [{'id': i, 'type': 'Country'} for i in 'abc']
+    store, _ = make_store({n['id']: 'Country' for n in nodes}, [])
+    metrics = compute_metrics(nodes, store.edge_list(np.zeros(0, dtype=np.int64)))
+    assert metrics['degree'] == [0.0] * 3 and metrics['betweenness'] == [0.0] * 3
+    assert sorted(metrics['community']) == [0, 1, 2]
+
+
+def test_element_data_scaled_and_cached(rng, tmp_path):
+    nodes, edges, ids = random_graph(rng, 40, 70)
+    metrics = GraphMetrics(cache_dir=str(tmp_path))
+    metrics.register('faro', nodes, edges)
+    data = metrics.element_data()
+    for name in CENTRALITY_METRICS:
+        values = [data[i][f"faro_{name}"] for i in ids]
+        assert max(values) == 1.0 and min(values) >= 0
+    assert len(list(tmp_path.iterdir())) == 1
+    again = GraphMetrics(cache_dir=str(tmp_path))
+    again.register('faro', nodes, edges)
+    assert again.node_metrics('faro') == metrics.node_metrics('faro')
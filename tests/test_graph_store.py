@@ -0,0 +1,17 @@
+from bench_graph_build import make_dataset, legacy_build, node_types
+from graph_builder import build_graph
+from conftest import make_store
+
+
+def test_build_matches_legacy_builder():
+    tables = make_dataset(300, seed=3)
+    graph, legacy = build_graph(*tables, node_types), legacy_build(*tables)
+    store = graph['store']
+    assert list(store.iter_nodes()) == legacy['all_nodes_base'] # Details rebuilt from the columns
+    assert all('details_dict' not in n for n in graph['all_nodes_base']) # View lists hold thin dicts
+    assert list(graph['all_edges_base']) == legacy['all_edges_base']
+
+
+def test_nodes_without_registered_details():
+    store, _ = make_store({'a': 'Event', 'b': 'Country'}, [('b', 'a', 'participation')])
+    assert store.node_details(0) == {} and store.node(1)['details_dict'] == {}
@@ -0,0 +1,55 @@
+import networkx as nx
+import numpy as np
+
+import layout_engine
+from layout_engine import force_layout
+
+
+def bounding_box(positions, ids):
+    xs, ys = [positions[i]['x'] for i in ids], [positions[i]['y'] for i in ids]
+    return min(xs), max(xs), min(ys), max(ys)
+
+
+def overlaps(a, b):
+    return not (a[1] < b[0] or b[1] < a[0] or a[3] < b[2] or b[3] < a[2])
+
+
+def test_components_are_packed_apart(monkeypatch):
+    monkeypatch.setattr(layout_engine, 'KAMADA_KAWAI_MAX_NODES', 20) # The 40-node ring takes the spring path
+    nodes = [{'id': str(i)} for i in range(76)]
+    triangles = [(a, b) for t in (0, 3) for a, b in ((t, t + 1), (t + 1, t + 2), (t + 2, t))]
+    ring = [(36 + i, 36 + (i + 1) % 40) for i in range(40)]
+    edges = [{'source': str(s), 'target': str(t)} for s, t in triangles + ring]
+    positions = force_layout(nodes, edges)
+    assert set(positions) == {n['id'] for n in nodes}
+    groups = [['0', '1', '2'], ['3', '4', '5'], [str(36 + i) for i in range(40)]] + [[str(i)] for i in range(6, 36)]
+    boxes = [bounding_box(positions, ids) for ids in groups]
+    assert not any(overlaps(boxes[i], boxes[j]) for i in range(len(boxes)) for j in range(i + 1, len(boxes)))
+
+
+def test_connected_graph_is_one_layout():
+    nodes = [{'id': str(i)} for i in range(10)]
+    edges = [{'source': str(i), 'target': str(i + 1)} for i in range(9)]
+    positions = force_layout(nodes, edges)
+    assert len({(p['x'], p['y']) for p in positions.values()}) == 10
+
+
+def test_pivot_mds_follows_graph_distances():
+    G = nx.convert_node_labels_to_integers(nx.grid_2d_graph(30, 30))
+    unit = layout_engine.pivot_mds_layout(G)
+    sample = list(range(0, 900, 37))
+    hops = dict(nx.all_pairs_shortest_path_length(G))
+    graph_d = [hops[a][b] for i, a in enumerate(sample) for b in sample[i + 1:]]
+    layout_d = [np.hypot(*(unit[a] - unit[b])) for i, a in enumerate(sample) for b in sample[i + 1:]]
+    assert np.corrcoef(graph_d, layout_d)[0, 1] > 0.95
+    assert np.abs(np.array(list(unit.values()))).max() <= 1.0
+
+
+def test_large_components_use_pivot_mds(monkeypatch):
+    monkeypatch.setattr(layout_engine, 'KAMADA_KAWAI_MAX_NODES', 10)
+    monkeypatch.setattr(layout_engine, 'FORCE_LAYOUT_MAX_NODES', 50)
+    monkeypatch.setattr(nx, 'spring_layout', None) # Would fail if the 200-node path took the spring route
+    nodes = [{'id': str(i)} for i in range(200)]
+    edges = [{'source': str(i), 'target': str(i + 1)} for i in range(199)]
+    positions = force_layout(nodes, edges)
+    assert len({(p['x'], p['y']) for p in positions.values()}) == 200
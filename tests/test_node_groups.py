@@ -0,0 +1,71 @@
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from element_cache import ElementCache
+from node_groups import NodeGroups, group_id, HIDDEN_CLASS, MEMBER_CLASS
+from conftest import make_store
+
+TYPES = ['Country', 'Organization', 'Individual']
+
+
+@pytest.fixture
+def grouped(rng):
+    node_types = {f"ev{i}": 'Event' for i in range(30)}
+    node_types.update({f"{t[:3]}{i}": t for t in TYPES for i in range(12)})
+    actors = [n for n, t in node_types.items() if t != 'Event']
+    edges = {(a, f"ev{e}", 'participation') for a in actors for e in rng.choice(30, 4, replace=False).tolist()}
+    edges |= {(f"ev{a}", f"ev{b}", 'causal') for a, b in rng.choice(30, (25, 2)).tolist() if a != b}
+    edges |= {(a, b, 'alliance') for a, b in (rng.choice(actors, 2, replace=False).tolist() for _ in range(40))}
+    store, positions = make_store(node_types, sorted(edges))
+    nodes = [{'id': i, 'type': t} for i, t in node_types.items()]
+    return store, nodes, store.edge_list(sorted(p for ps in positions.values() for p in ps.tolist()))
+
+
+def view(groups, cache, expanded):
+    elements = list(groups.base_elements(cache))
+    for group in groups.groups: elements.extend(groups.block(group, group in expanded, cache))
+    return elements
+
+
+def test_bundles_match_naive_rebuild(grouped):
+    store, nodes, edges = grouped
+    groups = NodeGroups(store, nodes, edges)
+    type_of = {n['id']: n['type'] for n in nodes}
+    display = lambda node_id: group_id(type_of[node_id]) if type_of[node_id] in TYPES else node_id
+    naive = Counter()
+    for source, target, edge_type in edges.endpoints():
+        if type_of[source] in TYPES or type_of[target] in TYPES: naive[(display(source), display(target), edge_type)] += 1
+    cache = ElementCache(store)
+    bundled = Counter()
+    for group in groups.groups:
+        for element in groups.block(group, False, cache):
+            if 'bundled' in element['classes']:
+                data = element['data']
+                bundled[(data['source'], data['target'], data['edge_type'])] += data['weight']
+    assert bundled == naive
+    owned = sorted(p for g in groups.groups for p in groups.owned[g].tolist()) + groups.base_edges.positions.tolist()
+    assert sorted(owned) == sorted(edges.positions.tolist()) # Every edge in exactly one place
+
+
+@pytest.mark.parametrize('size', range(len(TYPES) + 1))
+def test_states_are_consistent(grouped, size):
+    store, nodes, edges = grouped
+    groups = NodeGroups(store, nodes, edges)
+    cache = ElementCache(store)
+    collapsed = view(groups, cache, [])
+    for expanded in combinations(groups.groups, size):
+        elements = view(groups, cache, expanded)
+        ids = [e['data']['id'] for e in elements]
+        assert len(ids) == len(set(ids)) # Edges have ids too: the browser patches by id
+        assert ids == [e['data']['id'] for e in collapsed] # Toggling never adds or removes elements
+        shown_nodes = {e['data']['id'] for e in elements if 'source' not in e['data'] and (HIDDEN_CLASS not in e['classes'].split()) and (MEMBER_CLASS not in e['classes'].split() or e['data']['parent'])}
+        shown_edges = [e for e in elements if 'source' in e['data'] and HIDDEN_CLASS not in e['classes'].split() and {e['data']['source'], e['data']['target']} <= shown_nodes]
+        assert {e['data']['node_id'] for e in elements if e['data'].get('node_id') and e['data']['id'] in shown_nodes} == {n['id'] for n in nodes if n['type'] in expanded}
+        assert all(e['data']['parent'] == e['data']['id'].split('/')[0] for e in elements if e['data']['id'] in shown_nodes and 'node_id' in e['data']) # Inside their super-node
+        assert all(group_id(g) in shown_nodes for g in groups.groups) # Edges of other groups attach to super-nodes
+        assert sum(e['data'].get('weight', 1) if 'bundled' in e['classes'] else 1 for e in shown_edges) == len(edges) # Every edge drawn once, bundled or not
+        hidden_edges = [e for e in elements if 'source' in e['data'] and e not in shown_edges]
+        assert all(HIDDEN_CLASS in e['classes'].split() or not {e['data']['source'], e['data']['target']} <= shown_nodes for e in hidden_edges)
+        assert len(shown_edges) == len(groups.base_edges) + sum(len(groups.owned[g]) if g in expanded else len(groups.bundles[g][2]) for g in groups.groups)
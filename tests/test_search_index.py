@@ -0,0 +1,28 @@
+from search_index import SearchIndex
+
+NODES = [
+    {'id': 'ev1', 'label': 'Sevastopol blockade', 'type': 'Event',
+     'details_dict': {'summary': 'Naval base in Sevastopol blocked', 'location': 'Sevastopol', 'date': '1 Mar 2014', 'type': 'military', 'actors': ['Russia']}},
+    {'id': 'ev2', 'label': 'Referendum', 'type': 'Event',
+     'details_dict': {'summary': 'Vote held across Crimea', 'location': 'Simferopol', 'date': '16 Mar 2014', 'type': 'political', 'actors': ['Russia']}},
+    {'id': 'Russia', 'label': 'Russia', 'type': 'Country',
+     'details_dict': {'role': 'Annexing state', 'aliases': ['Russian Federation'], 'events': ['Sevastopol blockade', 'Referendum'], 'type': 'state'}},
+    {'id': 'Aksyonov', 'label': 'Sergey Aksyonov', 'type': 'Individual',
+     'details_dict': {'role': 'Crimean prime minister', 'involvement': 'Called the referendum', 'events': ['Referendum']}},
+]
+
+
+def test_linked_titles_dates_and_types_are_not_indexed():
+    index = SearchIndex(NODES)
+    assert index.search('blockade') == ['ev1'] # Not Russia, whose 'events' list names the event
+    assert index.search('mar') == [] and index.search('military') == []
+    assert 'events' not in index.fields and 'actors' not in index.fields and 'date' not in index.fields
+
+
+def test_ranking_and_field_restriction():
+    index = SearchIndex(NODES)
+    assert index.search('referendum') == ['ev2', 'Aksyonov'] # Label before involvement text
+    assert index.search('federation') == ['Russia'] # Aliases are searched
+    assert index.search('location:sevastopol') == ['ev1']
+    assert index.search('crimea') == ['ev2', 'Aksyonov'] # Prefix of 'crimean'; exact match first
+    assert index.search('role:prime sergey') == ['Aksyonov']
@@ -0,0 +1,27 @@
+import os
+import time
+
+from snapshot import prune_snapshots
+
+
+def make_dirs(root, ages):
+    for name, age in ages.items():
+        path = root / name
+        path.mkdir()
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+
+def test_prune_keeps_recent_and_young_snapshots(tmp_path):
+    hour = 3600
+    make_dirs(tmp_path, {'new': 0, 'mid': 2 * hour, 'old': 3 * hour, 'older': 4 * hour, 'young': 60, 'current': 5 * hour,
+                         '.old.1.tmp': 2 * hour, '.new.2.tmp': 60})
+    prune_snapshots(str(tmp_path), current='current', keep=3, min_age=hour)
+    # Three most recent: new, young, mid; 'current' is always kept, temp dirs go once they are old
+    assert sorted(os.listdir(tmp_path)) == sorted(['new', 'young', 'mid', 'current', '.new.2.tmp'])
+
+
+def test_prune_never_removes_young_snapshots(tmp_path):
+    make_dirs(tmp_path, {f"s{i}": i for i in range(5)})
+    prune_snapshots(str(tmp_path), keep=1, min_age=3600)
+    assert len(os.listdir(tmp_path)) == 5
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from table_query import TableQuery, parse_filter_query
+
+
+@pytest.fixture
+def table(rng):
+    n = 200
+    return pd.DataFrame({
+        'Name': [f"Actor {i}" if i % 7 else None for i in rng.integers(0, 40, n)],
+        'Type': rng.choice(['Country', 'Organization', 'Individual'], n),
+        'Events': np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 6, n)),
+    })
+
+
+def naive_order(df, sort_by):
+    """Row order from pandas: stable, missing values last in both directions."""
+    if not sort_by: return list(range(len(df)))
+    columns = [s['column_id'] for s in sort_by]
+    return df.sort_values(columns, ascending=[s['direction'] == 'asc' for s in sort_by], na_position='last', kind='stable').index.tolist()
+
+
+SORTS = [
+    [{'column_id': 'Events', 'direction': 'asc'}],
+    [{'column_id': 'Events', 'direction': 'desc'}],
+    [{'column_id': 'Name', 'direction': 'desc'}],
+    [{'column_id': 'Type', 'direction': 'asc'}, {'column_id': 'Events', 'direction': 'desc'}],
+    [{'column_id': 'Events', 'direction': 'desc'}, {'column_id': 'Name', 'direction': 'asc'}],
+]
+
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('filter_query', ['', '{Type} icontains country'])
+def test_pages_match_naive_sort(table, sort_by, filter_query):
+    query = TableQuery(table)
+    expected = table[table['Type'] == 'Country'] if filter_query else table
+    expected_rows = naive_order(expected, sort_by)
+    records, page_count, total, _ = query.page(0, len(table), sort_by, filter_query)
+    assert total == len(expected) and page_count == 1
+    assert pd.DataFrame(records).equals(table.loc[expected_rows].reset_index(drop=True))
+
+
+def test_missing_values_sort_last(table):
+    query = TableQuery(table)
+    for direction in ('asc', 'desc'):
+        records, *_ = query.page(0, len(table), [{'column_id': 'Events', 'direction': direction}])
+        missing = [pd.isna(r['Events']) for r in records]
+        assert missing == sorted(missing) # All present values first
+
+
+def test_typed_filter_values(table):
+    assert parse_filter_query('{Events} > num(2) && {Name} = str(7) && {Name} = "num(x)"') == [
+        ('Events', 'gt', 2.0, False), ('Name', 'eq', '7', False), ('Name', 'eq', 'num(x)', False)]
+    assert parse_filter_query('{Events} > num(two)') == []
+    query = TableQuery(table)
+    assert query.page(0, 10, None, '{Events} > num(2)')[2] == (table['Events'] > 2).sum()
+    assert query.page(0, 10, None, '{Events} >= 3')[2] == (table['Events'] >= 3).sum()
+    text = TableQuery(pd.DataFrame({'Count': ['10', '9', 'n/a', '100']}))
+    assert text.page(0, 10, None, '{Count} > num(9)')[2] == 2 # Compared as numbers, not text
+    assert text.page(0, 10, None, '{Count} contains num(10)')[2] == 2
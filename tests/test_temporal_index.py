@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from element_cache import ElementCache
+from temporal_index import TemporalIndex
+from conftest import make_store
+
+
+@pytest.fixture
+def timeline(rng):
+    events = [f"ev{i}" for i in range(40)]
+    actors = [f"ac{i}" for i in range(25)] # A few get no events: never shown
+    node_types = {**{e: 'Event' for e in events}, **{a: 'Country' for a in actors}}
+    edges = {(a, e, 'participation') for a in actors[:20] for e in rng.choice(events, 3, replace=False).tolist()}
+    edges |= {(a, b, 'causal') for a, b in rng.choice(events, (30, 2)).tolist() if a != b}
+    edges |= {(a, b, 'alliance') for a, b in rng.choice(actors, (15, 2)).tolist() if a != b}
+    store, positions = make_store(node_types, sorted(edges))
+    dates = pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 90, len(events)), unit='D')
+    nodes = [{'id': i, 'label': i, 'type': t} for i, t in node_types.items() if i != 'ac3'] # A node outside this graph
+    return store, nodes, store.edge_list(np.sort(np.concatenate(list(positions.values())))), events, dates
+
+
+def naive_active(store, nodes, edges, event_day, day):
+    """Element ids shown as of `day`, rebuilt from scratch."""
+    node_ids = {n['id'] for n in nodes}
+    active = {e for e, d in event_day.items() if d <= day and e in node_ids}
+    for source, target, _ in edges.endpoints():
+        for a, b in ((source, target), (target, source)):
+            if a in event_day and b not in event_day and event_day[a] <= day and b in node_ids: active.add(b)
+    shown = set(active)
+    for pos, (source, target, _) in zip(edges.positions.tolist(), edges.endpoints()):
+        if source in active and target in active: shown.add(f"edge:{pos}")
+    return shown
+
+
+def test_prefixes_match_naive_rebuild(timeline):
+    store, nodes, edges, events, dates = timeline
+    index = TemporalIndex(store, nodes, edges, events, dates)
+    ordered = index.time_ordered(ElementCache(store).elements(nodes, edges))
+    ids = [e['data']['id'] for e in ordered]
+    event_day = dict(zip(events, dates.values.astype('datetime64[D]').astype(np.int64)))
+    assert len(ids) == len(set(ids))
+    for day in np.r_[index.steps[0] - 1, index.steps, index.steps[-1] + 1]:
+        assert set(ids[:index.count_at(day)]) == naive_active(store, nodes, edges, event_day, day), day
+    assert 'ac3' not in ids and 'ac22' not in ids # Outside the graph / no events
+
+
+@pytest.mark.parametrize('stride', [1, 7, 30])
+def test_frames_match_naive(timeline, stride):
+    store, nodes, edges, events, dates = timeline
+    index = TemporalIndex(store, nodes, edges, events, dates)
+    days = index.steps
+    expected, shown = [], 0
+    for tick in list(range(int(days[0]), int(days[-1]) + stride, stride)) + [int(days[-1])]: # Last stop on or before each tick, kept when the graph grows
+        stop = max(i for i, d in enumerate(days) if d <= tick)
+        if index.step_count(stop) > shown: expected.append(stop); shown = index.step_count(stop)
+    assert index.frames(days, stride).tolist() == expected
+    assert expected[-1] == len(days) - 1
@@ -0,0 +1,72 @@
+import os
+import json
+from graph_api import LRUCache
+
+# ------------------------------------------------------------------------------
+# PER-SESSION VIEW CACHE (recently shown subgraphs and detail panels, per browser session)
+# ------------------------------------------------------------------------------
+VIEW_CACHE_SESSIONS = int(os.environ.get('VIEW_CACHE_SESSIONS', 256)) # Sessions kept (least recently active dropped first)
+VIEW_CACHE_SIZE = int(os.environ.get('VIEW_CACHE_SIZE', 32)) # Views kept per session
+VIEW_HISTORY_SIZE = 20 # Breadcrumb length
+
+
+def view_key(graph_name, view, layout_name):
+    """Cache key for a view descriptor ({'mode': 'focus', 'node': id}, {'mode': 'search', ...}) shown with a layout."""
+    return graph_name, json.dumps(view, sort_keys=True), layout_name
+
+
+class SessionViewCache:
+    """
+    Two-level LRU: session id -> LRU of view key -> (elements, details panel). Revisiting a view
+    (tap back and forth, back button, breadcrumb) reuses the computed element list and panel.
+    Entries only reference the shared element dicts, so a session costs little beyond its lists.
+    Each worker process has its own cache; a request landing on another worker simply recomputes.
+    """
+
+    def __init__(self, max_sessions=VIEW_CACHE_SESSIONS, max_views=VIEW_CACHE_SIZE):
+        self.max_views = max_views
+        self.sessions = LRUCache(max_sessions)
+
+    def get(self, session_id, key):
+        views = self.sessions.get(session_id) if session_id else None
+        return views.get(key) if views is not None else None
+
+    def put(self, session_id, key, value):
+        if not session_id: return
+        views = self.sessions.get(session_id)
+        if views is None:
+            views = LRUCache(self.max_views)
+            self.sessions.put(session_id, views)
+        views.put(key, value)
+
+    def view(self, session_id, key, build):
+        """Cached (elements, panel) for key, else build() - stored for the next visit."""
+        cached = self.get(session_id, key)
+        if cached is None:
+            cached = build()
+            self.put(session_id, key, cached)
+        return cached
+
+
+# ------------------------------------------------------------------------------
+# BREADCRUMB / BACK STACK (list of view descriptors kept in a dcc.Store; the full graph is the implicit root)
+# ------------------------------------------------------------------------------
+def push_view(history, view):
+    """History after showing `view`: a revisited view truncates back to it, the full view clears the trail."""
+    history = list(history or [])
+    if view.get('mode', 'full') == 'full': return []
+    if view in history: return history[:history.index(view) + 1]
+    return (history + [view])[-VIEW_HISTORY_SIZE:]
+
+
+def back_view(history):
+    """(previous view, history without the current view); the full view when the trail runs out."""
+    history = list(history or [])[:-1]
+    return (history[-1] if history else {'mode': 'full'}), history
+
+
+def crumb_view(history, index):
+    """(view, history) after jumping to breadcrumb `index` (-1 is the full graph)."""
+    history = list(history or [])
+    if index is None or index < 0 or index >= len(history): return {'mode': 'full'}, []
+    return history[index], history[:index + 1]